@@ -0,0 +1,190 @@
+/**
+ * Decoder for the static data bundle written by `python -m ubidata bundle`
+ * One fetch and one inflate give typed-array views of every year's single-age
+ * populations, age prefix sums, economic context, CPI and CCOFOG finance totals.
+ */
+
+import type { EconomicData } from './population-estimates';
+
+const BUNDLE_MAGIC = 'UBIBNDL\0';
+const BUNDLE_VERSION = 1;
+const FLAG_DEFLATE = 1;
+
+interface ArrayEntry {
+  dtype: string;
+  shape: number[];
+  offset: number;
+  length: number;
+}
+
+export interface BundleIndex {
+  format: number;
+  dataVersion: string;
+  created: string;
+  sources: Record<string, string>;
+  labels: {
+    years: number[];
+    geographies: string[];
+    sexes: string[];
+    lastAge: number;
+    economics: string[];
+    economicSources?: Record<string, string>;
+    finance?: { codes: string[]; names: string[]; geography: string; component: string };
+  };
+  arrays: Record<string, ArrayEntry>;
+}
+
+type BundleArray = Int32Array | Float64Array;
+
+export interface PopulationBundle {
+  index: BundleIndex;
+  years: number[];
+  hasYear(year: number): boolean;
+  populationBreakdown(
+    year: number,
+    childCutoff: number,
+    adultCutoff: number,
+    seniorCutoff: number
+  ): { children: number; youth: number; adults: number; seniors: number; total: number };
+  economicData(year: number): EconomicData & { isEstimated: boolean };
+  cpi(year: number): number | null;
+  financeTotals(year: number): Record<string, number> | null;
+}
+
+async function inflate(bytes: Uint8Array): Promise<ArrayBuffer> {
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+  return await new Response(stream).arrayBuffer();
+}
+
+function view(payload: ArrayBuffer, entry: ArrayEntry): BundleArray {
+  const length = entry.shape.reduce((a, b) => a * b, 1);
+  // Offsets are 8-byte aligned, so both views share the inflated buffer without copying
+  switch (entry.dtype) {
+    case '<i4':
+      return new Int32Array(payload, entry.offset, length);
+    case '<f8':
+      return new Float64Array(payload, entry.offset, length);
+    default:
+      throw new Error(`Unsupported bundle dtype ${entry.dtype}`);
+  }
+}
+
+/**
+ * Decode a bundle from its bytes
+ */
+export async function decodePopulationBundle(buffer: ArrayBuffer): Promise<PopulationBundle> {
+  if (buffer.byteLength < 64) {
+    throw new Error('Not a UBI Compass data bundle');
+  }
+  const header = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 8));
+  if (magic !== BUNDLE_MAGIC) {
+    throw new Error('Not a UBI Compass data bundle');
+  }
+  const version = header.getUint16(8, true);
+  if (version > BUNDLE_VERSION) {
+    throw new Error(`Bundle version ${version}; this reader knows ${BUNDLE_VERSION}`);
+  }
+  const flags = header.getUint16(10, true);
+  const indexOffset = header.getUint32(12, true);
+  const indexLength = header.getUint32(16, true);
+  const payloadOffset = header.getUint32(20, true);
+  const payloadLength = header.getUint32(24, true);
+  const rawLength = header.getUint32(28, true);
+  if (indexOffset + indexLength > buffer.byteLength || payloadOffset + payloadLength > buffer.byteLength) {
+    throw new Error('Bundle is truncated');
+  }
+
+  const index: BundleIndex = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, indexOffset, indexLength))
+  );
+  const compressed = new Uint8Array(buffer, payloadOffset, payloadLength);
+  const payload = flags & FLAG_DEFLATE ? await inflate(compressed) : compressed.slice().buffer;
+  if (payload.byteLength !== rawLength) {
+    throw new Error(`Bundle payload is ${payload.byteLength} bytes, expected ${rawLength}`);
+  }
+
+  const arrays: Record<string, BundleArray> = {};
+  for (const [name, entry] of Object.entries(index.arrays)) {
+    if (entry.offset + entry.length > payload.byteLength) {
+      throw new Error(`Bundle array ${name} runs past the payload`);
+    }
+    arrays[name] = view(payload, entry);
+  }
+
+  const { labels } = index;
+  const yearIndex = new Map(labels.years.map((year, i) => [year, i]));
+  const prefixLength = index.arrays.prefix.shape[3];
+  const economicsWidth = labels.economics.length;
+
+  function row(year: number): number {
+    const position = yearIndex.get(year);
+    if (position === undefined) {
+      throw new Error(`${year} is not in the data bundle`);
+    }
+    return position;
+  }
+
+  return {
+    index,
+    years: labels.years,
+    hasYear: (year) => yearIndex.has(year),
+
+    // Canada, both sexes; same bands as calculateUBICosts, each one subtraction of prefix sums
+    populationBreakdown(year, childCutoff, adultCutoff, seniorCutoff) {
+      const base = row(year) * labels.geographies.length * labels.sexes.length * prefixLength;
+      const last = prefixLength - 1;
+      const below = (age: number) => arrays.prefix[base + Math.min(Math.max(age, 0), last)];
+
+      const children = below(childCutoff);
+      const total = arrays.prefix[base + last];
+      return {
+        children,
+        youth: Math.max(below(adultCutoff) - children, 0),
+        adults: Math.max(below(seniorCutoff) - below(adultCutoff), 0),
+        seniors: total - below(seniorCutoff),
+        total,
+      };
+    },
+
+    // isEstimated when any value is still a hand-entered estimate rather than a processed table
+    economicData(year) {
+      const start = row(year) * economicsWidth;
+      const values = Object.fromEntries(
+        labels.economics.map((key, i) => [key, arrays.economics[start + i]])
+      );
+      const estimated = arrays.economicsEstimated
+        ? arrays.economicsEstimated.subarray(start, start + economicsWidth).some((flag) => flag !== 0)
+        : true;
+      return { year, ...values, isEstimated: estimated } as unknown as EconomicData & { isEstimated: boolean };
+    },
+
+    cpi(year) {
+      const value = arrays.cpi?.[row(year)];
+      return value === undefined || Number.isNaN(value) ? null : value;
+    },
+
+    financeTotals(year) {
+      if (!arrays.finance || !labels.finance) {
+        return null;
+      }
+      const codes = labels.finance.codes;
+      const start = row(year) * codes.length;
+      if (Number.isNaN(arrays.finance[start])) {
+        return null;
+      }
+      return Object.fromEntries(codes.map((code, i) => [code, arrays.finance[start + i]]));
+    },
+  };
+}
+
+/**
+ * Fetch and decode the bundle served with the static assets
+ */
+export async function loadPopulationBundle(url: string = '/population-bundle.bin'): Promise<PopulationBundle> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch ${url}: ${response.status}`);
+  }
+  return await decodePopulationBundle(await response.arrayBuffer());
+}
@@ -5,6 +5,7 @@
  */
 
 import { calculatePopulationByAge, getEconomicData, type PopulationData, type EconomicData } from '../data/population-estimates';
+import { loadPopulationBundle, type PopulationBundle } from '../data/population-bundle';
 
 export interface PopulationBreakdown {
   children: number;
@@ -27,6 +28,8 @@ export interface EconomicContext {
 
 export class PopulationService {
   private isDatabaseMode: boolean;
+  private bundle: PopulationBundle | null = null;
+  private bundleLoad: Promise<boolean> | null = null;
 
   constructor(isDatabaseMode: boolean = false) {
     this.isDatabaseMode = isDatabaseMode;
@@ -39,6 +42,30 @@ export class PopulationService {
     this.isDatabaseMode = useDatabase;
   }
 
+  /**
+   * Load the static data bundle, so static mode uses real data instead of estimates
+   */
+  async loadStaticBundle(url?: string): Promise<boolean> {
+    try {
+      this.bundle = await loadPopulationBundle(url);
+      return true;
+    } catch (error) {
+      console.warn('Static data bundle unavailable, using estimates:', error);
+      this.bundle = null;
+      return false;
+    }
+  }
+
+  /**
+   * Load the static data bundle once, on first use in static mode
+   */
+  private ensureStaticBundle(): Promise<boolean> {
+    if (!this.bundleLoad) {
+      this.bundleLoad = this.bundle ? Promise.resolve(true) : this.loadStaticBundle();
+    }
+    return this.bundleLoad;
+  }
+
   /**
    * Get population breakdown by age groups for a given year
    */
@@ -51,6 +78,7 @@ export class PopulationService {
     if (this.isDatabaseMode) {
       return await this.getPopulationFromDatabase(year, childCutoff, adultCutoff, seniorCutoff);
     } else {
+      await this.ensureStaticBundle();
       return this.getPopulationFromEstimates(year, childCutoff, adultCutoff, seniorCutoff);
     }
   }
@@ -62,6 +90,7 @@ export class PopulationService {
     if (this.isDatabaseMode) {
       return await this.getEconomicFromDatabase(year);
     } else {
+      await this.ensureStaticBundle();
       return this.getEconomicFromEstimates(year);
     }
   }
@@ -119,6 +148,13 @@ export class PopulationService {
     adultCutoff: number,
     seniorCutoff: number
   ): PopulationBreakdown {
+    if (this.bundle?.hasYear(year)) {
+      return {
+        ...this.bundle.populationBreakdown(year, childCutoff, adultCutoff, seniorCutoff),
+        isEstimated: false
+      };
+    }
+
     const data = calculatePopulationByAge(year, childCutoff, adultCutoff, seniorCutoff);
     
     return {
@@ -171,7 +207,9 @@ export class PopulationService {
    * Get economic data from static estimates
    */
   private getEconomicFromEstimates(year: number): EconomicContext {
-    const data = getEconomicData(year);
+    const data = this.bundle?.hasYear(year)
+      ? this.bundle.economicData(year)
+      : { ...getEconomicData(year), isEstimated: true };
     
     return {
       gdp: data.gdp,
@@ -180,7 +218,7 @@ export class PopulationService {
       totalGovernmentBudget: data.federalExpenditure + data.provincialExpenditure,
       inflationRate: data.inflationRate,
       averageIncome: data.averageIncome,
-      isEstimated: true
+      isEstimated: data.isEstimated
     };
   }
 
@@ -226,6 +264,13 @@ export class PopulationService {
       }
     }
 
+    if (!this.isDatabaseMode) {
+      await this.ensureStaticBundle();
+    }
+    if (this.bundle) {
+      return [...this.bundle.years].sort((a, b) => b - a);
+    }
+
     // Fallback to static years
     return [2022, 2021, 2020, 2019, 2018, 2017, 2016, 2015, 2014, 2013, 2012, 2011, 2010, 2009, 2008, 2007, 2006, 2005, 2004, 2003, 2002, 2001, 2000];
   }
@@ -0,0 +1,9 @@
+/**
+ * Shared vitest setup (see vitest.config.ts)
+ */
+
+import { afterEach, vi } from 'vitest';
+
+afterEach(() => {
+  vi.restoreAllMocks();
+});
@@ -0,0 +1,82 @@
+// @vitest-environment node
+/**
+ * Round trip: a bundle written by `ubidata/bundle.py` decodes to the values Python reads back
+ */
+
+import { execFileSync } from 'node:child_process';
+import { mkdtempSync, readFileSync, rmSync } from 'node:fs';
+import { tmpdir } from 'node:os';
+import { join, resolve } from 'node:path';
+import { afterAll, beforeAll, describe, expect, it } from 'vitest';
+
+import { decodePopulationBundle, type PopulationBundle } from '../../data/population-bundle';
+
+const BACKEND = resolve(__dirname, '../../../ubi-backend/db');
+
+// Writes a two-year cube and its bundle with the fixture tables, then prints what Python decodes
+const WRITE_BUNDLE = `
+import json, sys
+import numpy as np
+from ubidata.bundle import make_bundle, open_bundle
+from ubidata.popcube import open_cube, write_cube
+
+out = sys.argv[1]
+data = np.zeros((2, 1, 1, 91), dtype="<i4")
+for i in range(2):
+    data[i, 0, 0, 1:] = 1000 * (i + 1) + np.arange(1, 91)
+    data[i, 0, 0, 0] = data[i, 0, 0, 1:].sum()
+cube = open_cube(write_cube(out + "/population.cube", data, [2008, 2009], ["Canada"], ["Both sexes"], list(range(91))))
+make_bundle(cube, out + "/bundle.bin", "statscan_data/cpi_inflation_18100005.csv",
+            "statscan_data/federal_finance_10100005.csv", "statscan_data/tax_filers_11100008.csv")
+bundle = open_bundle(out + "/bundle.bin")
+print(json.dumps({str(year): {"breakdown": bundle.population_breakdown(year, 18, 25, 65),
+                              "economics": bundle.economic_data(year),
+                              "cpi": float(bundle.arrays["cpi"][i])}
+                  for i, year in enumerate(bundle.labels["years"])}))
+`;
+
+describe('decodePopulationBundle', () => {
+  let dir: string;
+  let bytes: Buffer;
+  let expected: Record<string, any>;
+  let bundle: PopulationBundle;
+
+  beforeAll(async () => {
+    dir = mkdtempSync(join(tmpdir(), 'ubi-bundle-'));
+    const output = execFileSync('python', ['-c', WRITE_BUNDLE, dir], { cwd: BACKEND, encoding: 'utf-8' });
+    expected = JSON.parse(output);
+    bytes = readFileSync(join(dir, 'bundle.bin'));
+    bundle = await decodePopulationBundle(new Uint8Array(bytes).buffer);
+  });
+
+  afterAll(() => {
+    rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('reads the years written by Python', () => {
+    expect(bundle.years).toEqual([2008, 2009]);
+    expect(bundle.hasYear(2008)).toBe(true);
+    expect(bundle.hasYear(2010)).toBe(false);
+  });
+
+  it('matches the Python population breakdowns', () => {
+    for (const year of bundle.years) {
+      const { breakdown } = expected[year];
+      expect(bundle.populationBreakdown(year, 18, 25, 65)).toEqual(breakdown);
+    }
+  });
+
+  it('matches the Python economic context and CPI', () => {
+    for (const year of bundle.years) {
+      const { economics, cpi } = expected[year];
+      expect(bundle.economicData(year)).toEqual({ year, ...economics });
+      expect(bundle.cpi(year)).toBeCloseTo(cpi, 10);
+    }
+  });
+
+  it('rejects short and truncated buffers', async () => {
+    await expect(decodePopulationBundle(new ArrayBuffer(8))).rejects.toThrow('Not a UBI Compass data bundle');
+    const truncated = new Uint8Array(bytes).slice(0, bytes.length - 16).buffer;
+    await expect(decodePopulationBundle(truncated)).rejects.toThrow('truncated');
+  });
+});
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from ubidata.bundle import ECONOMIC_COLUMNS, make_bundle, open_bundle
+from ubidata.popcube import open_cube, write_cube
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "statscan_data")
+CPI = os.path.join(FIXTURES, "cpi_inflation_18100005.csv")
+FINANCE = os.path.join(FIXTURES, "federal_finance_10100005.csv")
+TAX_FILERS = os.path.join(FIXTURES, "tax_filers_11100008.csv")
+
+
+def small_cube(path, years=(2008, 2009)):
+    """Canada, both sexes, ages 1..90 with age 0 holding the total"""
+    ages = list(range(91))
+    data = np.zeros((len(years), 1, 1, len(ages)), dtype="<i4")
+    for i, _ in enumerate(years):
+        data[i, 0, 0, 1:] = 1000 * (i + 1) + np.arange(1, 91)
+        data[i, 0, 0, 0] = data[i, 0, 0, 1:].sum()
+    return open_cube(write_cube(str(path), data, years, ["Canada"], ["Both sexes"], ages))
+
+
+def test_bundle_round_trip(tmp_path):
+    cube = small_cube(tmp_path / "population.cube")
+    arrays, labels, index = make_bundle(cube, str(tmp_path / "bundle.bin"), CPI, FINANCE, TAX_FILERS)
+
+    bundle = open_bundle(str(tmp_path / "bundle.bin"))
+
+    assert bundle.index["dataVersion"] == index["dataVersion"]
+    assert bundle.labels["years"] == [2008, 2009]
+    for name, array in arrays.items():
+        np.testing.assert_array_equal(bundle.arrays[name], array)
+    for year in (2008, 2009):
+        breakdown = bundle.population_breakdown(year, 18, 25, 65)
+        assert breakdown["children"] == cube.age_range(year, 1, 17)
+        assert breakdown["youth"] == cube.age_range(year, 18, 24)
+        assert breakdown["adults"] == cube.age_range(year, 25, 64)
+        assert breakdown["seniors"] == cube.age_range(year, 65, 90)
+        assert breakdown["total"] == cube.get(year, 0)
+
+
+def test_bundle_economics_come_from_the_tables(tmp_path):
+    cube = small_cube(tmp_path / "population.cube")
+    make_bundle(cube, str(tmp_path / "bundle.bin"), CPI, FINANCE, TAX_FILERS)
+
+    bundle = open_bundle(str(tmp_path / "bundle.bin"))
+    flags = dict(zip(ECONOMIC_COLUMNS, bundle.arrays["economicsEstimated"][0]))
+    data = bundle.economic_data(2008)
+
+    # GDP has no annual series in the catalog, so it stays the hand-entered estimate
+    assert flags == {"gdp": 1, "federalExpenditure": 0, "provincialExpenditure": 0,
+                     "inflationRate": 0, "averageIncome": 0}
+    assert data["isEstimated"]
+    assert data["inflationRate"] == pytest.approx(2.3)
+    assert data["averageIncome"] == 28920
+    assert data["federalExpenditure"] == pytest.approx(171.1e9, rel=1e-3)
+    assert data["provincialExpenditure"] == pytest.approx(369.5e9, rel=1e-3)
+
+
+def test_bundle_without_tables_uses_estimates(tmp_path):
+    cube = small_cube(tmp_path / "population.cube")
+    _, labels, _ = make_bundle(cube, str(tmp_path / "bundle.bin"))
+
+    bundle = open_bundle(str(tmp_path / "bundle.bin"))
+
+    assert set(labels["economicSources"].values()) == {"estimate"}
+    assert bundle.arrays["economicsEstimated"].all()
+    assert "cpi" not in bundle.arrays and "finance" not in bundle.arrays
+
+
+def test_truncated_bundle_is_rejected(tmp_path):
+    path = tmp_path / "bundle.bin"
+    make_bundle(small_cube(tmp_path / "population.cube"), str(path), CPI)
+    raw = path.read_bytes()
+
+    path.write_bytes(raw[:40])
+    with pytest.raises(ValueError, match="too short"):
+        open_bundle(str(path))
+    path.write_bytes(raw[:-10])
+    with pytest.raises(Exception):
+        open_bundle(str(path))
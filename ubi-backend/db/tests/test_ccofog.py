@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from ubidata.ccofog import REPLACEABLE, ROOT, SubtreeIndex
+
+FUNCTION = "CCOFOG"
+KEYS = ["REF_DATE", "GEO"]
+
+
+def finance(rows):
+    return pd.DataFrame(rows, columns=KEYS + [FUNCTION, "VALUE"])
+
+
+def index(rows):
+    return SubtreeIndex(finance(rows), FUNCTION, KEYS)
+
+
+def test_validate_accepts_consistent_and_rounded_totals():
+    problems = index([
+        (2020, "Canada", "General public services [701]", 10.0),
+        (2020, "Canada", "Executive and legislative organs [7011]", 6.0),
+        (2020, "Canada", "Foreign economic aid [7012]", 4.0),
+        # Rounded values: 11 against 6 + 4 is within half a unit per value
+        (2021, "Canada", "General public services [701]", 11.0),
+        (2021, "Canada", "Executive and legislative organs [7011]", 6.0),
+        (2021, "Canada", "Foreign economic aid [7012]", 4.0),
+    ]).validate()
+
+    assert problems == []
+
+
+def test_validate_reports_parents_that_do_not_add_up():
+    problems = index([
+        (2020, "Canada", "General public services [701]", 10.0),
+        (2020, "Canada", "Executive and legislative organs [7011]", 6.0),
+        (2020, "Canada", "Foreign economic aid [7012]", 4.0),
+        (2020, "Ontario", "General public services [701]", 20.0),
+        (2020, "Ontario", "Executive and legislative organs [7011]", 6.0),
+        (2020, "Ontario", "Foreign economic aid [7012]", 4.0),
+    ]).validate()
+
+    assert problems == [{"REF_DATE": 2020, "GEO": "Ontario", "code": "701", "value": 20.0,
+                         "children_sum": 10.0, "difference": 10.0}]
+
+
+def test_validate_skips_missing_parents_and_children():
+    problems = index([
+        # No published parent: nothing to check, the total comes from the children
+        (2020, "Canada", "Executive and legislative organs [7011]", 6.0),
+        (2020, "Canada", "Foreign economic aid [7012]", 4.0),
+        # Only the parent is published
+        (2020, "Ontario", "General public services [701]", 20.0),
+    ]).validate()
+
+    assert problems == []
+
+
+def test_subtree_totals_and_replaceable_programs():
+    idx = index([
+        # 701 has a label but no published value, so its total is its children's sum
+        (2020, "Canada", "General public services [701]", np.nan),
+        (2020, "Canada", "Executive and legislative organs [7011]", 6.0),
+        (2020, "Canada", "Foreign economic aid [7012]", 4.0),
+        (2020, "Canada", "Social protection [710]", 50.0),
+        (2020, "Canada", "Old age [7102]", 30.0),
+        (2020, "Canada", "Family and children [7104]", 15.0),
+    ])
+
+    assert idx.total("701", 2020, "Canada") == 10.0
+    assert idx.total("710", 2020, "Canada") == 50.0  # A published parent wins over its children's sum
+    assert idx.total(ROOT, 2020, "Canada") == 60.0
+    assert idx.total(REPLACEABLE, 2020, "Canada") == 45.0
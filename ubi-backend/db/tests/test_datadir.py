@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import stat
+
+import pytest
+
+from ubidata.datadir import LOCK_DIR, MANIFEST, SnapshotStore, atomic_write, current_dir, table_lock
+
+
+def leftovers(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_text("old\n")
+
+    with atomic_write(str(path)) as f:
+        f.write("new\n")
+        assert path.read_text() == "old\n"  # Readers see the old file until the block ends
+
+    assert path.read_text() == "new\n"
+    assert leftovers(tmp_path) == []
+
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_text("old\n")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as f:
+            f.write("half")
+            raise RuntimeError("interrupted")
+
+    assert path.read_text() == "old\n"
+    assert leftovers(tmp_path) == []
+
+
+def test_atomic_write_file_modes(tmp_path):
+    previous = os.umask(0o022)
+    try:
+        new = tmp_path / "new.csv"
+        with atomic_write(str(new)) as f:
+            f.write("x")
+        assert stat.S_IMODE(os.stat(new).st_mode) == 0o644
+
+        existing = tmp_path / "existing.csv"
+        existing.write_text("x")
+        os.chmod(existing, 0o640)
+        with atomic_write(str(existing)) as f:
+            f.write("y")
+        assert stat.S_IMODE(os.stat(existing).st_mode) == 0o640
+    finally:
+        os.umask(previous)
+
+
+def test_table_lock_is_exclusive(tmp_path):
+    held = table_lock(str(tmp_path), "cpi")
+    assert held.acquire()
+    try:
+        other = table_lock(str(tmp_path), "cpi", timeout=0.1)
+        assert not other.acquire(blocking=False)
+        with pytest.raises(TimeoutError):
+            with other:
+                pass
+        # Other tables are not blocked
+        with table_lock(str(tmp_path), "gdp", timeout=0.1):
+            pass
+    finally:
+        held.release()
+
+    with table_lock(str(tmp_path), "cpi", timeout=0.1):
+        pass
+    assert os.path.exists(tmp_path / LOCK_DIR / "cpi.lock")
+
+
+def publish_version(store, content):
+    version_dir = store.begin()
+    with open(os.path.join(version_dir, "table.sql"), "w") as f:
+        f.write(content)
+    return store.publish(version_dir)
+
+
+def test_publish_makes_version_current(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert current_dir(str(tmp_path)) == str(tmp_path)
+
+    version = publish_version(store, "INSERT 1;\n")
+
+    path = current_dir(str(tmp_path))
+    assert os.path.basename(path) == version
+    assert (tmp_path / "CURRENT").read_text().strip() == version
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    assert manifest["files"] == {"table.sql": {"bytes": 10,
+                                               "sha256": hashlib.sha256(b"INSERT 1;\n").hexdigest()}}
+    assert stat.S_IMODE(os.stat(os.path.join(path, "table.sql")).st_mode) == 0o444
+    assert store.versions() == [version]
+
+
+def test_unpublished_version_is_invisible(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    first = publish_version(store, "1")
+
+    version_dir = store.begin()
+    assert os.path.basename(current_dir(str(tmp_path))) == first
+    assert store.versions() == [first]
+
+    store.abort(version_dir)
+    assert not os.path.exists(version_dir)
+
+
+def test_prune_keeps_current_and_running_builds(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    versions = [publish_version(store, str(i)) for i in range(4)]
+    running = store.begin()
+
+    # A build whose process died: its directory exists but nobody holds its lock
+    abandoned = os.path.join(store.versions_dir, "20000101T000000000000Z-1")
+    os.makedirs(abandoned)
+
+    removed = store.prune(keep=2)
+
+    assert sorted(removed) == sorted(versions[:2] + [os.path.basename(abandoned)])
+    assert store.versions() == versions[2:]
+    assert os.path.isdir(running)
+    assert os.path.basename(current_dir(str(tmp_path))) == versions[-1]
+    # Lock files are never deleted
+    locks = os.listdir(os.path.join(store.versions_dir, LOCK_DIR))
+    assert all(f"{v}.lock" in locks for v in versions)
+    store.abort(running)
+
+
+def test_prune_never_removes_current(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    versions = [publish_version(store, str(i)) for i in range(3)]
+    with open(tmp_path / "CURRENT", "w") as f:
+        f.write(versions[0] + "\n")
+
+    removed = store.prune(keep=1)
+
+    assert removed == [versions[1]]
+    assert store.versions() == [versions[0], versions[2]]
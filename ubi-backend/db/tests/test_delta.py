@@ -0,0 +1,113 @@
+import contextlib
+import io
+import os
+
+import pandas as pd
+
+from ubidata.delta import KEY, diff_table, read_snapshot, sql_values
+from ubidata.processor import StatsCanaDataProcessor
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "statscan_data")
+
+
+def snapshot(rows, columns=("value", "status")):
+    frame = pd.DataFrame(rows, columns=KEY + list(columns), dtype=str)
+    return frame.set_index(KEY)
+
+
+def test_diff_table_classifies_rows():
+    previous = snapshot([("2020", "v1", "1.0", ""), ("2021", "v1", "2.0", ""), ("2020", "v2", "5", "E")])
+    current = snapshot([("2020", "v1", "1.0", ""), ("2021", "v1", "2.5", ""), ("2022", "v1", "3.0", "")])
+
+    inserted, updated, deleted = diff_table(previous, current)
+
+    assert list(inserted.index) == [("2022", "v1")]
+    assert list(updated.index) == [("2021", "v1")]
+    assert updated.loc[("2021", "v1"), "value"] == "2.5"
+    assert list(deleted) == [("2020", "v2")]
+
+
+def test_diff_table_flag_and_null_changes_are_updates():
+    previous = snapshot([("2020", "v1", "1.0", ""), ("2021", "v1", "", "x")])
+    current = snapshot([("2020", "v1", "1.0", "E"), ("2021", "v1", "", "x")])
+
+    inserted, updated, deleted = diff_table(previous, current)
+
+    assert inserted.empty and len(deleted) == 0
+    assert list(updated.index) == [("2020", "v1")]
+
+
+def test_diff_table_identical_snapshots():
+    rows = [("2020", "v1", "1.0", ""), ("2021", "v2", "", "..")]
+    inserted, updated, deleted = diff_table(snapshot(rows), snapshot(rows))
+
+    assert inserted.empty and updated.empty and len(deleted) == 0
+
+
+def test_diff_table_new_column_updates_every_row():
+    previous = snapshot([("2020", "v1", "1.0")], columns=("value",))
+    current = snapshot([("2020", "v1", "1.0", "")])
+
+    _, updated, _ = diff_table(previous, current)
+
+    assert list(updated.index) == [("2020", "v1")]
+
+
+def test_diff_table_from_empty_snapshot():
+    previous = pd.DataFrame(columns=KEY).set_index(KEY)
+    current = snapshot([("2020", "v1", "1.0", "")])
+
+    inserted, updated, deleted = diff_table(previous, current)
+
+    assert list(inserted.index) == [("2020", "v1")]
+    assert updated.empty and len(deleted) == 0
+
+
+def test_sql_values_quotes_text_and_nulls_numbers():
+    rows = pd.DataFrame({"year": ["2020", "2021"], "geo": ["Côte-d'Ivoire", "Canada"], "value": ["1.5", ""]})
+
+    assert sql_values(rows, {"year", "value"}) == ["2020, 'Côte-d''Ivoire', 1.5", "2021, 'Canada', NULL"]
+    assert sql_values(rows.iloc[:0], {"year"}) == []
+
+
+def process_federal(csv_path, output_dir):
+    processor = StatsCanaDataProcessor(output_dir=str(output_dir), metrics=False,
+                                       cpi_path=os.path.join(FIXTURES, "cpi_inflation_18100005.csv"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.process_government_finance(str(csv_path), "federal")
+    return read_snapshot(os.path.join(str(output_dir), "snapshot", "federal_finance.csv"))
+
+
+def test_suppressed_cell_does_not_rewrite_the_table(tmp_path):
+    source = os.path.join(FIXTURES, "federal_finance_10100005.csv")
+    previous = process_federal(source, tmp_path / "before")
+
+    # One suppressed cell makes pandas read VALUE as float64 instead of int64
+    df = pd.read_csv(source, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    target = df.index[df["VALUE"].str.fullmatch(r"[1-9]\d*")][0]
+    df.loc[target, ["VALUE", "STATUS"]] = ["", "x"]
+    edited = tmp_path / "federal_finance_10100005.csv"
+    df.to_csv(edited, index=False)
+    current = process_federal(edited, tmp_path / "after")
+
+    inserted, updated, deleted = diff_table(previous, current)
+
+    # Both snapshots write the same numbers the same way
+    pd.testing.assert_series_equal(previous["value"].drop(deleted), current["value"])
+    assert inserted.empty and updated.empty
+    assert list(deleted) == [(df.loc[target, "REF_DATE"], df.loc[target, "VECTOR"])]
+
+
+def test_diff_table_compares_numbers_numerically():
+    previous = snapshot([("2020", "v1", "97511.0", ""), ("2021", "v1", "97512.0", "")])
+    current = snapshot([("2020", "v1", "97511", ""), ("2021", "v1", "97512.5", "")])
+
+    _, updated, _ = diff_table(previous, current)
+
+    assert list(updated.index) == [("2021", "v1")]
+
+
+def test_canonical_numbers():
+    values = pd.Series([97511.0, 0.1 + 0.2, None, "2019/2020"], dtype=object)
+
+    assert StatsCanaDataProcessor.canonical_numbers(values).tolist() == ["97511", "0.3", "", "2019/2020"]
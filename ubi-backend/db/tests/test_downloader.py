@@ -0,0 +1,96 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from ubidata.downloader import StatsCanaDataDownloader
+
+from .wds_stub import WDSStub
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "statscan_data")
+CPI_CSV = "cpi_inflation_18100005.csv"
+
+NEW_VECTOR = 99000001
+SERIES = {
+    NEW_VECTOR: {"vectorId": NEW_VECTOR, "SeriesTitleEn": "Canada;Test products", "memberUomCode": 17,
+                 "scalarFactorCode": 0, "coordinate": "2.999.0.0.0.0.0.0.0.0", "terminated": 0},
+}
+DATA = {
+    # Revises 2000 (95.4 in the fixture), repeats 2022 and has a point outside the requested range
+    41693271: [{"refPer": "2000-01-01", "value": 95.5, "decimals": 1, "frequencyCode": 12},
+               {"refPer": "2022-01-01", "value": 151.2, "decimals": 1, "frequencyCode": 12},
+               {"refPer": "2023-01-01", "value": 157.1, "decimals": 1, "frequencyCode": 12}],
+    NEW_VECTOR: [{"refPer": "2020-01-01", "value": 100, "decimals": 1, "frequencyCode": 12},
+                 {"refPer": "2021-01-01", "value": 101.26, "decimals": 1, "statusCode": 1,
+                  "frequencyCode": 12}],
+}
+
+
+@pytest.fixture
+def wds():
+    with WDSStub(SERIES, DATA) as stub:
+        yield stub
+
+
+@pytest.fixture
+def downloader(tmp_path, wds):
+    shutil.copy(os.path.join(FIXTURES, CPI_CSV), tmp_path / CPI_CSV)
+    downloader = StatsCanaDataDownloader(output_dir=str(tmp_path), base_url=wds.base_url)
+    downloader.priority_tables["inflation"]["vectors"] = ["v41693271", f"v{NEW_VECTOR}"]
+    downloader.vector_batch_size = 1
+    return downloader
+
+
+def test_get_vector_data_batches_requests(downloader, wds):
+    data = downloader.get_vector_data(["v41693271", f"v{NEW_VECTOR}", "v1"], "2000-01-01", "2022-12-31")
+
+    calls = [query for method, query in wds.requests if method == "getDataFromVectorByReferencePeriodRange"]
+    assert [c["vectorIds"] for c in calls] == ['"41693271"', f'"{NEW_VECTOR}"', '"1"']
+    assert all(c["startRefPeriod"] == "2000-01-01" and c["endReferencePeriod"] == "2022-12-31" for c in calls)
+    # The unknown vector's FAILED entry is skipped
+    assert [obj["vectorId"] for obj in data] == [41693271, NEW_VECTOR]
+    assert [p["refPer"] for p in data[0]["vectorDataPoint"]] == ["2000-01-01", "2022-01-01"]
+
+
+def test_vector_rows_describe_new_vectors(downloader):
+    columns = list(pd.read_csv(os.path.join(downloader.output_dir, CPI_CSV), encoding="utf-8-sig", nrows=0).columns)
+    data = downloader.get_vector_data([f"v{NEW_VECTOR}"], "2000-01-01", "2022-12-31")
+
+    rows = downloader._vector_rows(data, downloader.get_series_info([f"v{NEW_VECTOR}"]), columns, {})
+
+    assert [r["REF_DATE"] for r in rows] == ["2020", "2021"]
+    assert [r["VALUE"] for r in rows] == ["100.0", "101.3"]
+    assert [r["STATUS"] for r in rows] == ["", "E"]
+    assert rows[0]["GEO"] == "Canada"
+    assert rows[0]["Products and product groups"] == "Test products"
+    assert rows[0]["UOM"] == "2002=100" and rows[0]["SCALAR_FACTOR"] == "units"
+    assert rows[0]["COORDINATE"] == "2.999"
+    assert list(rows[0]) == columns
+
+
+def test_download_table_vectors_merges_into_csv(downloader, wds):
+    path = os.path.join(downloader.output_dir, CPI_CSV)
+    before = pd.read_csv(path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+
+    assert downloader.download_table_vectors("inflation")
+
+    after = pd.read_csv(path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    assert list(after.columns) == list(before.columns)
+    assert len(after) == len(before) + 2
+    assert not after.duplicated(["REF_DATE", "VECTOR"]).any()
+
+    cells = after.set_index(["VECTOR", "REF_DATE"])["VALUE"]
+    assert cells[("v41693271", "2000")] == "95.5"
+    assert cells[("v41693271", "2022")] == "151.2"
+    assert ("v41693271", "2023") not in cells.index
+    # Untouched vectors keep their rows, and the new vector is appended after them
+    untouched = before[before["VECTOR"] != "v41693271"]
+    pd.testing.assert_frame_equal(after[after["VECTOR"].isin(untouched["VECTOR"])].reset_index(drop=True),
+                                  untouched.reset_index(drop=True))
+    assert list(after["VECTOR"].iloc[-2:]) == [f"v{NEW_VECTOR}"] * 2
+    assert list(dict.fromkeys(after["VECTOR"]))[:-1] == list(dict.fromkeys(before["VECTOR"]))
+
+    # Descriptive columns were looked up only for the vector the CSV did not have
+    lookups = [body for method, body in wds.requests if method == "getSeriesInfoFromVector"]
+    assert lookups == [[{"vectorId": NEW_VECTOR}]]
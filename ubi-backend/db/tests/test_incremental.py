@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from ubidata.incremental import ScenarioGraph, parse_sweep
+from ubidata.popcube import open_cube, write_cube
+from ubidata.scenario import (DEFAULT_PARAMETERS, age_counts, calculate_ubi_feasibility, economic_context,
+                              population_breakdown)
+
+NODES = ["ageCounts", "economics", "population", "costs", "taxation", "netUbiCost", "gdpPercentage",
+         "budgetPercentage", "feasibility"]
+
+
+@pytest.fixture
+def cube_path(tmp_path):
+    data = np.zeros((2, 1, 1, 101), dtype="<i4")
+    for i in range(2):
+        data[i, 0, 0, 1:] = 300_000 + 1000 * np.arange(1, 101) + 20_000 * i
+        data[i, 0, 0, 0] = data[i, 0, 0, 1:].sum()
+    return write_cube(str(tmp_path / "population.cube"), data, [2020, 2021], ["Canada"], ["Both sexes"],
+                      list(range(101)))
+
+
+def full_evaluation(cube, parameters):
+    """The non-incremental path: every sub-result computed from scratch"""
+    population = population_breakdown(age_counts(cube, parameters["year"]), parameters["childAgeCutoff"],
+                                      parameters["adultAgeCutoff"], parameters["seniorAgeCutoff"])
+    return calculate_ubi_feasibility(parameters, population, economic_context(parameters["year"]))
+
+
+def assert_matches(result, expected):
+    for key in ("netUbiCost", "gdpPercentage", "budgetPercentage"):
+        assert result[key] == pytest.approx(float(expected[key]), rel=1e-12)
+    assert result["costs"] == pytest.approx({k: float(v) for k, v in expected["costs"].items()}, rel=1e-12)
+    assert result["taxation"]["totalTaxRevenue"] == pytest.approx(float(expected["taxation"]["totalTaxRevenue"]))
+    assert result["feasibility"] == expected["feasibility"]
+
+
+def test_first_evaluation_computes_every_node(cube_path):
+    graph = ScenarioGraph(cube_path)
+    parameters = dict(DEFAULT_PARAMETERS, year=2020)
+
+    result = graph.evaluate(parameters)
+
+    assert graph.last_report["recomputed"] == NODES and graph.last_report["reused"] == []
+    assert_matches(result, full_evaluation(open_cube(cube_path), parameters))
+
+
+def test_tax_change_recomputes_only_dependent_nodes(cube_path):
+    graph = ScenarioGraph(cube_path)
+    parameters = dict(DEFAULT_PARAMETERS, year=2020)
+    graph.evaluate(parameters)
+
+    parameters["taxPercentage"] = 35
+    result = graph.evaluate(parameters)
+
+    report = graph.last_report
+    assert report["changed"] == ["taxPercentage"]
+    assert report["recomputed"] == ["taxation", "netUbiCost", "gdpPercentage", "budgetPercentage", "feasibility"]
+    assert report["reused"] == ["ageCounts", "economics", "population", "costs"]
+    assert_matches(result, full_evaluation(open_cube(cube_path), parameters))
+
+
+def test_unchanged_recompute_stops_propagation(cube_path):
+    graph = ScenarioGraph(cube_path)
+    parameters = dict(DEFAULT_PARAMETERS, year=2020, seniorBonus=0)
+    graph.evaluate(parameters)
+
+    # Seniors and adults get the same UBI and pay the same tax, so only the population split moves
+    parameters["seniorAgeCutoff"] = 70
+    result = graph.evaluate(parameters)
+
+    report = graph.last_report
+    assert report["recomputed"] == ["population", "costs", "taxation"]
+    assert report["unchanged"] == ["costs", "taxation"]
+    assert "netUbiCost" in report["reused"]
+    assert_matches(result, full_evaluation(open_cube(cube_path), parameters))
+
+
+def test_a_sequence_of_edits_matches_full_evaluation(cube_path):
+    graph = ScenarioGraph(cube_path)
+    cube = open_cube(cube_path)
+    parameters = dict(DEFAULT_PARAMETERS, year=2020)
+    edits = [{"adultUbiAmount": 18000}, {"childAgeCutoff": 16, "adultAgeCutoff": 16}, {"year": 2021},
+             {"exemptionAmount": 20000}, {"seniorBonus": 300}, {"youthUbiAmount": 100, "adultAgeCutoff": 21},
+             {"year": 2020, "taxPercentage": 45}]
+
+    for edit in edits:
+        parameters.update(edit)
+        result = graph.evaluate(parameters)
+        assert_matches(result, full_evaluation(cube, parameters))
+        assert_matches(result, ScenarioGraph(cube_path).evaluate(dict(parameters)))
+
+    assert graph.last_report["recomputed"][:2] == ["ageCounts", "economics"]  # A year change reaches the leaves
+
+
+def test_parse_sweep():
+    assert parse_sweep("taxPercentage=30,35; adultUbiAmount=1.5") == [{"taxPercentage": 30}, {"taxPercentage": 35},
+                                                                     {"adultUbiAmount": 1.5}]
+    assert parse_sweep(None) == parse_sweep("") == []
@@ -0,0 +1,58 @@
+import contextlib
+import io
+
+import pytest
+
+from ubidata.interpolation import PopulationInterpolator
+
+
+def interpolator(tmp_path, rows):
+    path = tmp_path / "census.csv"
+    path.write_text("Year Code;Age;Total\n" + "".join(f"{code};{age};{total}\n" for code, age, total in rows))
+    result = PopulationInterpolator()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert result.load_census_data(str(path))
+    return result
+
+
+@pytest.fixture
+def census(tmp_path):
+    """Age 30 rises by 500 between each census; age 31 falls; ages past 99 roll into 99"""
+    rows = []
+    for i, code in enumerate((2, 7, 12, 17, 22)):
+        rows += [(code, 30, 10000 + 500 * i), (code, 31, 8000 - 250 * i), (code, 99, 40), (code, 100, 2)]
+    return interpolator(tmp_path, rows)
+
+
+def test_census_years_reproduce_the_source(census):
+    for i, year in enumerate((2002, 2007, 2012, 2017, 2022)):
+        assert census.interpolate_population(year, 30) == 10000 + 500 * i
+        assert census.interpolate_population(year, 31) == 8000 - 250 * i
+        assert census.interpolate_population(year, 99) == 42
+
+
+def test_years_between_censuses_are_linear(census):
+    assert census.interpolate_population(2010, 30) == 10500 + 3 * 100
+    assert census.interpolate_population(2010, 31) == 7750 - 3 * 50
+    # Never outside the two censuses around the year
+    for year in range(2002, 2023):
+        assert 10000 <= census.interpolate_population(year, 30) <= 12000
+        assert 7000 <= census.interpolate_population(year, 31) <= 8000
+
+
+def test_no_extrapolation_past_the_target_years(census):
+    for year in (1999, 2023, 2030):
+        with pytest.raises(ValueError, match="outside the interpolated years 2000-2022"):
+            census.interpolate_population(year, 30)
+
+
+def test_years_before_the_first_census_follow_its_trend_and_stay_non_negative(tmp_path):
+    census = interpolator(tmp_path, [(2, 30, 1000), (7, 30, 2000), (2, 31, 10), (7, 31, 5000)])
+
+    assert census.interpolate_population(2000, 30) == 600
+    assert census.interpolate_population(2000, 31) == 0
+
+
+def test_age_0_checksum_is_the_sum_of_ages(census):
+    assert census.calculate_age_0_checksum(2010) == sum(census.interpolate_population(2010, age)
+                                                         for age in range(1, 100))
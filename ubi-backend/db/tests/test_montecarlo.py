@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from ubidata.montecarlo import PERCENTILES, ErrorModel, MonteCarloEngine
+from ubidata.popcube import write_cube
+from ubidata.scenario import DEFAULT_PARAMETERS, FEASIBILITY_LEVELS
+
+
+@pytest.fixture
+def cube_path(tmp_path):
+    data = np.zeros((1, 1, 1, 101), dtype="<i4")
+    data[0, 0, 0, 1:] = 400_000
+    data[0, 0, 0, 0] = data[0, 0, 0, 1:].sum()
+    return write_cube(str(tmp_path / "population.cube"), data, [2020], ["Canada"], ["Both sexes"],
+                      list(range(101)))
+
+
+def engine(cube_path, tmp_path, seed=7, workers=1, batch_size=1000, error_model=None):
+    return MonteCarloEngine(dict(DEFAULT_PARAMETERS, year=2020), cube_path=cube_path,
+                            census_path=str(tmp_path / "no-census.csv"), error_model=error_model,
+                            batch_size=batch_size, workers=workers, seed=seed)
+
+
+def test_seeded_runs_are_deterministic(cube_path, tmp_path):
+    first = engine(cube_path, tmp_path).run(3000)
+    again = engine(cube_path, tmp_path).run(3000)
+    pooled = engine(cube_path, tmp_path, workers=2).run(3000)
+    other = engine(cube_path, tmp_path, seed=8).run(3000)
+
+    for key in first:
+        assert len(first[key]) == 3000
+        np.testing.assert_array_equal(first[key], again[key])
+        # Each batch has its own seed, so the process pool does not change the draws
+        np.testing.assert_array_equal(first[key], pooled[key])
+    assert not np.array_equal(first["netUbiCost"], other["netUbiCost"])
+
+
+def test_percentiles_are_ordered_and_bracket_the_point_estimate(cube_path, tmp_path):
+    mc = engine(cube_path, tmp_path)
+    summary = mc.summarize(mc.run(5000))
+    point = mc.point_estimate()
+
+    for key in ("grossUbiCost", "totalTaxRevenue", "netUbiCost", "gdpPercentage", "budgetPercentage"):
+        values = [summary[key][f"p{p}"] for p in PERCENTILES]
+        assert values == sorted(values)
+    assert summary["netUbiCost"]["p5"] < point["netUbiCost"] < summary["netUbiCost"]["p95"]
+    assert set(summary["feasibility"]) == set(FEASIBILITY_LEVELS)
+    assert sum(summary["feasibility"].values()) == pytest.approx(1.0)
+
+
+def test_without_error_every_draw_is_the_point_estimate(cube_path, tmp_path):
+    mc = engine(cube_path, tmp_path, error_model=ErrorModel(population_sd=0, interpolation_sd_per_year=0,
+                                                            income_sd=0, gdp_sd=0))
+    samples = mc.run(100)
+
+    np.testing.assert_allclose(samples["netUbiCost"], mc.point_estimate()["netUbiCost"], rtol=1e-12)
+
+
+def test_population_error_grows_away_from_census_years():
+    model = ErrorModel(population_sd=0.005, interpolation_sd_per_year=0.003)
+    census_years = [2002, 2007, 2012]
+
+    assert model.population_sd_for(2007, census_years) == 0.005
+    assert model.population_sd_for(2009, census_years) == pytest.approx(0.011)
+    assert model.population_sd_for(2009, census_years) > model.population_sd_for(2008, census_years)
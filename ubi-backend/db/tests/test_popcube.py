@@ -0,0 +1,103 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from ubidata.interpolation import PopulationInterpolator
+from ubidata.popcube import CUBE_ALIGN, CUBE_HEADER, CUBE_MAGIC, CUBE_VERSION, cube_from_rows, open_cube, write_cube
+
+DB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE = os.path.join(DB_DIR, "population-id-age.csv")
+CUBE_JS = os.path.join(os.path.dirname(DB_DIR), "models", "population-cube.js")
+
+
+def census_cells():
+    """{(year, age): population} from the census CSV (year codes are years since 2000)"""
+    with open(SOURCE) as f:
+        reader = csv.reader(f, delimiter=";")
+        next(reader)
+        return {(2000 + int(code), int(age)): int(total) for code, age, total in reader}
+
+
+@pytest.fixture(scope="module")
+def cube_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("cube") / "population-canada.cube")
+    interpolator = PopulationInterpolator(round_to_thousands=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert interpolator.load_census_data(SOURCE)
+        assert interpolator.generate_cube(path)
+    return path
+
+
+def test_header_and_shape(cube_path):
+    with open(cube_path, "rb") as f:
+        magic, version, ndim, *shape, labels_offset, labels_length, data_offset = CUBE_HEADER.unpack(
+            f.read(CUBE_HEADER.size))
+
+    cube = open_cube(cube_path)
+
+    assert (magic, version, ndim) == (CUBE_MAGIC, CUBE_VERSION, 4)
+    assert tuple(shape) == cube.shape == (23, 1, 1, 100)
+    assert labels_offset == CUBE_HEADER.size and data_offset % CUBE_ALIGN == 0
+    assert data_offset >= labels_offset + labels_length
+    assert os.path.getsize(cube_path) == data_offset + 4 * int(np.prod(shape))
+    assert cube.years == list(range(2000, 2023))
+    assert (cube.geographies, cube.sexes, cube.ages) == (["Canada"], ["Both sexes"], list(range(100)))
+
+
+def test_census_years_match_the_source_csv(cube_path):
+    cube = open_cube(cube_path)
+    census = census_cells()
+
+    for year in (2002, 2012, 2022):
+        for age in (1, 18, 45, 65, 90):
+            assert cube.get(year, age, "Canada", "Both sexes") == census[(year, age)]
+        # Age 0 holds the total, which is the sum of the single ages
+        assert cube.get(year, 0) == int(cube.data[cube.index(year, 0)[:3]][1:].sum())
+    assert cube.age_range(2017, 18, 64) == sum(census[(2017, age)] for age in range(18, 65))
+
+
+def test_cube_from_rows_round_trip(tmp_path):
+    rows = [(2021, "Canada", "Both sexes", 0, 30), (2021, "Canada", "Both sexes", 1, 10),
+            (2021, "Canada", "Both sexes", 2, 20), (2020, "Canada", "Both sexes", 2, 7)]
+    data, labels = cube_from_rows(rows)
+
+    cube = open_cube(write_cube(str(tmp_path / "small.cube"), data, **labels))
+
+    assert cube.years == [2020, 2021] and cube.ages == [0, 1, 2]
+    assert cube.get(2021, 2) == 20
+    assert cube.get(2020, 1) == 0  # Missing cells are 0
+    assert cube.age_range(2021, 0, 99) == 30  # The age 0 total is never added in
+
+
+def test_rejects_files_that_are_not_cubes(tmp_path):
+    path = tmp_path / "bad.cube"
+    path.write_bytes(b"UBIPOPC")
+    with pytest.raises(ValueError, match="too short"):
+        open_cube(str(path))
+    path.write_bytes(b"NOTACUBE" + bytes(CUBE_HEADER.size - 8))
+    with pytest.raises(ValueError, match="not a population cube"):
+        open_cube(str(path))
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_node_reader_matches_python(cube_path):
+    script = ("const { loadPopulationCube } = require(process.argv[1]);"
+              "const cube = loadPopulationCube(process.argv[2]);"
+              "console.log(JSON.stringify({shape: cube.shape, years: cube.years,"
+              " cells: [[2002, 1], [2012, 45], [2022, 90], [2010, 0]].map(([y, a]) => cube.get(y, a)),"
+              " adults: cube.ageRange(2017, 18, 64)}));")
+    result = json.loads(subprocess.run(["node", "-e", script, CUBE_JS, cube_path], check=True,
+                                       capture_output=True, text=True).stdout)
+
+    cube = open_cube(cube_path)
+    assert result["shape"] == list(cube.shape)
+    assert result["years"] == cube.years
+    assert result["cells"] == [cube.get(2002, 1), cube.get(2012, 45), cube.get(2022, 90), cube.get(2010, 0)]
+    assert result["adults"] == cube.age_range(2017, 18, 64)
@@ -0,0 +1,178 @@
+import contextlib
+import io
+import os
+import re
+import sqlite3
+
+import pandas as pd
+
+from ubidata.processor import StatsCanaDataProcessor
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "statscan_data")
+FINANCE = os.path.join(FIXTURES, "federal_finance_10100005.csv")
+CPI = os.path.join(FIXTURES, "cpi_inflation_18100005.csv")
+
+
+def federal_sql(output_dir, csv_path=FINANCE, star_schema=False):
+    processor = StatsCanaDataProcessor(output_dir=str(output_dir), metrics=False, star_schema=star_schema,
+                                       cpi_path=CPI)
+    with contextlib.redirect_stdout(io.StringIO()):
+        path = processor.process_government_finance(str(csv_path), "federal")
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_keyed_ddl(tmp_path):
+    sql = federal_sql(tmp_path)
+
+    assert "CREATE TABLE IF NOT EXISTS federal_finance (" in sql
+    assert "    PRIMARY KEY (year, vector)\n);" in sql
+    assert ("CREATE INDEX IF NOT EXISTS federal_finance_year_idx ON federal_finance (year) "
+            "INCLUDE (value, value_real);") in sql
+    assert ("CREATE INDEX IF NOT EXISTS federal_finance_year_geo_idx ON federal_finance (year, geography) "
+            "INCLUDE (value, value_real);") in sql
+
+    conflicts = re.findall(r"ON CONFLICT \(year, vector\) DO UPDATE SET (.*)\nWHERE \((.*)\) IS DISTINCT FROM "
+                           r"\((.*)\);", sql)
+    assert conflicts
+    updates, current, excluded = conflicts[0]
+    columns = [part.split(" = ")[0] for part in updates.split(", ")]
+    assert "year" not in columns and "vector" not in columns and "value" in columns
+    assert current.split(", ") == [f"federal_finance.{col}" for col in columns]
+    assert excluded.split(", ") == [f"EXCLUDED.{col}" for col in columns]
+
+
+def test_star_ddl_uses_integer_ids(tmp_path):
+    sql = federal_sql(tmp_path, star_schema=True)
+
+    dimensions = re.findall(r"CREATE TABLE IF NOT EXISTS (federal_finance_dim_\w+) \(\n(?:.*\n)*?    id (\w+) "
+                            r"PRIMARY KEY,", sql)
+    assert dimensions and {id_type for _, id_type in dimensions} == {"INT"}
+    for dim_table, _ in dimensions:
+        column = dim_table[len("federal_finance_dim_"):]
+        assert f"    {column}_id INT NOT NULL REFERENCES {dim_table} (id)" in sql
+    assert "    PRIMARY KEY (year, vector)\n);" in sql
+    assert "ON CONFLICT (year, vector) DO UPDATE SET" in sql
+
+
+def load(connection, sql):
+    """Run a keyed SQL file in SQLite; it has no INCLUDE indexes, so those are left out"""
+    statements = "\n".join(line for line in sql.split("\n") if not line.startswith("CREATE INDEX"))
+    before = connection.total_changes
+    connection.executescript(statements)
+    return connection.total_changes - before
+
+
+def test_reapplying_an_unchanged_load_is_a_no_op(tmp_path):
+    sql = federal_sql(tmp_path / "first")
+    connection = sqlite3.connect(":memory:")
+
+    rows = load(connection, sql)
+    assert rows == connection.execute("SELECT COUNT(*) FROM federal_finance").fetchone()[0] > 0
+
+    # Same file again: every row conflicts and none of them differs, so nothing is written
+    assert load(connection, sql) == 0
+
+    # One edited value rewrites just that row
+    df = pd.read_csv(FINANCE, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    target = df.index[df["VALUE"].str.fullmatch(r"[1-9]\d*")][0]
+    df.loc[target, "VALUE"] = str(int(df.loc[target, "VALUE"]) + 1)
+    edited = tmp_path / "federal_finance_10100005.csv"
+    df.to_csv(edited, index=False)
+
+    assert load(connection, federal_sql(tmp_path / "second", edited)) == 1
+    assert connection.execute("SELECT COUNT(*) FROM federal_finance").fetchone()[0] == rows
+
+
+def small_cpi(path, skip=()):
+    """Canada all-items CPI: monthly in 2002 (averaging 100), annual 2008-2023 rising 2 points a year,
+    plus rows of other series the deflator must ignore"""
+    rows = [("2002-01", "Canada", "All-items", 99.0), ("2002-07", "Canada", "All-items", 101.0),
+            ("2002", "Ontario", "All-items", 500.0), ("2002", "Canada", "Food", 500.0)]
+    rows += [(str(year), "Canada", "All-items", 100.0 + 2 * (year - 2002)) for year in range(2008, 2024)
+             if year not in skip]
+    pd.DataFrame(rows, columns=["REF_DATE", "GEO", "Products and product groups", "VALUE"]).to_csv(path, index=False)
+    return str(path)
+
+
+def test_deflators_rebase_to_the_base_year(tmp_path):
+    cpi = small_cpi(tmp_path / "cpi.csv")
+    processor = StatsCanaDataProcessor(output_dir=str(tmp_path), metrics=False, cpi_path=cpi)
+    frame = pd.DataFrame({"REF_DATE": ["2002", "2010", "2010"], "VALUE": [500.0, 1160.0, 1160.0],
+                          "UOM": ["Dollars", "Dollars", "Percent"]})
+
+    deflators = processor.deflators()
+    real = processor.add_real_dollars("federal_finance", frame)["VALUE_REAL"]
+
+    assert deflators[2002] == 1.0
+    assert deflators[2010] == 100 / 116
+    assert real[0] == 500.0  # Base-year dollars are already constant
+    assert real[1] == 1000.0
+    assert pd.isna(real[2])  # Not a dollar amount
+
+
+def test_fiscal_years_use_the_cpi_of_the_year_they_start(tmp_path):
+    cpi = small_cpi(tmp_path / "cpi.csv")
+    processor = StatsCanaDataProcessor(output_dir=str(tmp_path), metrics=False, cpi_path=cpi)
+    frame = pd.DataFrame({"REF_DATE": ["2010/2011", "2010", "2011"], "VALUE": [1160.0] * 3, "UOM": ["Dollars"] * 3})
+
+    real = processor.add_real_dollars("federal_finance", frame)["VALUE_REAL"]
+
+    assert real[0] == real[1] == 1000.0
+    assert real[2] == round(1160 * 100 / 118, 2)
+
+
+def test_year_without_cpi_is_null(tmp_path):
+    cpi = small_cpi(tmp_path / "cpi.csv", skip={2015})
+    processor = StatsCanaDataProcessor(output_dir=str(tmp_path / "out"), metrics=False, cpi_path=cpi)
+    with contextlib.redirect_stdout(io.StringIO()):
+        path = processor.process_government_finance(FINANCE, "federal")
+
+    connection = sqlite3.connect(":memory:")
+    with open(path, encoding="utf-8") as f:
+        load(connection, f.read())
+    missing = connection.execute("SELECT COUNT(*), COUNT(value_real) FROM federal_finance WHERE year = 2015").fetchone()
+    present = connection.execute("SELECT COUNT(*), COUNT(value_real), SUM(value_real = 0) FROM federal_finance "
+                                 "WHERE year = 2014").fetchone()
+    assert missing[0] > 0 and missing[1] == 0  # NULL, not 0 or a 'nan' string
+    assert present[0] == present[1] and present[2] == 0
+
+    snapshot = pd.read_csv(os.path.join(str(tmp_path / "out"), "snapshot", "federal_finance.csv"), dtype=str,
+                           keep_default_na=False)
+    assert set(snapshot.loc[snapshot["year"] == "2015", "value_real"]) == {""}
+
+
+def test_finance_rollup_sums_children_and_skips_suppressed_cells(tmp_path):
+    processor = StatsCanaDataProcessor(output_dir=str(tmp_path), metrics=False, real_dollars=False)
+    nan = float("nan")
+    rows = [
+        # 701 is published; its total is the published value
+        ("2020", "General public services [701]", 10.0, ""),
+        ("2020", "Executive and legislative organs [7011]", 6.0, ""),
+        ("2020", "Foreign economic aid [7012]", 4.0, ""),
+        # 710 is not published; family and children is suppressed, so it is the sum of the other two
+        ("2020", "Social protection [710]", nan, ".."),
+        ("2020", "Old age [7102]", 50.0, ""),
+        ("2020", "Family and children [7104]", nan, "x"),
+        ("2020", "Social exclusion n.e.c. [7107]", 7.0, ""),
+        # In 2021 every social protection cell is suppressed
+        ("2021", "General public services [701]", 12.0, ""),
+        ("2021", "Old age [7102]", nan, "x"),
+        ("2021", "Social exclusion n.e.c. [7107]", nan, "x"),
+    ]
+    df = pd.DataFrame(rows, columns=["REF_DATE", processor.function_column, "VALUE", "STATUS"]).assign(
+        GEO="Canada", UOM="Dollars", **{processor.component_column: "Federal general government"})
+
+    rollup, index = processor.finance_rollup(df)
+    totals = rollup.set_index(["year", "function_code"])["VALUE"]
+
+    assert totals[("2020", "701")] == 10.0
+    assert totals[("2020", "710")] == 57.0
+    assert totals[("2020", "ALL")] == totals[("2020", "701")] + totals[("2020", "710")]
+    assert totals[("2020", "UBI")] == 57.0
+    assert totals[("2021", "ALL")] == 12.0
+    assert ("2021", "710") not in totals.index  # Nothing published: no row rather than 0 or NaN
+    assert not rollup["VALUE"].isna().any()
+    assert set(rollup["level"]) == {0, 1}
+    assert set(rollup["unit"]) == {"Dollars"}
+    assert index.validate() == []
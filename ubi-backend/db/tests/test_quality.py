@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from ubidata.quality import QualityGate
+
+
+def table(rows):
+    return pd.DataFrame(rows, columns=["REF_DATE", "VECTOR", "VALUE", "STATUS", "SCALAR_FACTOR", "SCALAR_ID",
+                                       "DECIMALS"])
+
+
+def test_clean_table_passes():
+    df = table([("2020", "v1", "10.0", "", "units", "0", "1"), ("2021", "v1", "11.0", "", "units", "0", "1")])
+
+    cleaned, report = QualityGate().check(df)
+
+    assert report["passed"] and report["errors"] == 0 and report["warnings"] == 0
+    assert cleaned["VALUE"].tolist() == [10.0, 11.0]
+
+
+def test_values_are_put_on_the_common_scale():
+    df = table([("2020", "v1", "1500", "", "thousands", "3", "0"),
+                ("2021", "v1", "1600", "", "thousands", "3", "0"),
+                ("2020", "v2", "1.2", "", "millions", "6", "1")])
+
+    cleaned, report = QualityGate().check(df)
+
+    assert report["scale"] == {"factor": "thousands", "rescaled_rows": 1, "unknown_rows": 0}
+    assert cleaned["VALUE"].tolist() == [1500.0, 1600.0, 1200.0]
+    assert cleaned["SCALAR_FACTOR"].tolist() == ["thousands"] * 3
+    assert cleaned["DECIMALS"].tolist() == [0, 0, 0]
+    assert report["passed"]
+
+
+def test_unknown_scale_fails():
+    df = table([("2020", "v1", "1", "", "dozens", "", "0"), ("2020", "v2", "1", "", "units", "0", "0")])
+    df = df.drop(columns="SCALAR_ID")
+
+    _, report = QualityGate().check(df)
+
+    assert report["scale"]["unknown_rows"] == 1
+    assert not report["passed"]
+
+
+def test_unusable_status_nulls_value():
+    df = table([("2020", "v1", "5.0", "x", "units", "0", "1"), ("2021", "v1", "", "..", "units", "0", "1"),
+                ("2022", "v1", "7.0", "E", "units", "0", "1"), ("2023", "v1", "", "", "units", "0", "1")])
+
+    cleaned, report = QualityGate().check(df)
+
+    assert np.isnan(cleaned["VALUE"].iloc[0])
+    assert cleaned["VALUE"].iloc[2] == 7.0  # Quality grades are kept
+    assert report["status"] == {"x": 1, "..": 1, "E": 1}
+    assert report["unusable_rows"] == 2
+    assert report["unusable_with_value"] == 1
+    assert report["missing_unflagged"] == 1
+    assert report["passed"]
+
+
+def test_conflicting_duplicates_fail():
+    df = table([("2020", "v1", "1.0", "", "units", "0", "1"), ("2020", "v1", "1.0", "", "units", "0", "1"),
+                ("2021", "v1", "2.0", "", "units", "0", "1"), ("2021", "v1", "2.5", "", "units", "0", "1")])
+
+    _, report = QualityGate().check(df)
+
+    duplicates = report["duplicates"]
+    assert duplicates["rows"] == 4 and duplicates["keys"] == 2
+    assert duplicates["conflicting_keys"] == 1
+    assert duplicates["examples"] == [{"REF_DATE": "2021", "VECTOR": "v1"}]
+    assert not report["passed"]
+
+
+def test_outliers_are_reported_not_changed():
+    df = table([("2020", "v1", "10", "", "units", "0", "0"), ("2021", "v1", "1000", "", "units", "0", "0"),
+                ("2022", "v1", "900", "", "units", "0", "0"), ("2020", "v2", "10", "", "units", "0", "0")])
+
+    cleaned, report = QualityGate(outlier_ratio=10).check(df)
+
+    assert report["outliers"]["count"] == 1
+    example = report["outliers"]["examples"][0]
+    assert (example["VECTOR"], example["from"], example["to"]) == ("v1", "2020", "2021")
+    assert example["ratio"] == 100.0
+    assert cleaned["VALUE"].tolist() == [10.0, 1000.0, 900.0, 10.0]
+    assert report["passed"] and report["warnings"] == 1
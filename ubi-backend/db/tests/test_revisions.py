@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ubidata.revisions import open_revisions
+
+TABLE = "18100005"
+
+
+def release(cells):
+    """Table rows for (vector, year, value, status) cells"""
+    return pd.DataFrame([{"REF_DATE": str(year), "VECTOR": vector, "VALUE": "" if value is None else str(value),
+                          "STATUS": status} for vector, year, value, status in cells])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_revisions(str(tmp_path / "revisions"))
+    store.record(release([("v1", 2020, 100.0, ""), ("v1", 2021, 101.0, "E"), ("v2", 2020, 5.0, "")]),
+                 TABLE, "2023-01-15")
+    store.record(release([("v1", 2020, 100.0, ""), ("v1", 2021, 101.5, ""), ("v1", 2022, 103.0, "")]),
+                 TABLE, "2024-01-15")
+    return store
+
+
+def test_second_release_stores_only_the_delta(store):
+    first, second = store.table_releases(TABLE)
+    assert (first["added"], first["length"]) == (3, 3)
+    assert (second["added"], second["revised"], second["removed"]) == (1, 1, 1)
+    assert second["length"] == 3  # 2022 added, 2021 revised, v2 tombstoned; 2020 unchanged
+    assert store.storage()["records"] == 6
+
+
+def test_value_as_of(store):
+    assert store.value_as_of("v1", 2021, "2023-06-30") == 101.0
+    assert store.value_as_of("v1", 2021, "2024-01-15") == 101.5  # A bare date includes that whole day
+    assert store.value_as_of("v1", 2021) == 101.5
+    assert store.value_as_of("v1", 2022, "2023-12-31") is None
+    assert store.value_as_of("v1", 2021, "2022-12-31") is None
+
+
+def test_removed_cells_are_tombstoned(store):
+    assert store.value_as_of("v2", 2020, "2023-12-31") == 5.0
+    assert store.value_as_of("v2", 2020) is None
+    assert store.series_as_of("v2").empty
+
+    history = store.history("v2", 2020)
+    assert history["released"].tolist() == ["2023-01-15T00:00:00", "2024-01-15T00:00:00"]
+    assert history["removed"].tolist() == [False, True]
+
+
+def test_table_as_of(store):
+    old = store.table_as_of(TABLE, "2023-12-31")
+    assert list(zip(old["VECTOR"], old["REF_DATE"], old["VALUE"], old["STATUS"])) == [
+        ("v1", "2020", 100.0, ""), ("v1", "2021", 101.0, "E"), ("v2", "2020", 5.0, "")]
+
+    new = store.table_as_of(TABLE)
+    assert list(zip(new["VECTOR"], new["REF_DATE"], new["VALUE"])) == [
+        ("v1", "2020", 100.0), ("v1", "2021", 101.5), ("v1", "2022", 103.0)]
+    assert store.table_as_of(TABLE, "2020-01-01").empty
+
+
+def test_partial_release_leaves_missing_cells(store):
+    stats = store.record(release([("v1", 2022, 104.0, "")]), TABLE, "2024-02-01", partial=True)
+
+    assert stats["recorded"] and stats["removed"] == 0 and stats["revised"] == 1
+    assert store.value_as_of("v1", 2020) == 100.0
+    assert store.value_as_of("v1", 2022) == 104.0
+
+
+def test_unchanged_release_is_not_stored(store):
+    stats = store.record(release([("v1", 2020, 100.0, ""), ("v1", 2021, 101.5, ""), ("v1", 2022, 103.0, "")]),
+                         TABLE, "2024-03-01")
+
+    assert not stats["recorded"]
+    assert len(store.table_releases(TABLE)) == 2
+
+
+def test_releases_must_be_in_date_order(store):
+    with pytest.raises(ValueError):
+        store.record(release([("v1", 2020, 1.0, "")]), TABLE, "2023-06-01")
+    assert len(store.table_releases(TABLE)) == 2
+
+
+def test_suppressed_values_are_kept_as_nan(store):
+    store.record(release([("v1", 2020, None, "x"), ("v1", 2021, 101.5, ""), ("v1", 2022, 103.0, "")]),
+                 TABLE, "2024-04-01")
+
+    assert np.isnan(store.value_as_of("v1", 2020))
+    assert store.series_as_of("v1")["STATUS"].tolist() == ["x", "", ""]
+    assert store.value_as_of("v1", 2020, "2024-03-31") == 100.0
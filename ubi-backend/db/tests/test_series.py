@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ubidata.series import capacity_for, open_store
+
+TABLE = "18100005"
+
+
+def rows(cells, geo="Canada"):
+    """StatsCan rows for (vector, year, value) cells"""
+    return pd.DataFrame([{"REF_DATE": str(year), "GEO": geo, "Products and product groups": f"Product {vector}",
+                          "UOM": "2002=100", "SCALAR_FACTOR": "units", "VECTOR": vector, "COORDINATE": "1.1",
+                          "VALUE": str(value), "STATUS": "", "DECIMALS": "1"}
+                         for vector, year, value in cells])
+
+
+def years(vector, first, last, value=100.0):
+    return [(vector, year, value + year - first) for year in range(first, last + 1)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_store(str(tmp_path / "series"))
+    store.ingest(rows(years("v1", 2000, 2002) + years("v2", 2000, 2002) + years("v3", 2000, 2002)), TABLE)
+    return store
+
+
+def test_first_ingest_allocates_spare_capacity(store):
+    assert store.index["end"] == 3 * int(capacity_for(np.array([3]))[0])
+    assert store.vectors["v1"]["capacity"] == 7 and store.vectors["v1"]["length"] == 3
+    assert store.read("v2")["VALUE"].tolist() == [100.0, 101.0, 102.0]
+
+
+def test_new_periods_are_written_in_place(store):
+    before = {v: dict(store.vectors[v]) for v in ("v1", "v2")}
+    end = store.index["end"]
+
+    stats = store.ingest(rows(years("v1", 2000, 2004) + years("v2", 2000, 2002)), TABLE)
+
+    assert stats["appended"] == 2 and stats["relocated"] == 0 and stats["unchanged"] == 1
+    assert store.index["end"] == end and store.index["garbage"] == 0
+    assert store.vectors["v1"]["offset"] == before["v1"]["offset"]
+    assert store.vectors["v1"]["length"] == 5
+    assert store.vectors["v2"] == before["v2"]
+    assert store.read("v1")["REF_DATE"].tolist() == ["2000", "2001", "2002", "2003", "2004"]
+
+
+def test_revisions_relocate_the_run(store):
+    offset, end = store.vectors["v1"]["offset"], store.index["end"]
+
+    stats = store.ingest(rows([("v1", 2001, 555.5)]), TABLE)
+
+    assert stats["revised"] == 1 and stats["relocated"] == 1
+    assert store.vectors["v1"]["offset"] == end
+    assert store.index["garbage"] == 7
+    assert store.read("v1")["VALUE"].tolist() == [100.0, 555.5, 102.0]
+    # The old run is left as it was for readers still using the previous index
+    assert store.data[offset + 1]["value"] == 101.0
+
+
+def test_overflow_and_backfill_relocate(store):
+    stats = store.ingest(rows(years("v1", 2003, 2010)), TABLE)
+    assert stats["appended"] == 8 and stats["relocated"] == 1
+    assert store.vectors["v1"]["capacity"] == int(capacity_for(np.array([11]))[0])
+
+    # A period before the last stored one cannot be appended in place
+    stats = store.ingest(rows([("v2", 1999, 99.0)]), TABLE)
+    assert stats["relocated"] == 1
+    assert store.read("v2")["REF_DATE"].tolist() == ["1999", "2000", "2001", "2002"]
+
+
+def test_unchanged_ingest_writes_nothing(store):
+    index = dict(store.index)
+    stats = store.ingest(rows(years("v1", 2000, 2002)), TABLE)
+
+    assert stats["unchanged"] == 1 and stats["appended"] == 0 and stats["revised"] == 0
+    assert store.index["end"] == index["end"]
+
+
+def test_open_readers_keep_their_snapshot(store):
+    reader = open_store(store.path)
+    store.ingest(rows(years("v1", 2000, 2003)), TABLE)
+
+    assert len(reader.read("v1")) == 3
+    reader.refresh()
+    assert len(reader.read("v1")) == 4
+
+
+def test_compact_reclaims_relocated_runs(store):
+    store.ingest(rows([("v1", 2001, 1.0)]), TABLE)
+    expected = {v: store.read(v) for v in ("v1", "v2", "v3")}
+
+    reclaimed = store.compact()
+
+    assert reclaimed == 7 and store.index["garbage"] == 0
+    assert store.index["data"] == "series-000002.dat"
+    for vector, frame in expected.items():
+        pd.testing.assert_frame_equal(store.read(vector), frame)
+
+
+def test_read_range_and_find(store):
+    assert store.read("v3", start=2001, end=2001)["VALUE"].tolist() == [101.0]
+    assert store.find({"GEO": "Canada"}) == ["v1", "v2", "v3"]
+    assert store.find({"Products and product groups": "Product v2"}, table=TABLE) == ["v2"]
+    assert store.describe("2")["members"] == {"GEO": "Canada", "Products and product groups": "Product v2"}
@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+import pytest
+
+from ubidata.popcube import write_cube
+from ubidata.service import LRUCache, QueryService, parse_years
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "statscan_data")
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Service over a two-year cube (ages 1..90 hold 100 each, age 0 the total) and the fixture tables"""
+    data = np.full((2, 1, 1, 91), 100, dtype="<i4")
+    data[..., 0] = 9000
+    cube = write_cube(str(tmp_path / "population.cube"), data, [2008, 2009], ["Canada"], ["Both sexes"],
+                      list(range(91)))
+    return QueryService(cube_path=cube,
+                        finance_csv=os.path.join(FIXTURES, "federal_finance_10100005.csv"),
+                        cpi_csv=os.path.join(FIXTURES, "cpi_inflation_18100005.csv"),
+                        tax_filer_csv=os.path.join(FIXTURES, "tax_filers_11100008.csv"),
+                        cache_entries=16, snapshot_check_s=3600)
+
+
+def test_lru_cache_hits_and_evicts_oldest():
+    cache = LRUCache(max_entries=2)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return key * 10
+
+    assert cache.get(1, lambda: compute(1)) == 10
+    assert cache.get(2, lambda: compute(2)) == 20
+    assert cache.get(1, lambda: compute(1)) == 10  # Hit; 1 becomes most recent
+    cache.get(3, lambda: compute(3))  # Evicts 2
+
+    assert list(cache.entries) == [1, 3]
+    assert calls == [1, 2, 3]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_parse_years():
+    assert parse_years("2000-2002,2005", [1999]) == [2000, 2001, 2002, 2005]
+    assert parse_years([2001, "2003"], []) == [2001, 2003]
+    assert parse_years(None, [2008, 2009]) == [2008, 2009]
+
+
+def test_routing(service):
+    assert service.handle("years", {}) == (200, {"years": [2008, 2009]})
+
+    status, population = service.handle("population", {"years": "2008", "childAgeCutoff": 18,
+                                                       "youthAgeCutoff": 25, "seniorAgeCutoff": 65})
+    assert status == 200
+    assert population["2008"] == {"totalPopulation": 9000, "childPopulation": 1700, "youthPopulation": 700,
+                                  "adultPopulation": 4000, "seniorPopulation": 2600}
+
+    status, spending = service.handle("spending", {"years": "2008"})
+    assert status == 200 and spending["geography"] == "Canada"
+    assert set(spending["years"]["2008"]) >= {"ALL", "UBI", "701"}
+
+
+def test_economics_come_from_the_tables(service):
+    status, economics = service.handle("economics", {"years": "2008,1990"})
+
+    assert status == 200
+    sourced = economics["2008"]
+    assert sourced["inflationRate"] == pytest.approx(2.3)
+    assert sourced["averageIncome"] == 28920
+    assert sourced["federalExpenditure"] == pytest.approx(171.1e9, rel=1e-3)
+    assert sourced["totalGovernmentBudget"] == sourced["federalExpenditure"] + sourced["provincialExpenditure"]
+    assert sourced["estimated"] == ["gdp"]
+    # A year no table covers keeps the estimates and says so
+    assert economics["1990"]["isEstimated"] and "inflationRate" in economics["1990"]["estimated"]
+
+
+def test_repeated_queries_hit_the_cache(service):
+    service.handle("population", {"years": "2008-2009"})
+    misses = service.cache.misses
+
+    service.handle("population", {"years": "2008-2009"})
+
+    assert service.cache.misses == misses
+    assert service.cache.hits >= 2
+    assert service.handle("stats", {})[1]["latency"]["population"]["requests"] == 2
+
+
+def test_batch(service):
+    status, payload = service.handle("batch", {"requests": [{"endpoint": "years"},
+                                                            {"endpoint": "population", "years": [2009]},
+                                                            {"endpoint": "nope"}]})
+
+    assert status == 200
+    years, population, unknown = payload["results"]
+    assert years == {"years": [2008, 2009]}
+    assert population["2009"]["totalPopulation"] == 9000
+    assert "error" in unknown
+
+
+@pytest.mark.parametrize("body", [[{"endpoint": "years"}], {"requests": {"endpoint": "years"}},
+                                  {"requests": ["years"]}, {"requests": [{"endpoint": "years"}, 7]}])
+def test_malformed_batch_is_a_bad_request(service, body):
+    status, payload = service.handle("batch", body)
+
+    assert status == 400
+    assert "JSON object" in payload["error"] or "requests" in payload["error"]
+
+
+def test_bad_request_and_not_found(service, tmp_path):
+    assert service.handle("population", {"years": "twenty"})[0] == 400
+    assert service.handle("unknown", {}) == (404, {"error": "unknown endpoint unknown"})
+    assert service.handle("population", ["2008"])[0] == 400
+
+    empty = QueryService(cube_path=str(tmp_path / "missing.cube"), finance_csv=str(tmp_path / "missing.csv"),
+                         cpi_csv=str(tmp_path / "missing.csv"), tax_filer_csv=str(tmp_path / "missing.csv"))
+    assert empty.handle("population", {"years": "2008"})[0] == 404
+    assert empty.handle("spending", {})[0] == 404
@@ -0,0 +1,100 @@
+import contextlib
+import filecmp
+import io
+import os
+import sqlite3
+
+import pandas as pd
+
+from ubidata.processor import StatsCanaDataProcessor
+from ubidata.synthetic import TABLES, parse_count, write_census, write_table
+
+YEARS = list(range(1998, 2023))  # Starts before the processor's 2000-2022 window, so some rows are filtered
+
+# Processor table each generated table lands in
+PROCESSED = {"cpi_inflation": "cpi_data", "tax_filers": "tax_filer_data", "gdp_canada": "gdp_data",
+             "federal_finance": "federal_finance", "provincial_finance": "provincial_finance"}
+
+
+def generate(output_dir, seed=7, rows=1250, as_zip=False, suppressed_rate=0.05):
+    with contextlib.redirect_stdout(io.StringIO()):
+        paths = {key: write_table(str(output_dir), key, rows, seed, YEARS, as_zip, suppressed_rate)
+                 for key in TABLES}
+        paths["census"] = write_census(str(output_dir), seed, [1, 6, 11])
+    return paths
+
+
+def process(input_dir, output_dir):
+    processor = StatsCanaDataProcessor(input_dir=str(input_dir), output_dir=str(output_dir), metrics=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.process_all_data()
+    return processor
+
+
+def loadable(csv_path):
+    """(year, vector, value) of the generated rows the processor should keep: in its years, published, non-zero"""
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    df = df[df["REF_DATE"].astype(int).between(2000, 2022) & (df["VALUE"] != "")]
+    df = df[df["VALUE"].astype(float) != 0]
+    return sorted(zip(df["REF_DATE"], df["VECTOR"], df["VALUE"].astype(float)))
+
+
+def test_parse_count():
+    assert parse_count("20000") == 20000
+    assert parse_count("5k") == 5000 and parse_count("1.5M") == 1_500_000 and parse_count("2_000") == 2000
+
+
+def test_same_seed_same_files(tmp_path):
+    first = generate(tmp_path / "first")
+    second = generate(tmp_path / "second")
+    other = generate(tmp_path / "other", seed=8)
+
+    for key, path in first.items():
+        assert filecmp.cmp(path, second[key], shallow=False)
+        assert not filecmp.cmp(path, other[key], shallow=False)
+
+
+def test_processor_keeps_every_generated_value(tmp_path):
+    paths = generate(tmp_path)
+    process(tmp_path / "statscan_data", tmp_path / "out")
+
+    for key, table in PROCESSED.items():
+        expected = loadable(paths[key])
+        snapshot = pd.read_csv(tmp_path / "out" / "snapshot" / f"{table}.csv", dtype=str, keep_default_na=False)
+        assert sorted(zip(snapshot["year"], snapshot["vector"], snapshot["value"].astype(float))) == expected
+
+        connection = sqlite3.connect(":memory:")
+        with open(tmp_path / "out" / f"{table}.sql", encoding="utf-8") as f:
+            # SQLite has no INCLUDE indexes, so those are left out
+            connection.executescript("\n".join(line for line in f.read().split("\n")
+                                               if not line.startswith("CREATE INDEX")))
+        assert connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == len(expected)
+
+    # Suppressed cells carry their STATUS flag and no value, which the quality gate accepts
+    for table in PROCESSED.values():
+        report = pd.read_json(tmp_path / "out" / "quality" / f"{table}.json", typ="series")
+        assert report["passed"] and report["unusable_with_value"] == 0 and report["missing_unflagged"] == 0
+
+
+def test_zipped_tables_process_like_csvs(tmp_path):
+    generate(tmp_path / "csv")
+    generate(tmp_path / "zip", as_zip=True)
+    process(tmp_path / "csv" / "statscan_data", tmp_path / "csv" / "out")
+    process(tmp_path / "zip" / "statscan_data", tmp_path / "zip" / "out")
+
+    for table in PROCESSED.values():
+        assert filecmp.cmp(tmp_path / "csv" / "out" / "snapshot" / f"{table}.csv",
+                           tmp_path / "zip" / "out" / "snapshot" / f"{table}.csv", shallow=False)
+
+
+def test_finance_parents_sum_to_their_children(tmp_path):
+    # Without suppressed cells, every CCOFOG parent the generator wrote survives processing as its children's sum
+    per_geography = 2 * len(TABLES["federal_finance"]["dimensions"][StatsCanaDataProcessor.function_column])
+    paths = generate(tmp_path, rows=per_geography * len(YEARS), suppressed_rate=0)
+    processor = StatsCanaDataProcessor(output_dir=str(tmp_path / "out"), metrics=False)
+
+    df = pd.read_csv(paths["federal_finance"], encoding="utf-8")
+    rollup, index = processor.finance_rollup(df[df["REF_DATE"].isin(processor.target_years)])
+
+    assert index.validate() == []
+    assert set(rollup["component"]) == set(TABLES["federal_finance"]["dimensions"][processor.component_column])
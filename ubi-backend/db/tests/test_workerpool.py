@@ -0,0 +1,74 @@
+import os
+import signal
+
+import numpy as np
+import pytest
+
+from ubidata.popcube import write_cube
+from ubidata.scenario import (DEFAULT_PARAMETERS, FEASIBILITY_LEVELS, age_counts, calculate_ubi_feasibility,
+                              economic_context, open_population, population_breakdown)
+from ubidata.workerpool import PARAMETER_KEYS, RESULT_KEYS, ScenarioPool, grid_rows
+
+
+@pytest.fixture
+def cube_path(tmp_path):
+    """Two years, ages 1..100 with a different count per age, age 0 holding the total"""
+    data = np.zeros((2, 1, 1, 101), dtype="<i4")
+    for i in range(2):
+        data[i, 0, 0, 1:] = 10000 + 37 * np.arange(1, 101) + 500 * i
+        data[i, 0, 0, 0] = data[i, 0, 0, 1:].sum()
+    return write_cube(str(tmp_path / "population.cube"), data, [2020, 2021], ["Canada"], ["Both sexes"],
+                      list(range(101)))
+
+
+def scalar_result(cube, row):
+    """The single-scenario path: one breakdown and one feasibility calculation per row"""
+    parameters = {key: int(value) if value.is_integer() else value for key, value in zip(PARAMETER_KEYS, row)}
+    year = parameters["year"]
+    population = population_breakdown(age_counts(cube, year), parameters["childAgeCutoff"],
+                                      parameters["adultAgeCutoff"], parameters["seniorAgeCutoff"])
+    result = calculate_ubi_feasibility(parameters, population, economic_context(year))
+    return [result["costs"]["grossUbiCost"], result["taxation"]["totalTaxRevenue"], result["netUbiCost"],
+            result["gdpPercentage"], result["budgetPercentage"], FEASIBILITY_LEVELS.index(result["feasibility"])]
+
+
+def test_pooled_results_match_single_scenarios(cube_path):
+    rows = grid_rows(DEFAULT_PARAMETERS, {"year": [2020, 2021], "adultUbiAmount": [0, 12000, 24000],
+                                          "childAgeCutoff": [16, 18], "seniorAgeCutoff": [60, 65],
+                                          "taxPercentage": [10, 40]})
+    cube = open_population(cube_path)
+
+    with ScenarioPool(cube_path=cube_path, workers=2) as pool:
+        results = pool.evaluate(rows)
+        again = pool.evaluate(rows[:5])
+
+    expected = np.array([scalar_result(cube, row) for row in rows])
+    assert results.shape == (len(rows), len(RESULT_KEYS))
+    np.testing.assert_allclose(results, expected, rtol=1e-12)
+    np.testing.assert_array_equal(again, results[:5])
+
+
+def test_unknown_year_gives_nan_row(cube_path):
+    rows = grid_rows(DEFAULT_PARAMETERS, {"year": [2020, 1990]})
+
+    with ScenarioPool(cube_path=cube_path, workers=1) as pool:
+        results = pool.evaluate(rows)
+
+    assert not np.isnan(results[0]).any()
+    assert np.isnan(results[1]).all()
+
+
+def test_dead_worker_raises_instead_of_hanging(cube_path):
+    rows = grid_rows(DEFAULT_PARAMETERS, {"adultUbiAmount": list(range(0, 24000, 100))})
+
+    pool = ScenarioPool(cube_path=cube_path, workers=2)
+    try:
+        os.kill(pool.processes[0].pid, signal.SIGKILL)
+        pool.processes[0].join()
+
+        with pytest.raises(RuntimeError, match="died"):
+            pool.evaluate(rows)
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.evaluate(rows)
+    finally:
+        pool.close()
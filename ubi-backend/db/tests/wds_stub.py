@@ -0,0 +1,87 @@
+"""
+Local stand-in for the Statistics Canada Web Data Service (WDS)
+Serves getCodeSets, getSeriesInfoFromVector and getDataFromVectorByReferencePeriodRange
+from in-memory dictionaries on a free localhost port, and records every request, so the
+downloader's vector mode can be tested without network access.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+CODE_SETS = {
+    "scalar": [{"scalarFactorCode": 0, "scalarFactorDescEn": "units"},
+               {"scalarFactorCode": 3, "scalarFactorDescEn": "thousands"}],
+    "uom": [{"memberUomCode": 17, "memberUomEn": "2002=100"}],
+    "status": [{"statusCode": 1, "statusRepresentationEn": "E"}],
+    "symbol": [{"symbolCode": 1, "symbolRepresentationEn": "p"}],
+}
+
+
+class WDSStub:
+    def __init__(self, series: Dict[int, Dict], data: Dict[int, List[Dict]]):
+        # series: {vectorId: getSeriesInfoFromVector object}; data: {vectorId: vectorDataPoint list}
+        self.series = series
+        self.data = data
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, body):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                method = url.path.rsplit("/", 1)[-1]
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stub.requests.append((method, query))
+                if method == "getCodeSets":
+                    self._reply({"status": "SUCCESS", "object": CODE_SETS})
+                elif method == "getDataFromVectorByReferencePeriodRange":
+                    ids = [int(v.strip('"')) for v in query["vectorIds"].split(",")]
+                    self._reply([stub._vector_data(i, query["startRefPeriod"], query["endReferencePeriod"])
+                                 for i in ids])
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                method = urlparse(self.path).path.rsplit("/", 1)[-1]
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append((method, body))
+                if method == "getSeriesInfoFromVector":
+                    self._reply([{"status": "SUCCESS", "object": stub.series[item["vectorId"]]}
+                                 if item["vectorId"] in stub.series
+                                 else {"status": "FAILED", "object": "Vector not found"} for item in body])
+                else:
+                    self.send_error(404)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _vector_data(self, vector_id: int, start: str, end: str) -> Dict:
+        if vector_id not in self.data:
+            return {"status": "FAILED", "object": "Vector not found"}
+        points = [p for p in self.data[vector_id] if start <= p["refPer"] <= end]
+        return {"status": "SUCCESS", "object": {"vectorId": vector_id, "vectorDataPoint": points}}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/t1/wds/rest/"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
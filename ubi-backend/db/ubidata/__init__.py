@@ -0,0 +1,5 @@
+"""
+UBI Compass data pipeline for Statistics Canada tables
+Run `python -m ubidata --help` from ubi-backend/db for the available commands.
+Submodules are imported on demand so the command line stays fast.
+"""
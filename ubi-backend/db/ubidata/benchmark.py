@@ -0,0 +1,270 @@
+"""
+Benchmark suite for the UBI Compass data pipeline
+Runs every Python stage on synthetic inputs sized like the checked-in
+fixtures times each scale, records wall time, rows/s, Python-heap peak and
+process peak RSS, appends the results to a JSON-lines history file and
+fails when a stage regresses.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from . import synthetic
+
+# ubi-backend/db, where the fixtures live
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fixture CSVs and the processor method that handles each of them
+STATSCAN_FIXTURES = {
+    "process_gdp": ("gdp_canada_36100014.csv", "process_gdp_data", ()),
+    "process_federal_finance": ("federal_finance_10100005.csv", "process_government_finance", ("federal",)),
+    "process_cpi": ("cpi_inflation_18100005.csv", "process_cpi_data", ()),
+    "process_tax_filers": ("tax_filers_11100008.csv", "process_tax_filer_data", ()),
+}
+
+# Census files read by the rollup and interpolate stages
+POPULATION_FIXTURES = ["population-id-age.csv", "population-age-id.csv"]
+
+# Census year codes the interpolator maps to census years; scaled runs add more codes
+CENSUS_CODES = [2, 7, 12, 17, 22]
+
+def count_rows(path: str) -> int:
+    """Data rows in a fixture CSV (everything after the header line)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+def prepare_workdir(workdir: str, scale: int, seed: int = 42) -> Dict[str, int]:
+    """Generate synthetic inputs the size of the fixtures times scale; returns rows per input file
+
+    Every row has its own vector and reference period, so the deduplicating
+    stages see scale times the work rather than collapsing repeated copies.
+    """
+    rows = {}
+    os.makedirs(os.path.join(workdir, "statscan_data"), exist_ok=True)
+    os.makedirs(os.path.join(workdir, "processed_data"), exist_ok=True)
+    years = list(range(2000, 2023))
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for filename, _, _ in STATSCAN_FIXTURES.values():
+            key = filename.rsplit("_", 1)[0]
+            target = count_rows(os.path.join(DATA_DIR, "statscan_data", filename)) * scale
+            writer = synthetic.SyntheticTableWriter(key, synthetic.TABLES[key], seed, years)
+            with open(os.path.join(workdir, "statscan_data", filename), 'w', encoding='utf-8-sig', newline='') as f:
+                rows[filename] = writer.write(f, target)
+
+        # Extra year codes give each scaled census file distinct (year code, age) rows
+        codes = CENSUS_CODES + [1000 + i for i in range(len(CENSUS_CODES) * (scale - 1))]
+        for filename in POPULATION_FIXTURES:
+            synthetic.write_census(workdir, seed, codes, filename=filename)
+            rows[filename] = count_rows(os.path.join(workdir, filename))
+
+    return rows
+
+def build_stages(rows: Dict[str, int]) -> Dict[str, Callable[[], int]]:
+    """Create the benchmarked stages; each callable runs one stage and returns its input row count"""
+    from . import coverage, interpolation, processor as processor_module
+    from . import population as format_pop
+
+    stages = {}
+
+    for stage_name, (filename, method_name, args) in STATSCAN_FIXTURES.items():
+        def run_processor(filename=filename, method_name=method_name, args=args):
+            processor = processor_module.StatsCanaDataProcessor()
+            getattr(processor, method_name)(os.path.join("statscan_data", filename), *args)
+            return rows[filename]
+        stages[stage_name] = run_processor
+
+    def run_format_pop():
+        format_pop.saveRolledArray(format_pop.rollupAge99(format_pop.getPopArray()))
+        return rows["population-id-age.csv"]
+    stages["format_pop"] = run_format_pop
+
+    def run_interpolate():
+        interpolator = interpolation.PopulationInterpolator(round_to_thousands=True)
+        interpolator.load_census_data("population-age-id.csv")
+        interpolator.generate_sql_file(os.path.join("processed_data", "population-canada.sql"))
+        return rows["population-age-id.csv"]
+    stages["interpolate"] = run_interpolate
+
+    def run_coverage():
+        coverage.check_csv_coverage()
+        return sum(rows[filename] for filename, _, _ in STATSCAN_FIXTURES.values())
+    stages["coverage"] = run_coverage
+
+    return stages
+
+def peak_rss_child(stage_name: str, rows_json: str) -> None:
+    """Entry point of the RSS subprocess: run one stage and print this process's peak RSS in bytes"""
+    import resource
+
+    stage = build_stages(json.loads(rows_json))[stage_name]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        stage()
+
+    # Linux carries ru_maxrss over from the parent across fork/exec, so prefer the
+    # high-water mark of this process's own address space when /proc has it
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    print(int(line.split()[1]) * 1024)
+                    return
+    except OSError:
+        pass
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(peak if sys.platform == "darwin" else peak * 1024)
+
+def measure_peak_rss(stage_name: str, rows: Dict[str, int]) -> Optional[int]:
+    """Run a stage in a fresh interpreter and return its peak RSS in bytes (None where unsupported)"""
+    try:
+        import resource  # noqa: F401  (POSIX only)
+    except ImportError:
+        return None
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [DATA_DIR, os.environ.get("PYTHONPATH")])))
+    code = f"from ubidata.benchmark import peak_rss_child; peak_rss_child({stage_name!r}, {json.dumps(rows)!r})"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        return None
+    return int(result.stdout.strip().splitlines()[-1])
+
+def measure(name: str, stage: Callable[[], int], rows: Dict[str, int], repeat: int) -> Dict:
+    """Time a stage (best of repeat untraced runs), then measure its Python-heap peak and peak RSS"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            row_count = stage()
+            timings.append(time.perf_counter() - start)
+
+        # tracemalloc slows allocation-heavy code, so memory is measured separately from time.
+        # It only sees Python allocations, not numpy/pandas buffers or the interpreter itself.
+        tracemalloc.start()
+        try:
+            stage()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    # Peak RSS covers everything the process touched, so it needs a process of its own
+    peak_rss = measure_peak_rss(name, rows)
+
+    wall = min(timings)
+    return {
+        "rows": row_count,
+        "wall_s": round(wall, 6),
+        "rows_per_s": round(row_count / wall, 1) if wall > 0 else None,
+        "peak_heap_mb": round(peak / (1024 * 1024), 3),
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 3) if peak_rss is not None else None,
+    }
+
+def run_benchmarks(scales: List[int], repeat: int, only: List[str] = None) -> List[Dict]:
+    """Run every stage at every scale in a throwaway working directory"""
+    results = []
+    original_cwd = os.getcwd()
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix="ubi-bench-") as workdir:
+            rows = prepare_workdir(workdir, scale)
+            os.chdir(workdir)
+            try:
+                stages = build_stages(rows)
+                for name, stage in stages.items():
+                    if only and name not in only:
+                        continue
+                    result = {"stage": name, "scale": scale, **measure(name, stage, rows, repeat)}
+                    results.append(result)
+                    print(f"   {name:<26} x{scale:<4} {result['wall_s']:>9.4f}s "
+                          f"{result['rows_per_s'] or 0:>12,.0f} rows/s "
+                          f"heap {result['peak_heap_mb']:>8.2f} MB  rss {result['peak_rss_mb'] or 0:>8.2f} MB")
+            finally:
+                os.chdir(original_cwd)
+
+    return results
+
+def load_history(path: str) -> List[Dict]:
+    """Read previous benchmark runs from the JSON-lines history file"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def find_regressions(results: List[Dict], history: List[Dict], threshold: float, window: int = 5,
+                     noise_floor_s: float = 0.005) -> List[str]:
+    """Compare each stage against the median of its last `window` recorded runs
+
+    Slowdowns smaller than noise_floor_s seconds are ignored so that
+    millisecond-scale stages do not fail on timer jitter.
+    """
+    regressions = []
+
+    for result in results:
+        previous = [
+            r["wall_s"]
+            for run in history[-window:]
+            for r in run.get("results", [])
+            if r["stage"] == result["stage"] and r["scale"] == result["scale"]
+        ]
+        if not previous:
+            continue
+
+        baseline = statistics.median(previous)
+        if (baseline > 0 and result["wall_s"] > baseline * (1 + threshold)
+                and result["wall_s"] - baseline > noise_floor_s):
+            slowdown = (result["wall_s"] / baseline - 1) * 100
+            regressions.append(f"{result['stage']} x{result['scale']}: {result['wall_s']:.4f}s "
+                               f"vs median {baseline:.4f}s (+{slowdown:.0f}%)")
+
+    return regressions
+
+def git_revision() -> str:
+    """Current git commit, if the script runs inside the repository"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DATA_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+def run(args):
+    print("🧭 UBI Compass - Data Pipeline Benchmarks")
+    print("="*60)
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    only = [s for s in args.stages.split(",") if s]
+    results = run_benchmarks(scales, args.repeat, only)
+
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, args.threshold)
+
+    if not args.no_record:
+        record = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.node(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\n📁 Results appended to: {args.history}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} stage(s) regressed by more than {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+
+    print("\n✅ No performance regressions detected")
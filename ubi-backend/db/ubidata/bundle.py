@@ -0,0 +1,318 @@
+"""
+Compact static data bundle for the frontend's offline (static) PopulationService mode
+Packs every year's single-age populations, their age prefix sums, the economic context,
+the annual CPI and the CCOFOG finance totals into little-endian typed arrays behind a
+small JSON index, so the browser decodes it with one inflate and a few array views.
+
+Layout: a 64-byte header (magic "UBIBNDL\\0", version u16, flags u16, index offset u32,
+index length u32, payload offset u32, payload length u32, raw payload length u32, raw
+payload CRC-32 u32), the JSON index, then the zlib-deflated payload. Index offsets are
+into the inflated payload and 8-byte aligned, so every array can be viewed in place.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .datadir import atomic_write
+from .scenario import economic_context, open_population
+
+BUNDLE_MAGIC = b"UBIBNDL\0"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct("<8sHHIIIIII28x")  # 64 bytes
+BUNDLE_ALIGN = 8
+FLAG_DEFLATE = 1
+
+ECONOMIC_COLUMNS = ["gdp", "federalExpenditure", "provincialExpenditure", "inflationRate", "averageIncome"]
+
+# Public sector components of the government finance table (10-10-0005) used for expenditures
+GENERAL_GOVERNMENT = "Consolidated Canadian general government"
+PROVINCIAL_GOVERNMENT = "Consolidated provincial-territorial and local governments"
+
+
+def annual_cpi(csv_path: str, years: List[int]) -> np.ndarray:
+    """All-items CPI for Canada per year (monthly values averaged), NaN where missing"""
+    cpi = pd.read_csv(csv_path, encoding='utf-8-sig', usecols=['REF_DATE', 'GEO', 'Products and product groups',
+                                                                'VALUE'])
+    cpi = cpi[(cpi['GEO'] == 'Canada') & (cpi['Products and product groups'] == 'All-items')]
+    annual = cpi.groupby(cpi['REF_DATE'].astype(str).str[:4].astype(int))['VALUE'].mean()
+    return annual.reindex(years).to_numpy(dtype=np.float64)
+
+
+def government_expenditure(csv_path: str, years: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """(federal, provincial) expenditure in dollars per year from the CCOFOG totals, NaN where missing
+
+    Provincial is the provincial-territorial-local total; federal is the general government
+    total less it (federal and CPP/QPP spending, net of transfers to the other governments).
+    """
+    from .ccofog import ROOT, finance_index
+
+    index = finance_index(csv_path)
+    scalar = pd.read_csv(csv_path, encoding='utf-8-sig', usecols=['SCALAR_ID'])['SCALAR_ID']
+    dollars = 10.0 ** int(scalar.mode().iloc[0]) if len(scalar) else 1.0
+
+    def total(year, component):
+        key = (year, "Canada", component)
+        return index.total(ROOT, *key) * dollars if key in index.key_index else np.nan
+
+    general = np.array([total(year, GENERAL_GOVERNMENT) for year in years])
+    provincial = np.array([total(year, PROVINCIAL_GOVERNMENT) for year in years])
+    return general - provincial, provincial
+
+
+def median_income(csv_path: str, years: List[int]) -> np.ndarray:
+    """Median total income of all tax filers in Canada per year (11-10-0008), NaN where missing"""
+    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+    df = df[(df['GEO'] == 'Canada') & (df['Sex'] == 'Both sexes') & (df['Age group'] == 'All age groups')
+            & (df['Persons with income'] == 'Median total income')]
+    return df.groupby(df['REF_DATE'].astype(str).str[:4].astype(int))['VALUE'].mean().reindex(years).to_numpy(
+        dtype=np.float64)
+
+
+def economics(years: List[int], cpi_csv: Optional[str] = None, finance_csv: Optional[str] = None,
+              tax_filer_csv: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, str]]:
+    """(values, estimated, source per column) of the economic context from the downloaded tables
+
+    Cells a table does not cover keep the scenario module's hand-entered estimate and are
+    flagged in estimated. GDP is always the estimate: the catalog has no annual GDP series
+    (36-10-0014 is the balance of payments).
+    """
+    estimates = np.array([[economic_context(year)[key] for key in ECONOMIC_COLUMNS] for year in years],
+                         dtype=np.float64)
+    measured = np.full_like(estimates, np.nan)
+    sources = {key: "estimate" for key in ECONOMIC_COLUMNS}
+    column = ECONOMIC_COLUMNS.index
+
+    if cpi_csv and os.path.exists(cpi_csv):
+        cpi = annual_cpi(cpi_csv, [years[0] - 1] + list(years))
+        measured[:, column("inflationRate")] = np.round((cpi[1:] / cpi[:-1] - 1) * 100, 1)
+        sources["inflationRate"] = "18-10-0005 all-items CPI, annual change"
+    if finance_csv and os.path.exists(finance_csv):
+        federal, provincial = government_expenditure(finance_csv, years)
+        measured[:, column("federalExpenditure")] = federal
+        measured[:, column("provincialExpenditure")] = provincial
+        sources["federalExpenditure"] = "10-10-0005 general government less provincial-territorial-local"
+        sources["provincialExpenditure"] = "10-10-0005 provincial-territorial-local governments"
+    if tax_filer_csv and os.path.exists(tax_filer_csv):
+        measured[:, column("averageIncome")] = median_income(tax_filer_csv, years)
+        sources["averageIncome"] = "11-10-0008 median total income of tax filers"
+
+    estimated = np.isnan(measured)
+    return np.where(estimated, estimates, measured), estimated, sources
+
+
+def finance_totals(csv_path: str, years: List[int], geography: str = "Canada",
+                   component: Optional[str] = None) -> Dict:
+    """All functions, UBI-replaceable and division totals per year (millions), NaN where missing"""
+    from .ccofog import REPLACEABLE, ROOT, finance_index
+
+    index = finance_index(csv_path)
+    component = component or next((k[2] for k in index.keys if k[1] == geography), None)
+    codes = [ROOT, REPLACEABLE] + index.tree.nodes[ROOT].children
+    totals = np.full((len(years), len(codes)), np.nan)
+    for i, year in enumerate(years):
+        if (year, geography, component) in index.key_index:
+            totals[i] = [index.total(code, year, geography, component) for code in codes]
+    names = {code: index.tree.nodes[code].name for code in codes if code in index.tree.nodes}
+    names[REPLACEABLE] = "Replaceable by UBI"
+    return {"codes": codes, "names": [names[code] for code in codes], "geography": geography,
+            "component": component, "totals": totals}
+
+
+def build_arrays(cube, cpi_csv: Optional[str] = None, finance_csv: Optional[str] = None,
+                 geography: str = "Canada", tax_filer_csv: Optional[str] = None) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """Bundle arrays and their labels from a population cube and the optional CPI, finance and tax filer CSVs"""
+    years = [int(y) for y in cube.years]
+    last_age = max(cube.ages)
+
+    # Dense single ages 0..last_age; age 0 keeps the total as in the cube
+    population = np.zeros(cube.shape[:3] + (last_age + 1,), dtype="<i4")
+    population[..., np.asarray(cube.ages)] = cube.data
+    # prefix[..., a] = population younger than a, so a band is one subtraction
+    prefix = np.zeros(cube.shape[:3] + (last_age + 2,), dtype=np.int64)
+    prefix[..., 2:] = np.cumsum(population[..., 1:], axis=-1)
+    if prefix.max(initial=0) > np.iinfo(np.int32).max:
+        raise ValueError("population prefix sums overflow int32")
+
+    values, estimated, sources = economics(years, cpi_csv, finance_csv, tax_filer_csv)
+    arrays = {
+        "years": np.asarray(years, dtype="<i4"),
+        "population": population,
+        "prefix": prefix.astype("<i4"),
+        "economics": values.astype("<f8"),
+        # 1 where a cell is the hand-entered estimate rather than downloaded data
+        "economicsEstimated": estimated.astype("<i4"),
+    }
+    labels = {"years": years, "geographies": list(cube.geographies), "sexes": list(cube.sexes),
+              "lastAge": last_age, "economics": ECONOMIC_COLUMNS, "economicSources": sources}
+
+    if cpi_csv and os.path.exists(cpi_csv):
+        arrays["cpi"] = annual_cpi(cpi_csv, years).astype("<f8")
+    if finance_csv and os.path.exists(finance_csv):
+        finance = finance_totals(finance_csv, years, geography)
+        arrays["finance"] = finance.pop("totals").astype("<f8")
+        labels["finance"] = finance
+    return arrays, labels
+
+
+def write_bundle(path: str, arrays: Dict[str, np.ndarray], labels: Dict, sources: Optional[Dict] = None) -> Dict:
+    """Write a bundle atomically and return its index"""
+    payload = bytearray()
+    entries = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        payload += b"\0" * (-len(payload) % BUNDLE_ALIGN)
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": len(payload),
+                         "length": array.nbytes}
+        payload += array.tobytes()
+    payload = bytes(payload)
+
+    index = {
+        "format": BUNDLE_VERSION,
+        # Content hash: identical data gives an identical version, so clients can cache on it
+        "dataVersion": hashlib.sha256(payload).hexdigest()[:16],
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "sources": sources or {},
+        "labels": labels,
+        "arrays": entries,
+    }
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    compressed = zlib.compress(payload, 9)
+    payload_offset = -(-(BUNDLE_HEADER.size + len(index_bytes)) // BUNDLE_ALIGN) * BUNDLE_ALIGN
+
+    with atomic_write(path, 'wb') as f:
+        f.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, FLAG_DEFLATE, BUNDLE_HEADER.size,
+                                   len(index_bytes), payload_offset, len(compressed), len(payload),
+                                   zlib.crc32(payload)))
+        f.write(index_bytes)
+        f.write(b"\0" * (payload_offset - BUNDLE_HEADER.size - len(index_bytes)))
+        f.write(compressed)
+    return index
+
+
+class DataBundle:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            raw = f.read()
+        if len(raw) < BUNDLE_HEADER.size:
+            raise ValueError(f"{path} is too short to be a data bundle")
+        (magic, version, flags, index_offset, index_length, payload_offset, payload_length,
+         raw_length, crc) = BUNDLE_HEADER.unpack_from(raw)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not a data bundle")
+        if version > BUNDLE_VERSION:
+            raise ValueError(f"{path} is bundle version {version}; this reader knows {BUNDLE_VERSION}")
+
+        self.index = json.loads(raw[index_offset:index_offset + index_length].decode("utf-8"))
+        payload = raw[payload_offset:payload_offset + payload_length]
+        if flags & FLAG_DEFLATE:
+            payload = zlib.decompress(payload)
+        if len(payload) != raw_length or zlib.crc32(payload) != crc:
+            raise ValueError(f"{path} payload is corrupt (length or CRC-32 mismatch)")
+
+        self.labels = self.index["labels"]
+        self.arrays = {name: np.frombuffer(payload, dtype=entry["dtype"], offset=entry["offset"],
+                                           count=int(np.prod(entry["shape"]))).reshape(entry["shape"])
+                       for name, entry in self.index["arrays"].items()}
+        self._years = {year: i for i, year in enumerate(self.labels["years"])}
+
+    def economic_data(self, year: int) -> Dict:
+        """Economic context of a year, with isEstimated set when any value is a hand-entered estimate"""
+        row = self._years[year]
+        data = {key: float(value) for key, value in zip(self.labels["economics"], self.arrays["economics"][row])}
+        data["isEstimated"] = bool(self.arrays["economicsEstimated"][row].any()) \
+            if "economicsEstimated" in self.arrays else True
+        return data
+
+    def population_breakdown(self, year: int, child_cutoff: int, adult_cutoff: int, senior_cutoff: int,
+                             geography: int = 0, sex: int = 0) -> Dict:
+        """Same bands as scenario.population_breakdown, from the prefix sums"""
+        prefix = self.arrays["prefix"][self._years[year], geography, sex]
+        last = len(prefix) - 1
+
+        def below(age):
+            return int(prefix[min(max(age, 0), last)])
+
+        children = below(child_cutoff)
+        return {
+            "children": children,
+            "youth": max(below(adult_cutoff) - children, 0),
+            "adults": max(below(senior_cutoff) - below(adult_cutoff), 0),
+            "seniors": int(prefix[last]) - below(senior_cutoff),
+            "total": int(prefix[last]),
+        }
+
+
+def open_bundle(path: str) -> DataBundle:
+    """Read and inflate a data bundle"""
+    return DataBundle(path)
+
+
+def make_bundle(cube, output: str, cpi_csv: Optional[str] = None, finance_csv: Optional[str] = None,
+                tax_filer_csv: Optional[str] = None) -> Tuple[Dict[str, np.ndarray], Dict, Dict]:
+    """Build and write the bundle from a cube and whichever table CSVs exist; returns (arrays, labels, index)"""
+    arrays, labels = build_arrays(cube, cpi_csv, finance_csv, tax_filer_csv=tax_filer_csv)
+    sources = {"cube": os.path.basename(cube.path)}
+    for key, path in (("cpi", cpi_csv), ("finance", finance_csv), ("taxFilers", tax_filer_csv)):
+        if path and os.path.exists(path):
+            sources[key] = os.path.basename(path)
+    return arrays, labels, write_bundle(output, arrays, labels, sources)
+
+
+def run(args):
+    print("🧭 UBI Compass - Static Data Bundle")
+    print("="*60)
+
+    try:
+        cube = open_population(args.cube)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for label, path in (("CPI", args.cpi_csv), ("Finance", args.finance_csv), ("Tax filer", args.tax_filer_csv)):
+        if path and not os.path.exists(path):
+            print(f"⚠️  {label} CSV {path} not found; leaving it out of the bundle")
+
+    arrays, labels, index = make_bundle(cube, args.output, args.cpi_csv, args.finance_csv, args.tax_filer_csv)
+
+    size = os.path.getsize(args.output)
+    raw = sum(entry["length"] for entry in index["arrays"].values())
+    print(f"📦 {args.output}: {size:,} bytes ({raw:,} bytes of arrays inflated), version {index['dataVersion']}")
+    for name, entry in index["arrays"].items():
+        print(f"   {name:<18} {np.dtype(entry['dtype']).name:<8} {' × '.join(map(str, entry['shape']))}")
+
+    # Same content as JSON, for comparison with what the frontend would otherwise fetch
+    as_json = json.dumps({name: np.where(np.isnan(a), None, a).tolist() if a.dtype.kind == "f" else a.tolist()
+                          for name, a in arrays.items()}, separators=(",", ":"))
+    print(f"📊 JSON of the same arrays: {len(as_json):,} bytes ({len(as_json) / size:.1f}x the bundle)")
+    sql_path = os.path.splitext(args.cube)[0] + ".sql"
+    if os.path.exists(sql_path):
+        print(f"📊 {sql_path}: {os.path.getsize(sql_path):,} bytes ({os.path.getsize(sql_path) / size:.1f}x)")
+
+    start = time.perf_counter()
+    bundle = open_bundle(args.output)
+    decode_ms = (time.perf_counter() - start) * 1000
+    mismatches = 0
+    from .scenario import age_counts, population_breakdown
+    for year in cube.years:
+        expected = population_breakdown(age_counts(cube, year), 18, 25, 65)
+        actual = bundle.population_breakdown(year, 18, 25, 65)
+        mismatches += any(int(expected[key]) != actual[key] for key in actual)
+    print(f"⏱️  Decoded in {decode_ms:.2f} ms")
+    if mismatches:
+        print(f"❌ {mismatches} years differ from the cube")
+        sys.exit(1)
+    print(f"✅ Breakdowns for {len(cube.years)} years match the cube")
+    for key, source in labels["economicSources"].items():
+        print(f"   {key:<22} {source}")
+    return index
@@ -0,0 +1,89 @@
+"""
+Catalog of the Statistics Canada tables used for UBI analysis
+Kept free of heavy imports so lookups from the command line start instantly.
+"""
+
+from typing import Dict, Optional
+
+# Priority tables for UBI analysis
+PRIORITY_TABLES = {
+    "income_by_age": {
+        "pid": "11-10-0239-01",
+        "name": "Income of individuals by age group, sex and income source",
+        "description": "Core income distribution data",
+        "csv_file": "income_by_age_11100239.csv"
+    },
+    "tax_filers": {
+        "pid": "11-10-0008-01",
+        "name": "Tax filers and dependents with income by total income, sex and age",
+        "description": "Tax filer income distribution",
+        "csv_file": "tax_filers_11100008.csv",
+        "vectors": [
+            "v20790253", "v20790254", "v20790255", "v20790256", "v20790257",
+            "v20790258", "v20790259", "v20790260", "v20790261", "v20790262",
+            "v20790263", "v20790264", "v20790265", "v20790266", "v20790267"
+        ]
+    },
+    "gdp_data": {
+        "pid": "36-10-0014-01",
+        "name": "Gross domestic product, income-based",
+        "description": "GDP for economic context",
+        "csv_file": "gdp_canada_36100014.csv"
+    },
+    "federal_finance": {
+        "pid": "10-10-0005-01",
+        "name": "Federal government revenue and expenditure",
+        "description": "Federal budget data",
+        "csv_file": "federal_finance_10100005.csv"
+    },
+    "provincial_finance": {
+        "pid": "10-10-0020-01",
+        "name": "Provincial and territorial government revenue and expenditure",
+        "description": "Provincial budget data",
+        "csv_file": "provincial_finance_10100020.csv"
+    },
+    "inflation": {
+        "pid": "18-10-0005-01",
+        "name": "Consumer Price Index, annual average",
+        "description": "Inflation data for real income calculations",
+        "csv_file": "cpi_inflation_18100005.csv",
+        "vectors": [
+            "v41693271", "v41693272", "v41693348", "v41693365", "v41693406",
+            "v41693426", "v41693434", "v41693451", "v41693468", "v41693504",
+            "v41693531", "v41693536", "v41693537", "v41693520", "v41693528"
+        ]
+    }
+}
+
+
+def find_table(query: str) -> Optional[Dict]:
+    """Look up a table by catalog key, PID (with or without hyphens) or 8-digit product id"""
+    if query in PRIORITY_TABLES:
+        return {"key": query, **PRIORITY_TABLES[query]}
+
+    digits = query.replace("-", "")
+    for key, table_info in PRIORITY_TABLES.items():
+        pid = table_info["pid"].replace("-", "")
+        if digits and (digits == pid or digits == pid[:8]):
+            return {"key": key, **table_info}
+    return None
+
+
+def run(args):
+    print("🧭 UBI Compass - Statistics Canada Table Catalog")
+    print("="*60)
+
+    if args.query:
+        table_info = find_table(args.query)
+        if not table_info:
+            print(f"❌ No table matches {args.query}")
+            return None
+        tables = {table_info["key"]: table_info}
+    else:
+        tables = PRIORITY_TABLES
+
+    for key, table_info in tables.items():
+        print(f"📊 {key}: {table_info['name']} ({table_info['pid']})")
+        print(f"   {table_info['description']}")
+        print(f"   CSV: {table_info['csv_file']}, vectors: {len(table_info.get('vectors', []))}")
+    return tables
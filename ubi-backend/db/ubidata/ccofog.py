@@ -0,0 +1,204 @@
+"""
+CCOFOG function hierarchy for the government finance tables
+Parses labels like "Foreign economic aid [7012]" into a code tree (all functions →
+divisions → groups), checks that children add up to their parent, and precomputes
+every node's subtree total per (year, geography, component) in one array, so a
+total such as the spending replaceable by UBI is a single lookup.
+"""
+
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = "ALL"
+LABEL = re.compile(r"^(?P<name>.*?)\s*\[(?P<codes>[\d,\s]+)\]\s*$")
+
+# Social protection groups holding the programs the UbiGenome *Replacement genes replace
+PROGRAM_FUNCTIONS = {
+    "oas": "7102",               # Old age
+    "ccb": "7104",               # Family and children
+    "ei": "7105",                # Unemployment
+    "socialAssistance": "7107",  # Social exclusion
+}
+REPLACEABLE = "UBI"
+
+
+def parse_label(label: str) -> Optional[Tuple[str, str]]:
+    """(code, name) of a CCOFOG label; several bracketed codes join into one code "7015,7016,7018" """
+    match = LABEL.match(str(label))
+    if not match:
+        return None
+    codes = [c.strip() for c in match.group("codes").split(",") if c.strip()]
+    return ",".join(codes), match.group("name")
+
+
+class CcofogNode:
+    def __init__(self, code: str, name: str, parent: Optional[str], level: int):
+        self.code = code
+        self.name = name
+        self.parent = parent
+        self.level = level
+        self.children = []
+
+
+class CcofogTree:
+    def __init__(self, labels: Iterable[str]):
+        labels = list(labels)
+        parsed = dict(p for p in map(parse_label, labels) if p)
+        self.nodes = {ROOT: CcofogNode(ROOT, "All functions", None, 0)}
+        self.labels = {}
+
+        # Shorter codes first, so a parent exists before its children; the parent is the longest
+        # code that prefixes the node's first code (7012 → 701, "7015,7016,7018" → 701)
+        for code in sorted(parsed, key=lambda c: (len(c.split(",")[0]), c)):
+            first = code.split(",")[0]
+            parent = next((first[:n] for n in range(len(first) - 1, 0, -1) if first[:n] in self.nodes), ROOT)
+            node = CcofogNode(code, parsed[code], parent, self.nodes[parent].level + 1)
+            self.nodes[code] = node
+            self.nodes[parent].children.append(code)
+        for label in labels:
+            p = parse_label(label)
+            if p:
+                self.labels[label] = p[0]
+
+    def descendants(self, code: str) -> List[str]:
+        """Every code below code, depth first"""
+        result = []
+        for child in self.nodes[code].children:
+            result.append(child)
+            result += self.descendants(child)
+        return result
+
+    def bottom_up(self) -> List[str]:
+        """Codes with every child before its parent"""
+        return sorted(self.nodes, key=lambda code: -self.nodes[code].level)
+
+
+class SubtreeIndex:
+    def __init__(self, df: pd.DataFrame, function_column: str, key_columns: List[str],
+                 value_columns: Tuple[str, ...] = ("VALUE",), labels: Optional[Iterable[str]] = None):
+        """Subtree totals of every code for each key (e.g. year, geography, component)
+
+        A node's total is its published value, or the sum of its children's totals when
+        it has none; the root is always the sum of the divisions. labels (default: those in
+        df) builds the tree, so a division whose own rows were all dropped keeps its groups.
+        """
+        self.tree = CcofogTree(df[function_column].unique() if labels is None else labels)
+        self.key_columns = key_columns
+
+        codes = df[function_column].map(self.tree.labels)
+        df = df[codes.notna()]
+        codes = codes[codes.notna()]
+        keys = pd.MultiIndex.from_frame(df[key_columns])
+        self.keys = keys.unique()
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+        self.codes = list(self.tree.nodes) + [REPLACEABLE]
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+
+        rows = codes.map(self.code_index).to_numpy()
+        cols = self.keys.get_indexer(keys)
+        self.published = {}
+        self.totals = {}
+        for column in value_columns:
+            published = np.full((len(self.codes), len(self.keys)), np.nan)
+            published[rows, cols] = df[column].to_numpy(dtype=np.float64)
+            self.published[column] = published
+
+            totals = published.copy()
+            totals[self.code_index[ROOT]] = np.nan
+            for code in self.tree.bottom_up():
+                children = [self.code_index[c] for c in self.tree.nodes[code].children]
+                if children:
+                    child_sum = np.nansum(totals[children], axis=0)
+                    child_sum[np.isnan(totals[children]).all(axis=0)] = np.nan
+                    row = self.code_index[code]
+                    totals[row] = np.where(np.isnan(totals[row]), child_sum, totals[row])
+            program_rows = [self.code_index[c] for c in PROGRAM_FUNCTIONS.values() if c in self.code_index]
+            totals[self.code_index[REPLACEABLE]] = np.nansum(totals[program_rows], axis=0) if program_rows else np.nan
+            self.totals[column] = totals
+
+    def total(self, code: str, *key, column: str = "VALUE") -> float:
+        """Subtree total of a code (or REPLACEABLE) for one key"""
+        return float(self.totals[column][self.code_index[code], self.key_index[key]])
+
+    def validate(self, column: str = "VALUE") -> List[Dict]:
+        """Published parents whose children's published values do not add up to them
+
+        Values are rounded, so each child and the parent may be off by half a unit.
+        """
+        published = self.published[column]
+        problems = []
+        for code, node in self.tree.nodes.items():
+            if not node.children or code == ROOT:
+                continue
+            children = published[[self.code_index[c] for c in node.children]]
+            parent = published[self.code_index[code]]
+            child_sum = np.nansum(children, axis=0)
+            checked = ~np.isnan(parent) & ~np.isnan(children).all(axis=0)
+            difference = parent - child_sum
+            tolerance = 0.5 * (len(node.children) + 1)
+            for i in np.flatnonzero(checked & (np.abs(difference) > tolerance)):
+                key = [k.item() if isinstance(k, np.generic) else k for k in self.keys[i]]
+                problems.append({**dict(zip(self.key_columns, key)), "code": code,
+                                 "value": float(parent[i]), "children_sum": float(child_sum[i]),
+                                 "difference": float(difference[i])})
+        return problems
+
+
+def finance_index(csv_path: str, years: Optional[Iterable[int]] = None) -> SubtreeIndex:
+    """SubtreeIndex over a finance CSV, keyed by (year, geography, component)"""
+    from .processor import StatsCanaDataProcessor
+
+    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+    if years is not None:
+        df = df[df['REF_DATE'].isin(list(years))]
+    function_column = StatsCanaDataProcessor.function_column
+    return SubtreeIndex(df[df['VALUE'].notna()], function_column,
+                        ['REF_DATE', 'GEO', StatsCanaDataProcessor.component_column],
+                        labels=df[function_column].unique())
+
+
+def run(args):
+    print("🧭 UBI Compass - CCOFOG Function Hierarchy")
+    print("="*60)
+
+    try:
+        index = finance_index(args.csv)
+    except (FileNotFoundError, KeyError) as e:
+        print(f"❌ Cannot index {args.csv}: {e}")
+        sys.exit(1)
+
+    available = [k for k in index.keys if k[1] == args.geography and (not args.year or k[0] == args.year)]
+    if not available:
+        print(f"❌ No rows for {args.geography}" + (f" in {args.year}" if args.year else ""))
+        sys.exit(1)
+    year = args.year or max(k[0] for k in available)
+    key = (year, args.geography, args.component or next(k[2] for k in available if k[0] == year))
+    if key not in index.key_index:
+        print(f"❌ No rows for {key}")
+        sys.exit(1)
+
+    print(f"🌳 {len(index.tree.nodes) - 1} functions, {len(index.keys):,} year/geography/component keys")
+    print(f"📊 {key[0]}, {key[1]}, {key[2]} (millions of dollars)\n")
+    for code in [ROOT] + index.tree.descendants(ROOT):
+        node = index.tree.nodes[code]
+        if node.level > args.depth:
+            continue
+        print(f"{'  ' * node.level}{node.name} [{code}]: {index.total(code, *key):,.0f}")
+
+    replaceable = index.total(REPLACEABLE, *key)
+    print(f"\n🔁 Replaceable by UBI ({', '.join(PROGRAM_FUNCTIONS.values())}): {replaceable:,.0f} "
+          f"({replaceable / index.total(ROOT, *key):.1%} of all functions)")
+
+    problems = index.validate()
+    if problems:
+        print(f"⚠️  {len(problems)} parents differ from the sum of their children beyond rounding:")
+        for problem in problems[:10]:
+            print(f"   {problem['code']} in {', '.join(str(problem[c]) for c in index.key_columns)}: "
+                  f"{problem['value']:,.0f} vs children {problem['children_sum']:,.0f}")
+    else:
+        print("✅ Every published parent equals the sum of its children (within rounding)")
+    return index
@@ -0,0 +1,335 @@
+"""
+Command line entry point for the UBI Compass data pipeline
+Only argparse is imported here; each command's module (and pandas/requests with it)
+is loaded when that command runs.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from typing import List, Optional
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WDS_BASE_URL = "https://www150.statcan.gc.ca/t1/wds/rest/"
+
+
+def add_download(sub):
+    parser = sub.add_parser("download", help="download the priority StatsCan tables")
+    parser.add_argument("--vectors", action="store_true",
+                        help="fetch only the configured vectors of each table through the WDS API")
+    parser.add_argument("--base-url", default=WDS_BASE_URL,
+                        help="WDS REST endpoint (e.g. a local mock server)")
+    parser.add_argument("--output-dir", default="statscan_data")
+    parser.set_defaults(module="downloader")
+
+
+def add_real_dollar_arguments(parser):
+    parser.add_argument("--base-year", type=int, default=2002,
+                        help="year whose dollars the value_real columns are expressed in")
+    parser.add_argument("--no-real-dollars", action="store_true",
+                        help="skip the CPI-deflated value_real columns")
+
+
+def add_publish_arguments(parser):
+    parser.add_argument("--publish", action="store_true",
+                        help="write a new immutable version under <output-dir>/versions and point "
+                             "<output-dir>/current at it when the run succeeds")
+    parser.add_argument("--keep-versions", type=int, default=5, help="published versions to keep")
+
+
+def add_process(sub):
+    parser = sub.add_parser("process", help="turn downloaded CSVs into SQL files")
+    parser.add_argument("--input-dir", default="statscan_data")
+    parser.add_argument("--output-dir", default="processed_data")
+    parser.add_argument("--no-metrics", action="store_true", help="skip per-stage timing and row counts")
+    parser.add_argument("--star-schema", action="store_true",
+                        help="write dictionary-encoded dimension and fact tables ({table}_star.sql)")
+    parser.add_argument("--profile", metavar="TABLE",
+                        help="run cProfile/tracemalloc on the file whose key contains TABLE")
+    parser.add_argument("--strict-quality", action="store_true",
+                        help="skip tables with conflicting duplicate keys or unknown scalar factors")
+    parser.add_argument("--outlier-ratio", type=float, default=10.0,
+                        help="report values that change more than this factor from the previous period")
+    add_publish_arguments(parser)
+    add_real_dollar_arguments(parser)
+    parser.set_defaults(module="processor")
+
+
+def add_delta(sub):
+    parser = sub.add_parser("delta", help="load only the rows that changed since the last loaded snapshot")
+    parser.add_argument("--output-dir", default="processed_data", help="where changeset.sql and the report go")
+    parser.add_argument("--current", help="new snapshot (default: the snapshot of the current published version, or <output-dir>/snapshot)")
+    parser.add_argument("--previous", help="last loaded snapshot (default: <output-dir>/snapshot.loaded)")
+    parser.add_argument("--database-url", help="apply the changeset with psql, then mark the snapshot loaded")
+    parser.add_argument("--accept", action="store_true",
+                        help="mark the current snapshot loaded without applying (e.g. after a full load)")
+    parser.set_defaults(module="delta")
+
+
+def add_ccofog(sub):
+    parser = sub.add_parser("ccofog", help="show the CCOFOG function tree with subtree totals and check it adds up")
+    parser.add_argument("--csv", default=os.path.join("statscan_data", "federal_finance_10100005.csv"))
+    parser.add_argument("--year", type=int, help="default: the latest year in the file")
+    parser.add_argument("--geography", default="Canada")
+    parser.add_argument("--component", help="public sector component (default: the first in the file)")
+    parser.add_argument("--depth", type=int, default=2, help="deepest level printed (1 = divisions)")
+    parser.set_defaults(module="ccofog")
+
+
+def add_interpolate(sub):
+    parser = sub.add_parser("interpolate", help="interpolate census population into yearly SQL")
+    parser.add_argument("--input", default="population-age-id.csv")
+    parser.add_argument("--output", default="population-canada.sql")
+    parser.add_argument("--cube", default="population-canada.cube",
+                        help="also write a binary year × geography × sex × age cube ('' to skip)")
+    parser.set_defaults(module="interpolation")
+
+
+def add_rollup(sub):
+    parser = sub.add_parser("rollup", help="roll census ages 99+ into a single age group")
+    parser.add_argument("--save", action="store_true", help="write population-age-id.csv")
+    parser.add_argument("--cube", help="also write the census years as a binary population cube")
+    parser.set_defaults(module="population")
+
+
+def add_cube(sub):
+    parser = sub.add_parser("cube", help="inspect a binary population cube")
+    parser.add_argument("path", nargs="?", default="population-canada.cube")
+    parser.add_argument("--year", type=int, help="only show this year")
+    parser.set_defaults(module="popcube")
+
+
+def add_bundle(sub):
+    parser = sub.add_parser("bundle", help="pack populations, economics, CPI and finance totals for static mode")
+    parser.add_argument("--cube", default="population-canada.cube")
+    parser.add_argument("--cpi-csv", default=os.path.join("statscan_data", "cpi_inflation_18100005.csv"))
+    parser.add_argument("--finance-csv", default=os.path.join("statscan_data", "federal_finance_10100005.csv"))
+    parser.add_argument("--tax-filer-csv", default=os.path.join("statscan_data", "tax_filers_11100008.csv"))
+    parser.add_argument("--output", default="population-bundle.bin",
+                        help="bundle file (serve it from public/ for the frontend)")
+    parser.set_defaults(module="bundle")
+
+
+def add_coverage(sub):
+    parser = sub.add_parser("coverage", help="report which years the downloaded data covers")
+    parser.set_defaults(module="coverage")
+
+
+def add_check(sub):
+    parser = sub.add_parser("check", help="check dependencies, directories and scripts")
+    parser.set_defaults(module="check")
+
+
+def add_catalog(sub):
+    parser = sub.add_parser("catalog", help="list the priority tables or look one up")
+    parser.add_argument("query", nargs="?", help="table key, PID or 8-digit product id")
+    parser.set_defaults(module="catalog")
+
+
+def add_metadata(sub):
+    parser = sub.add_parser("metadata", help="cache cube metadata for the given PIDs")
+    parser.add_argument("pids", nargs="*", help="table PIDs (default: all priority tables)")
+    parser.add_argument("--cache-dir", default=os.path.join("statscan_data", "metadata"))
+    parser.add_argument("--refresh", action="store_true", help="ignore cached metadata")
+    parser.set_defaults(module="metadata")
+
+
+def add_historical_gdp(sub):
+    parser = sub.add_parser("historical-gdp", help="download historical GDP in period chunks")
+    parser.add_argument("--start", type=int, default=2000, help="first reference year")
+    parser.add_argument("--end", type=int, default=2019, help="last reference year")
+    parser.add_argument("--chunk-years", type=int, default=5, help="years fetched per request")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent requests")
+    parser.set_defaults(module="historical_gdp")
+
+
+def add_benchmark(sub):
+    parser = sub.add_parser("benchmark", help="benchmark the pipeline stages")
+    parser.add_argument("--scales", default="1,10", help="comma-separated input scale factors")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is kept)")
+    parser.add_argument("--stages", default="", help="comma-separated subset of stages to run")
+    parser.add_argument("--history", default=os.path.join(DATA_DIR, "benchmark_history.jsonl"),
+                        help="JSON-lines file results are appended to")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown versus the recent median (0.25 = 25%%)")
+    parser.add_argument("--no-record", action="store_true", help="do not append this run to the history")
+    parser.set_defaults(module="benchmark")
+
+
+def add_synthetic(sub):
+    parser = sub.add_parser("synthetic", help="generate synthetic StatsCan-shaped datasets")
+    parser.add_argument("--output-dir", default="synthetic_data", help="directory to write into")
+    parser.add_argument("--tables", default="", help="comma-separated tables to generate (default: all)")
+    parser.add_argument("--rows", default="20k", help="data rows per table (accepts k/M/G suffixes)")
+    parser.add_argument("--start-year", type=int, default=2000)
+    parser.add_argument("--end-year", type=int, default=2022)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--zip", action="store_true", help="write ZIPs in the downloader layout")
+    parser.add_argument("--suppressed-rate", type=float, default=0.001,
+                        help="share of cells written as suppressed (blank VALUE, x/F/.. STATUS)")
+    parser.add_argument("--census-codes", default="2,7,12,17,22", help="census year codes to generate")
+    parser.add_argument("--no-census", action="store_true", help="skip the census file")
+    parser.set_defaults(module="synthetic")
+
+
+def add_pipeline(sub):
+    parser = sub.add_parser("pipeline", help="download, extract, process and load tables as a task graph")
+    parser.add_argument("--input-dir", default="statscan_data")
+    parser.add_argument("--output-dir", default="processed_data")
+    parser.add_argument("--tables", default="", help="comma-separated catalog keys (default: all)")
+    parser.add_argument("--offline", action="store_true",
+                        help="skip downloads and use the CSVs/ZIPs already in the input directory")
+    parser.add_argument("--vectors", action="store_true",
+                        help="fetch only the configured vectors of each table through the WDS API")
+    parser.add_argument("--base-url", default=WDS_BASE_URL,
+                        help="WDS REST endpoint (e.g. a local mock server)")
+    parser.add_argument("--star-schema", action="store_true",
+                        help="write dictionary-encoded dimension and fact tables ({table}_star.sql)")
+    add_real_dollar_arguments(parser)
+    add_publish_arguments(parser)
+    parser.add_argument("--database-url", help="load each SQL file with psql into this database")
+    parser.add_argument("--download-workers", type=int, default=0, help="concurrent downloads (default 2)")
+    parser.add_argument("--process-workers", type=int, default=0,
+                        help="worker processes for processing (default: one per CPU)")
+    parser.add_argument("--load-workers", type=int, default=0, help="concurrent psql loads (default 1)")
+    parser.add_argument("--max-age-hours", type=float, default=24, help="reuse downloads younger than this")
+    parser.add_argument("--no-cache", action="store_true", help="rerun every task")
+    parser.add_argument("--bundle", help="also write the frontend's static data bundle here "
+                                         "(e.g. ../../public/population-bundle.bin)")
+    parser.add_argument("--cube", default="population-canada.cube", help="population cube for --bundle")
+    parser.set_defaults(module="pipeline")
+
+
+def add_montecarlo(sub):
+    parser = sub.add_parser("montecarlo", help="percentile bands for a UBI scenario under data uncertainty")
+    parser.add_argument("--scenario", help="JSON file of UBIParameters (defaults: the feasibility API's)")
+    parser.add_argument("--year", type=int, help="override the scenario year")
+    parser.add_argument("--draws", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=50000, help="draws evaluated per array batch")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--population-sd", type=float, default=0.005,
+                        help="relative population error in census years (grows 0.3%%/year between them)")
+    parser.add_argument("--income-sd", type=float, default=0.05, help="relative average income error")
+    parser.add_argument("--gdp-sd", type=float, default=0.02, help="relative GDP error")
+    parser.add_argument("--cube", default="population-canada.cube")
+    parser.add_argument("--census", default="population-age-id.csv",
+                        help="census ages used for the checksum-mismatch error floor")
+    parser.add_argument("--output", help="write the percentile bands to this JSON file")
+    parser.set_defaults(module="montecarlo")
+
+
+def add_scenario(sub):
+    parser = sub.add_parser("scenario", help="evaluate a UBI scenario incrementally over parameter changes")
+    parser.add_argument("--scenario", help="JSON file of UBIParameters (defaults: the feasibility API's)")
+    parser.add_argument("--year", type=int, help="override the scenario year")
+    parser.add_argument("--sweep", help='changes applied one at a time, e.g. "taxPercentage=20,30;year=2010"')
+    parser.add_argument("--cube", default="population-canada.cube")
+    parser.set_defaults(module="incremental")
+
+
+def add_microsim(sub):
+    parser = sub.add_parser("microsim", help="person-level UBI microsimulation on a synthetic population")
+    parser.add_argument("--scenario", help="JSON file of UBIParameters plus replacement/clawback keys")
+    parser.add_argument("--year", type=int, help="override the scenario year")
+    parser.add_argument("--oas-replacement", dest="oasReplacement", type=float, help="%% of OAS replaced")
+    parser.add_argument("--ccb-replacement", dest="ccbReplacement", type=float, help="%% of CCB replaced")
+    parser.add_argument("--ei-replacement", dest="eiReplacement", type=float, help="%% of EI replaced")
+    parser.add_argument("--social-assistance-replacement", dest="socialAssistanceReplacement", type=float,
+                        help="%% of social assistance replaced")
+    parser.add_argument("--sample", type=float, default=1.0, help="records per person (1.0 = full population)")
+    parser.add_argument("--chunk-size", type=int, default=1 << 22, help="records evaluated per array chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cube", default="population-canada.cube")
+    parser.add_argument("--tax-filers", default=os.path.join("statscan_data", "tax_filers_11100008.csv"))
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.set_defaults(module="microsim")
+
+
+def add_sweep(sub):
+    parser = sub.add_parser("sweep", help="evaluate a grid of UBI scenarios on a shared-memory worker pool")
+    parser.add_argument("--scenario", help="JSON file of UBIParameters the grid starts from")
+    parser.add_argument("--year", type=int, help="override the scenario year")
+    parser.add_argument("--grid", required=True,
+                        help='values per parameter, e.g. "taxPercentage=10:50:1;adultUbiAmount=12000,18000,24000"')
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--cube", default="population-canada.cube")
+    parser.add_argument("--output", help="write parameters and results to this CSV file")
+    parser.set_defaults(module="workerpool")
+
+
+def add_serve(sub):
+    parser = sub.add_parser("serve", help="serve the processed statistics as cached, batched JSON endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--cube", default="population-canada.cube")
+    parser.add_argument("--finance-csv", default=os.path.join("statscan_data", "federal_finance_10100005.csv"),
+                        help="federal finance CSV for the spending and economics endpoints")
+    parser.add_argument("--cpi-csv", default=os.path.join("statscan_data", "cpi_inflation_18100005.csv"),
+                        help="CPI CSV for the economics endpoint's inflation rate")
+    parser.add_argument("--tax-filer-csv", default=os.path.join("statscan_data", "tax_filers_11100008.csv"),
+                        help="tax filer CSV for the economics endpoint's average income")
+    parser.add_argument("--cache-entries", type=int, default=4096, help="LRU size (one entry per year and query)")
+    parser.set_defaults(module="service")
+
+
+def add_series(sub):
+    parser = sub.add_parser("series", help="store StatsCan series by vector id and read them back")
+    parser.add_argument("vectors", nargs="*", help="vector ids to print (e.g. v41693271)")
+    parser.add_argument("--store", default="series_store", help="time-series store directory")
+    parser.add_argument("--build", action="store_true",
+                        help="add every CSV in --input-dir (new vectors, new periods and revisions)")
+    parser.add_argument("--input-dir", default="statscan_data")
+    parser.add_argument("--find", action="append", metavar="DIMENSION=MEMBER",
+                        help='print the vectors having this member, e.g. "GEO=Canada" (repeatable)')
+    parser.add_argument("--table", help="limit --find to one table (8-digit product id)")
+    parser.add_argument("--limit", type=int, default=10, help="most --find matches printed")
+    parser.add_argument("--years", help='only these periods, e.g. "2000-2024"')
+    parser.add_argument("--compact", action="store_true", help="rewrite the data file without unused space")
+    parser.set_defaults(module="series")
+
+
+def add_revisions(sub):
+    parser = sub.add_parser("revisions", help="record table releases as deltas and read values as of a date")
+    parser.add_argument("vectors", nargs="*", help="vector ids to print as of --as-of")
+    parser.add_argument("--store", default="revision_store", help="revision store directory")
+    parser.add_argument("--record", action="store_true", help="record every CSV in --input-dir as a release")
+    parser.add_argument("--input-dir", default="statscan_data")
+    parser.add_argument("--release-date",
+                        help="release date of the recorded CSVs (default: cached metadata, else file time)")
+    parser.add_argument("--partial", action="store_true",
+                        help="the CSVs hold only some vectors (--vectors downloads); keep cells they lack")
+    parser.add_argument("--as-of", help="date (or datetime) whose published values are read")
+    parser.add_argument("--history", action="store_true", help="print every revision of the vectors instead")
+    parser.add_argument("--period", help="with --history, only this period (e.g. 2020)")
+    parser.add_argument("--table", help="table for --export (8-digit product id)")
+    parser.add_argument("--export", metavar="CSV",
+                        help="write --table as of --as-of as a StatsCan CSV, e.g. to re-run process on it")
+    parser.add_argument("--limit", type=int, default=20, help="latest releases listed")
+    parser.set_defaults(module="revisions")
+
+
+COMMANDS = [add_download, add_process, add_delta, add_ccofog, add_interpolate, add_rollup, add_cube, add_bundle,
+            add_coverage, add_check, add_catalog, add_metadata, add_historical_gdp, add_benchmark, add_synthetic,
+            add_pipeline, add_montecarlo, add_scenario, add_microsim,
+            add_sweep, add_serve, add_series, add_revisions]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ubidata", description="UBI Compass data pipeline")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    for add_command in COMMANDS:
+        add_command(sub)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        sys.exit(2)
+
+    module = importlib.import_module(f"{__package__}.{args.module}")
+    return module.run(args)
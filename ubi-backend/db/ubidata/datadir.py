@@ -0,0 +1,267 @@
+"""
+Concurrency-safe writes to the shared data directories
+Files are written to a unique temporary file and renamed over the target, so readers
+see the old or the new file and never half of one; per-table file locks keep two runs
+from interleaving their read-merge-write cycles; and a run's outputs can be published
+as an immutable version directory behind a "current" pointer that is swapped atomically.
+
+Layout of a snapshot store: {root}/versions/{version}/ (MANIFEST.json once complete),
+{root}/CURRENT (the current version id) and, where symlinks work, {root}/current.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import stat
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_DIR = ".locks"
+POINTER = "CURRENT"
+LINK = "current"
+MANIFEST = "MANIFEST.json"
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", **open_kwargs):
+    """Open a temporary file next to path and rename it over path once the block succeeds
+
+    The temporary name is unique, so concurrent writers of the same path never share one;
+    the last rename wins and every reader sees a complete file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    while True:
+        tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{secrets.token_hex(4)}.tmp")
+        try:
+            # Created like open() would (0o666 less the umask), not with mkstemp's 0o600
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # A replaced file keeps its mode
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_copy(source: str, target: str) -> None:
+    """Copy a file so the target is replaced in one rename"""
+    with open(source, 'rb') as src, atomic_write(target, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+
+
+class FileLock:
+    def __init__(self, path: str, timeout: Optional[float] = None, poll_s: float = 0.05):
+        self.path = path
+        self.timeout = timeout
+        self.poll_s = poll_s
+        self.fd = None
+
+    def _try_lock(self) -> bool:
+        try:
+            if fcntl:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self.fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK, errno.EDEADLK):
+                return False
+            raise
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock; False if it is held elsewhere and blocking is off or the timeout passes"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # The lock file itself is never deleted: removing it would let two holders lock different inodes
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while not self._try_lock():
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                os.close(self.fd)
+                self.fd = None
+                return False
+            time.sleep(self.poll_s)
+        return True
+
+    def release(self) -> None:
+        if self.fd is None:
+            return
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        else:
+            msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        os.close(self.fd)
+        self.fd = None
+
+    def __enter__(self):
+        if not self.acquire():
+            raise TimeoutError(f"could not lock {self.path} within {self.timeout}s")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def table_lock(directory: str, name: str, timeout: Optional[float] = None) -> FileLock:
+    """Lock for one table's files in a data directory ({directory}/.locks/{name}.lock)"""
+    return FileLock(os.path.join(directory, LOCK_DIR, f"{name}.lock"), timeout=timeout)
+
+
+def current_dir(root: str) -> str:
+    """Directory of the current published version, or root itself when nothing was published"""
+    try:
+        with open(os.path.join(root, POINTER), 'r', encoding='utf-8') as f:
+            version = f.read().strip()
+    except OSError:
+        return root
+    path = os.path.join(root, "versions", version)
+    return path if version and os.path.isdir(path) else root
+
+
+def _remove_readonly(func, path, _):
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+class SnapshotStore:
+    def __init__(self, root: str):
+        self.root = root
+        self.versions_dir = os.path.join(root, "versions")
+        os.makedirs(self.versions_dir, exist_ok=True)
+        self._building = {}
+
+    def begin(self) -> str:
+        """Create and lock a new version directory; nothing sees it until publish()"""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        version = f"{stamp}-{os.getpid()}"
+        path = os.path.join(self.versions_dir, version)
+        # Held until publish/abort (and taken before the directory exists), so prune() can tell a
+        # running build from an abandoned one
+        lock = FileLock(os.path.join(self.versions_dir, LOCK_DIR, f"{version}.lock"))
+        lock.acquire()
+        os.makedirs(path)
+        self._building[path] = lock
+        return path
+
+    def _relative(self, path: str) -> str:
+        """Path of a file inside its version directory (or the store root)"""
+        path = os.path.abspath(path)
+        versions = os.path.abspath(self.versions_dir)
+        if path.startswith(versions + os.sep):
+            return os.path.relpath(path, versions).split(os.sep, 1)[-1]
+        root = os.path.abspath(self.root)
+        return os.path.relpath(path, root) if path.startswith(root + os.sep) else os.path.basename(path)
+
+    def _adopt(self, version_dir: str, paths: Iterable[str]) -> None:
+        """Hard-link (or copy) files reused from earlier runs into version_dir at the same relative path"""
+        for path in paths:
+            target = os.path.join(version_dir, self._relative(path))
+            if not os.path.exists(path) or os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.link(path, target)  # Published files are read-only, so sharing the inode is safe
+            except OSError:
+                shutil.copy2(path, target)
+
+    def manifest(self, version_dir: str) -> Dict:
+        """Size and SHA-256 of every file in a version"""
+        files = {}
+        for root, dirs, names in os.walk(version_dir):
+            dirs[:] = [d for d in dirs if d != LOCK_DIR]
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, version_dir)
+                if relative == MANIFEST:
+                    continue
+                digest = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+                files[relative] = {"bytes": os.path.getsize(path), "sha256": digest.hexdigest()}
+        return files
+
+    def publish(self, version_dir: str, adopt: Iterable[str] = ()) -> str:
+        """Seal a version (manifest, read-only files) and make it current; returns the version id"""
+        self._adopt(version_dir, adopt)
+        version = os.path.basename(version_dir)
+        files = self.manifest(version_dir)
+        with atomic_write(os.path.join(version_dir, MANIFEST), encoding='utf-8') as f:
+            json.dump({"version": version, "published": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                       "files": files}, f, indent=2)
+        for root, _, names in os.walk(version_dir):
+            for name in names:
+                os.chmod(os.path.join(root, name), 0o444)
+
+        # Versions may be published out of order by concurrent runs; the pointer swap is serialized
+        with FileLock(os.path.join(self.root, LOCK_DIR, "current.lock")):
+            with atomic_write(os.path.join(self.root, POINTER), encoding='utf-8') as f:
+                f.write(version + "\n")
+            link = os.path.join(self.root, LINK)
+            tmp_link = f"{link}.{os.getpid()}.tmp"
+            try:
+                os.symlink(os.path.join("versions", version), tmp_link)
+                os.replace(tmp_link, link)
+            except (OSError, NotImplementedError):
+                pass  # No symlinks (e.g. Windows without privileges): readers use CURRENT
+        self._release(version_dir)
+        return version
+
+    def abort(self, version_dir: str) -> None:
+        """Drop an unpublished version"""
+        shutil.rmtree(version_dir, onerror=_remove_readonly)
+        self._release(version_dir)
+
+    def _release(self, version_dir: str) -> None:
+        lock = self._building.pop(version_dir, None)
+        if lock:
+            lock.release()
+
+    def versions(self) -> List[str]:
+        """Published version ids, oldest first"""
+        return sorted(v for v in os.listdir(self.versions_dir)
+                      if os.path.exists(os.path.join(self.versions_dir, v, MANIFEST)))
+
+    def prune(self, keep: int = 5) -> List[str]:
+        """Remove all but the newest keep published versions (never the current one) and abandoned builds"""
+        current = os.path.basename(current_dir(self.root))
+        published = self.versions()
+        removed = [v for v in published[:max(len(published) - keep, 0)] if v != current]
+        for version in os.listdir(self.versions_dir):
+            path = os.path.join(self.versions_dir, version)
+            if version == LOCK_DIR or version in published or not os.path.isdir(path):
+                continue
+            # An unpublished version whose lock is free belongs to a run that died
+            lock = FileLock(os.path.join(self.versions_dir, LOCK_DIR, f"{version}.lock"))
+            if lock.acquire(blocking=False):
+                lock.release()
+                removed.append(version)
+        for version in removed:
+            # The version's lock file stays, as FileLock requires: a run still waiting on it holds its inode
+            shutil.rmtree(os.path.join(self.versions_dir, version), onerror=_remove_readonly)
+        return removed
@@ -0,0 +1,186 @@
+"""
+Row-level delta loads between processed snapshots
+Diffs the row snapshot the processor just wrote against the snapshot last loaded into
+the database, keyed on (table, year, vector), and writes only the inserted, updated and
+deleted rows as one changeset transaction, with a report of how much each table was revised.
+The changeset targets the keyed wide tables (not the --star-schema layout).
+"""
+
+import json
+import os
+import sys
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .datadir import atomic_copy, atomic_write, current_dir
+from .processor import StatsCanaDataProcessor
+
+KEY = list(StatsCanaDataProcessor.key_columns)
+
+
+def read_snapshot(path: str) -> pd.DataFrame:
+    """Snapshot rows as text, indexed by the natural key; '' stands for NULL"""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=KEY).set_index(KEY)
+    rows = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return rows.set_index(KEY)
+
+
+def diff_table(previous: pd.DataFrame, current: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Index]:
+    """(inserted, updated, deleted keys) taking previous to current"""
+    inserted = current[~current.index.isin(previous.index)]
+    deleted = previous.index[~previous.index.isin(current.index)]
+
+    both = current.index[current.index.isin(previous.index)]
+    columns = [col for col in current.columns if col in previous.columns]
+    old = previous.loc[both, columns]
+    new = current.loc[both, columns]
+    changed = np.zeros(len(both), dtype=bool)
+    for col in columns:
+        differs = (old[col] != new[col]).to_numpy()
+        if differs.any():
+            # "97511" and "97511.0" are the same number (snapshots written before numbers were canonical)
+            old_number = pd.to_numeric(old[col], errors='coerce').to_numpy(dtype=np.float64)
+            new_number = pd.to_numeric(new[col], errors='coerce').to_numpy(dtype=np.float64)
+            changed |= differs & ~(old_number == new_number)
+    changed |= len(columns) != len(current.columns)
+    return inserted, current.loc[both[changed]], deleted
+
+
+def numeric_columns(table_name: str) -> set:
+    """Columns written unquoted in SQL"""
+    columns = StatsCanaDataProcessor.table_columns[table_name]
+    return {col for col, _, sql_type in columns if sql_type.startswith(("INT", "DECIMAL"))} | {"value_real"}
+
+
+def sql_values(rows: pd.DataFrame, numeric: set) -> List[str]:
+    """One "v1, v2, ..." tuple body per row, in the snapshot's column order"""
+    formatted = {}
+    for col in rows.columns:
+        text = rows[col]
+        if col in numeric:
+            formatted[col] = text.where(text != '', 'NULL')
+        else:
+            formatted[col] = "'" + text.str.replace("'", "''", regex=False) + "'"
+    return pd.DataFrame(formatted).agg(', '.join, axis=1).tolist() if len(rows) else []
+
+
+class DeltaLoad:
+    def __init__(self, current_dir: str, previous_dir: str):
+        self.current_dir = current_dir
+        self.previous_dir = previous_dir
+        self.report = {}
+        # Same upsert statements and batch size as the full load
+        self.processor = StatsCanaDataProcessor(output_dir=os.path.dirname(current_dir) or ".", metrics=False,
+                                                real_dollars=False)
+
+    def tables(self) -> List[str]:
+        """Tables with a snapshot on either side"""
+        names = set()
+        for directory in (self.current_dir, self.previous_dir):
+            if os.path.isdir(directory):
+                names |= {f[:-4] for f in os.listdir(directory) if f.endswith(".csv")}
+        return sorted(name for name in names if name in StatsCanaDataProcessor.table_columns)
+
+    def changeset(self) -> List[str]:
+        """SQL for every table's changes, wrapped in one transaction"""
+        statements = [f"-- Delta load: {self.previous_dir} -> {self.current_dir}", "BEGIN;", ""]
+
+        for table_name in self.tables():
+            previous = read_snapshot(os.path.join(self.previous_dir, f"{table_name}.csv"))
+            current_path = os.path.join(self.current_dir, f"{table_name}.csv")
+            if not os.path.exists(current_path):
+                # Not reprocessed this time; leave the loaded rows alone
+                continue
+            current = read_snapshot(current_path)
+            inserted, updated, deleted = diff_table(previous, current)
+
+            self.report[table_name] = {
+                "rows_previous": len(previous),
+                "rows_current": len(current),
+                "inserted": len(inserted),
+                "updated": len(updated),
+                "deleted": len(deleted),
+                "revised_pct": round(100 * (len(inserted) + len(updated) + len(deleted)) / max(len(current), 1), 3),
+            }
+            if not (len(inserted) or len(updated) or len(deleted)):
+                continue
+
+            statements.append(f"-- {table_name}: {len(inserted)} inserted, {len(updated)} updated, "
+                              f"{len(deleted)} deleted")
+            numeric = numeric_columns(table_name)
+            if len(deleted):
+                keys = sql_values(deleted.to_frame(index=False), numeric)
+                for start in range(0, len(keys), self.processor.batch_size):
+                    batch = keys[start:start + self.processor.batch_size]
+                    statements.append(f"DELETE FROM {table_name} WHERE ({', '.join(KEY)}) IN (VALUES")
+                    statements.append(",\n".join(f"({k})" for k in batch) + ");")
+
+            changed = pd.concat([inserted, updated]).reset_index()
+            statements += self.processor._upsert_statements(table_name, list(changed.columns),
+                                                            sql_values(changed, numeric))
+            statements.append("")
+
+        statements.append("COMMIT;")
+        return statements
+
+    def accept(self) -> None:
+        """Make the current snapshot the loaded one, file by file"""
+        os.makedirs(self.previous_dir, exist_ok=True)
+        for table_name in self.tables():
+            source = os.path.join(self.current_dir, f"{table_name}.csv")
+            if os.path.exists(source):
+                atomic_copy(source, os.path.join(self.previous_dir, f"{table_name}.csv"))
+
+
+def run(args):
+    print("🧭 UBI Compass - Delta Load")
+    print("="*60)
+
+    # The snapshot of the current published version, or of output_dir itself when nothing was published
+    snapshot_dir = args.current or os.path.join(current_dir(args.output_dir), "snapshot")
+    previous_dir = args.previous or os.path.join(args.output_dir, "snapshot.loaded")
+    if not os.path.isdir(snapshot_dir):
+        print(f"❌ No snapshot in {snapshot_dir}; run `python -m ubidata process` first")
+        sys.exit(1)
+    if not os.path.isdir(previous_dir):
+        print(f"⚠️  No loaded snapshot in {previous_dir}; the changeset inserts every row into existing tables")
+        print("   (for a first load, import the full SQL files and run this with --accept)")
+
+    delta = DeltaLoad(snapshot_dir, previous_dir)
+    statements = delta.changeset()
+    changeset_path = os.path.join(args.output_dir, "changeset.sql")
+    with atomic_write(changeset_path, encoding='utf-8') as f:
+        f.write('\n'.join(statements) + '\n')
+
+    print(f"{'Table':<24}{'previous':>10}{'current':>10}{'insert':>8}{'update':>8}{'delete':>8}{'revised':>9}")
+    touched = 0
+    for table_name, entry in delta.report.items():
+        touched += entry["inserted"] + entry["updated"] + entry["deleted"]
+        print(f"{table_name:<24}{entry['rows_previous']:>10,}{entry['rows_current']:>10,}{entry['inserted']:>8,}"
+              f"{entry['updated']:>8,}{entry['deleted']:>8,}{entry['revised_pct']:>8.2f}%")
+    print(f"\n📊 {touched:,} rows to touch")
+    print(f"📁 Changeset: {changeset_path}")
+
+    report_path = os.path.join(args.output_dir, "delta_report.json")
+    with atomic_write(report_path, encoding='utf-8') as f:
+        json.dump({"previous": previous_dir, "current": snapshot_dir, "rows_touched": touched,
+                   "tables": delta.report}, f, indent=2)
+    print(f"📁 Report: {report_path}")
+
+    if args.database_url:
+        from .pipeline import load_sql
+        try:
+            load_sql(changeset_path, args.database_url)
+        except Exception as e:
+            print(f"❌ Changeset failed and was rolled back: {getattr(e, 'stderr', '') or e}")
+            sys.exit(1)
+        print("✅ Changeset loaded")
+        delta.accept()
+        print(f"✅ {previous_dir} now matches the database")
+    elif args.accept:
+        delta.accept()
+        print(f"✅ {previous_dir} marked as loaded")
+    return delta.report
@@ -0,0 +1,412 @@
+"""
+Statistics Canada Data Downloader for UBI Feasibility Analysis
+Downloads essential economic and income data for 2000-2022
+"""
+
+import copy
+import csv
+import requests
+import pandas as pd
+import json
+import time
+import os
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from .catalog import PRIORITY_TABLES
+from .datadir import atomic_write, table_lock
+from .metadata import StatsCanMetadataCache
+
+# Column layout of a Statistics Canada full-table CSV; dimension columns sit between DGUID and UOM
+CSV_LEADING_COLUMNS = ["REF_DATE", "GEO", "DGUID"]
+CSV_TRAILING_COLUMNS = ["UOM", "UOM_ID", "SCALAR_FACTOR", "SCALAR_ID", "VECTOR", "COORDINATE",
+                        "VALUE", "STATUS", "SYMBOL", "TERMINATED", "DECIMALS"]
+
+# WDS frequency codes we know how to turn back into REF_DATE strings
+FREQUENCY_ANNUAL = 12
+FREQUENCY_MONTHLY = 6
+
+class StatsCanaDataDownloader:
+    def __init__(self, output_dir="statscan_data", base_url="https://www150.statcan.gc.ca/t1/wds/rest/"):
+        # base_url can point at a local mock WDS server for offline testing
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.output_dir = output_dir
+        self.session = requests.Session()
+
+        # Reference period window requested in vector mode
+        self.start_period = "2000-01-01"
+        self.end_period = "2022-12-31"
+
+        # Maximum number of vectors sent in a single WDS request
+        self.vector_batch_size = 100
+        self._code_sets = None
+
+        # Cube metadata is fetched in batches and cached on disk
+        self.metadata = StatsCanMetadataCache(cache_dir=os.path.join(output_dir, "metadata"),
+                                              base_url=self.base_url)
+
+        # Create output directory in current working directory
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Priority tables for UBI analysis
+        self.priority_tables = copy.deepcopy(PRIORITY_TABLES)
+
+    def get_table_metadata(self, pid: str) -> Optional[Dict]:
+        """Get metadata for a Statistics Canada table (served from the metadata cache)"""
+        try:
+            tables = self.metadata.load([pid])
+            metadata = tables.get(self.product_id(pid))
+
+            if metadata is None:
+                print(f"Failed to get metadata for {pid}")
+            return metadata
+
+        except Exception as e:
+            print(f"Error getting metadata for {pid}: {e}")
+            return None
+
+    def prefetch_metadata(self) -> Dict[int, Dict]:
+        """Fetch metadata for every priority table in one batched pass"""
+        pids = [table_info["pid"] for table_info in self.priority_tables.values()]
+        try:
+            return self.metadata.load(pids)
+        except Exception as e:
+            print(f"⚠️  Could not prefetch table metadata: {e}")
+            return {}
+
+    def download_table_csv(self, pid: str, table_name: str) -> bool:
+        """Download table data as CSV from Statistics Canada"""
+        try:
+            # Construct CSV download URL
+            csv_url = f"https://www150.statcan.gc.ca/n1/tbl/csv/{pid.replace('-', '')}-eng.zip"
+
+            print(f"Downloading {table_name} ({pid})...")
+            print(f"URL: {csv_url}")
+
+            response = self.session.get(csv_url, timeout=60)
+
+            if response.status_code == 200:
+                # Save the zip file
+                filename = f"{pid.replace('-', '_')}_{table_name.replace(' ', '_')}.zip"
+                filepath = os.path.join(self.output_dir, filename)
+
+                with atomic_write(filepath, 'wb') as f:
+                    f.write(response.content)
+
+                print(f"✅ Downloaded: {filename}")
+                return True
+            else:
+                print(f"❌ Failed to download {pid}: HTTP {response.status_code}")
+                return False
+
+        except Exception as e:
+            print(f"❌ Error downloading {pid}: {e}")
+            return False
+
+    @staticmethod
+    def product_id(pid: str) -> int:
+        """Convert a table PID (e.g. 18-10-0005-01) to the 8-digit WDS product id"""
+        return int(pid.replace("-", "")[:8])
+
+    @staticmethod
+    def vector_id(vector: str) -> int:
+        """Convert a CSV vector label (e.g. v41693271) to the numeric WDS vector id"""
+        return int(str(vector).lstrip("vV"))
+
+    def _batches(self, items: List) -> List[List]:
+        """Split a list into WDS-sized request batches"""
+        size = self.vector_batch_size
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _successful_objects(self, response) -> List[Dict]:
+        """Return the payload objects of a WDS response, skipping failed entries"""
+        response.raise_for_status()
+        body = response.json()
+        if isinstance(body, dict):
+            body = [body]
+        return [item["object"] for item in body if item.get("status") == "SUCCESS"]
+
+    def get_code_sets(self) -> Dict[str, Dict[int, str]]:
+        """Get (and memoize) the WDS code sets used to label vector data points"""
+        if self._code_sets is None:
+            response = self.session.get(f"{self.base_url}getCodeSets", timeout=30)
+            objects = self._successful_objects(response)
+            raw = objects[0] if objects else {}
+
+            self._code_sets = {
+                "scalar": {c["scalarFactorCode"]: c["scalarFactorDescEn"] for c in raw.get("scalar", [])},
+                "uom": {c["memberUomCode"]: c["memberUomEn"] for c in raw.get("uom", [])},
+                "status": {c["statusCode"]: c["statusRepresentationEn"] for c in raw.get("status", [])},
+                "symbol": {c["symbolCode"]: c["symbolRepresentationEn"] for c in raw.get("symbol", [])},
+            }
+        return self._code_sets
+
+    def get_series_info(self, vectors: List[str]) -> Dict[int, Dict]:
+        """Get series descriptions for a list of vectors, keyed by numeric vector id"""
+        url = f"{self.base_url}getSeriesInfoFromVector"
+        series = {}
+
+        for batch in self._batches(vectors):
+            payload = [{"vectorId": self.vector_id(v)} for v in batch]
+            response = self.session.post(url, json=payload, timeout=30)
+            for obj in self._successful_objects(response):
+                series[obj["vectorId"]] = obj
+
+        return series
+
+    def get_vector_data(self, vectors: List[str], start_period: str, end_period: str) -> List[Dict]:
+        """Get the data points of several vectors for a reference period range"""
+        url = f"{self.base_url}getDataFromVectorByReferencePeriodRange"
+        results = []
+
+        for batch in self._batches(vectors):
+            params = {
+                "vectorIds": ",".join(f'"{self.vector_id(v)}"' for v in batch),
+                "startRefPeriod": start_period,
+                "endReferencePeriod": end_period,
+            }
+            response = self.session.get(url, params=params, timeout=60)
+            results.extend(self._successful_objects(response))
+
+        return results
+
+    def get_dimension_columns(self, pid: str) -> List[str]:
+        """Get the dimension column names (after GEO) of a table from its cube metadata"""
+        # The first dimension is always geography, which the CSV calls GEO
+        return self.metadata.dimension_names(pid)[1:] if self.get_table_metadata(pid) else []
+
+    @staticmethod
+    def _format_ref_date(ref_per: str, frequency: int) -> str:
+        """Turn a WDS reference period (YYYY-MM-DD) into the CSV REF_DATE format"""
+        if frequency == FREQUENCY_ANNUAL:
+            return ref_per[:4]
+        if frequency == FREQUENCY_MONTHLY:
+            return ref_per[:7]
+        return ref_per
+
+    @staticmethod
+    def _format_coordinate(coordinate: str) -> str:
+        """Drop the unused trailing '.0' members of a WDS coordinate"""
+        members = coordinate.split(".")
+        while len(members) > 1 and members[-1] == "0":
+            members.pop()
+        return ".".join(members)
+
+    def _vector_rows(self, data: List[Dict], series: Dict[int, Dict], columns: List[str],
+                     known: Dict[str, Dict]) -> List[Dict]:
+        """Build CSV rows for vector data points in the full-table column layout"""
+        codes = self.get_code_sets()
+        # SeriesTitleEn lists the geography first, then the remaining dimension members in order
+        dimension_columns = ["GEO"] + columns[len(CSV_LEADING_COLUMNS):-len(CSV_TRAILING_COLUMNS)]
+        rows = []
+
+        for obj in data:
+            vector = f"v{obj['vectorId']}"
+            info = series.get(obj["vectorId"], {})
+
+            # Descriptive columns come from an existing row of the same vector when we have one
+            template = known.get(vector)
+            if template is None:
+                title = info.get("SeriesTitleEn", "").split(";")
+                members = dict(zip(dimension_columns, title))
+                scalar_code = info.get("scalarFactorCode", 0)
+                uom_code = info.get("memberUomCode")
+                template = {
+                    **{col: members.get(col, "") for col in dimension_columns},
+                    "DGUID": "",
+                    "UOM": codes["uom"].get(uom_code, ""),
+                    "UOM_ID": "" if uom_code is None else str(uom_code),
+                    "SCALAR_FACTOR": codes["scalar"].get(scalar_code, ""),
+                    "SCALAR_ID": str(scalar_code),
+                    "COORDINATE": self._format_coordinate(obj.get("coordinate", info.get("coordinate", ""))),
+                    "TERMINATED": "t" if info.get("terminated") else "",
+                }
+
+            for point in obj.get("vectorDataPoint", []):
+                value = point.get("value")
+                decimals = point.get("decimals", 0)
+                status = point.get("statusCode", 0)
+                symbol = point.get("symbolCode", 0)
+                row = dict(template)
+                row.update({
+                    "REF_DATE": self._format_ref_date(point["refPer"], point.get("frequencyCode", FREQUENCY_ANNUAL)),
+                    "VECTOR": vector,
+                    "VALUE": "" if value is None else f"{float(value):.{decimals}f}",
+                    "STATUS": codes["status"].get(status, "") if status else "",
+                    "SYMBOL": codes["symbol"].get(symbol, "") if symbol else "",
+                    "DECIMALS": str(decimals),
+                })
+                rows.append({col: row.get(col, "") for col in columns})
+
+        return rows
+
+    def download_table_vectors(self, table_key: str) -> bool:
+        """Download only the configured vectors of a table and merge them into its CSV
+
+        The read-merge-write of the CSV holds the table's lock, so concurrent runs cannot
+        lose each other's rows.
+        """
+        with table_lock(self.output_dir, table_key):
+            return self._merge_table_vectors(table_key)
+
+    def _merge_table_vectors(self, table_key: str) -> bool:
+        table_info = self.priority_tables[table_key]
+        pid = table_info["pid"]
+        vectors = table_info.get("vectors", [])
+        filepath = os.path.join(self.output_dir, table_info["csv_file"])
+
+        try:
+            print(f"Downloading {len(vectors)} vectors of {table_key} ({pid})...")
+            print(f"Periods: {self.start_period} to {self.end_period}")
+
+            # Existing rows keep their descriptive columns; new data replaces matching (REF_DATE, VECTOR)
+            if os.path.exists(filepath):
+                existing = pd.read_csv(filepath, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+                columns = list(existing.columns)
+            else:
+                existing = None
+                columns = CSV_LEADING_COLUMNS + self.get_dimension_columns(pid) + CSV_TRAILING_COLUMNS
+
+            known = {}
+            if existing is not None:
+                for row in existing.drop_duplicates("VECTOR", keep="last").to_dict("records"):
+                    known[row["VECTOR"]] = row
+
+            missing = [v for v in vectors if v not in known]
+            series = self.get_series_info(missing) if missing else {}
+            data = self.get_vector_data(vectors, self.start_period, self.end_period)
+
+            fetched = pd.DataFrame(self._vector_rows(data, series, columns, known), columns=columns)
+            if fetched.empty:
+                print(f"❌ No data points returned for {pid}")
+                return False
+
+            merged = fetched if existing is None else pd.concat([existing, fetched], ignore_index=True)
+            merged = merged.drop_duplicates(subset=["REF_DATE", "VECTOR"], keep="last")
+
+            # Keep the table's original series order, with any new vectors appended at the end
+            order = {v: i for i, v in enumerate(dict.fromkeys(merged["VECTOR"]))}
+            merged = (merged.assign(_order=merged["VECTOR"].map(order))
+                            .sort_values(["_order", "REF_DATE"], kind="stable")
+                            .drop(columns="_order"))
+
+            with atomic_write(filepath, encoding='utf-8-sig', newline='') as f:
+                merged.to_csv(f, index=False, quoting=csv.QUOTE_ALL)
+
+            print(f"✅ Merged {len(fetched)} data points into: {table_info['csv_file']}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error downloading vectors for {pid}: {e}")
+            return False
+
+    def download_priority_tables(self, use_vectors: bool = False) -> Dict[str, bool]:
+        """Download all priority tables for UBI analysis
+
+        With use_vectors, tables that configure a "vectors" list fetch only those
+        series from the WDS API; the others still download the full table ZIP.
+        """
+        results = {}
+
+        print("🚀 Starting Statistics Canada data download...")
+        print(f"📁 Output directory: {self.output_dir}")
+        print("="*60)
+
+        if use_vectors:
+            # Vector mode labels new series from cube metadata; fetch it for all tables at once
+            self.prefetch_metadata()
+
+        for key, table_info in self.priority_tables.items():
+            pid = table_info["pid"]
+            name = table_info["name"]
+            description = table_info["description"]
+
+            print(f"\n📊 {description}")
+            print(f"Table: {name}")
+
+            # Download the table
+            if use_vectors and table_info.get("vectors"):
+                success = self.download_table_vectors(key)
+            else:
+                success = self.download_table_csv(pid, key)
+            results[key] = success
+
+            # Be nice to the server
+            time.sleep(2)
+
+        return results
+
+    def generate_download_summary(self, results: Dict[str, bool]) -> None:
+        """Generate a summary of download results"""
+        print("\n" + "="*60)
+        print("📋 DOWNLOAD SUMMARY")
+        print("="*60)
+
+        successful = []
+        failed = []
+
+        for key, success in results.items():
+            table_info = self.priority_tables[key]
+            if success:
+                successful.append(f"✅ {key}: {table_info['name']}")
+            else:
+                failed.append(f"❌ {key}: {table_info['name']}")
+
+        if successful:
+            print("\n🎉 SUCCESSFUL DOWNLOADS:")
+            for item in successful:
+                print(f"  {item}")
+
+        if failed:
+            print("\n⚠️  FAILED DOWNLOADS:")
+            for item in failed:
+                print(f"  {item}")
+            print("\n💡 Try downloading failed tables manually from:")
+            print("   https://www150.statcan.gc.ca/")
+
+        print(f"\n📁 Files saved to: {os.path.abspath(self.output_dir)}")
+        print(f"📊 Success rate: {len(successful)}/{len(results)} tables")
+
+    def create_manual_download_guide(self) -> None:
+        """Create a guide for manual downloads if needed"""
+        guide_path = os.path.join(self.output_dir, "manual_download_guide.md")
+
+        with atomic_write(guide_path) as f:
+            f.write("# Manual Download Guide for Statistics Canada Data\n\n")
+            f.write("If automated downloads fail, use these direct links:\n\n")
+
+            for key, table_info in self.priority_tables.items():
+                pid = table_info["pid"]
+                name = table_info["name"]
+                description = table_info["description"]
+
+                f.write(f"## {description}\n")
+                f.write(f"**Table**: {name}\n")
+                f.write(f"**PID**: {pid}\n")
+                f.write(f"**URL**: https://www150.statcan.gc.ca/t1/tbl1/en/tv.action?pid={pid.replace('-', '')}\n")
+                f.write(f"**CSV Download**: Look for 'Download options' → 'Entire table (CSV)'\n\n")
+
+        print(f"📖 Manual download guide created: {guide_path}")
+
+def run(args):
+    print("🧭 UBI Compass - Statistics Canada Data Downloader")
+    print("="*60)
+
+    # Create downloader
+    downloader = StatsCanaDataDownloader(output_dir=args.output_dir, base_url=args.base_url)
+
+    # Create manual download guide
+    downloader.create_manual_download_guide()
+
+    # Download priority tables
+    results = downloader.download_priority_tables(use_vectors=args.vectors)
+
+    # Generate summary
+    downloader.generate_download_summary(results)
+
+    print("\n🎯 Next Steps:")
+    print("1. Extract downloaded ZIP files")
+    print("2. Review CSV data structure")
+    print("3. Run data processing scripts")
+    print("4. Create SQL insert statements")
+    print("\n🚀 Ready for Phase 1 data processing!")
@@ -0,0 +1,209 @@
+"""
+Download historical GDP data from Statistics Canada (2000-2019 by default)
+This will enable UBI analysis for years prior to 2020.
+"""
+
+import csv
+import io
+import requests
+import pandas as pd
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+from .datadir import atomic_write
+
+BASE_URL = "https://www150.statcan.gc.ca/t1/tbl1/en/dtl!downloadDbLoadingData-loadingData.action"
+
+def split_periods(start_year: int, end_year: int, chunk_years: int = 5) -> List[Tuple[str, str]]:
+    """Split a year range into refPeriods chunks of at most chunk_years years"""
+    chunks = []
+    for chunk_start in range(start_year, end_year + 1, chunk_years):
+        chunk_end = min(chunk_start + chunk_years - 1, end_year)
+        chunks.append((f"{chunk_start}0101", f"{chunk_end}1231"))
+    return chunks
+
+def fetch_chunk(session: requests.Session, period: Tuple[str, str], base_url: str = BASE_URL,
+                retries: int = 3) -> List[Dict[str, str]]:
+    """Fetch one refPeriods chunk and parse it straight from the response body"""
+    params = {
+        'pid': '3610001401',
+        'selectedMembers': '[["1"],["1"],["1"]]',  # Canada, Current prices, Gross domestic product at market prices
+        'checkedLevels': '',
+        'refPeriods': f"{period[0]},{period[1]}",
+        'dimensionLayouts': 'layout2',
+        'vectorDisplay': 'false'
+    }
+
+    last_error = None
+    for attempt in range(retries):
+        try:
+            response = session.get(base_url, params=params, timeout=30)
+            response.raise_for_status()
+            reader = csv.DictReader(io.StringIO(response.content.decode('utf-8-sig')))
+            if reader.fieldnames is None or 'REF_DATE' not in reader.fieldnames:
+                raise ValueError("No REF_DATE column found in data")
+            return list(reader)
+        except (requests.RequestException, ValueError) as e:
+            last_error = e
+            print(f"   ⚠️  Chunk {period[0][:4]}-{period[1][:4]} attempt {attempt + 1}/{retries} failed: {e}")
+
+    raise last_error
+
+def download_historical_gdp(start_year: int = 2000, end_year: int = 2019, chunk_years: int = 5,
+                            max_workers: int = 4, base_url: str = BASE_URL):
+    """Download historical GDP data from Statistics Canada
+
+    The year range is split into chunks that are fetched concurrently. Each
+    response is parsed as soon as it arrives and merged on (REF_DATE, VECTOR),
+    so a failed chunk only loses its own years, and the result is written once.
+    """
+    
+    print(f"🏛️ Downloading Historical GDP Data ({start_year}-{end_year})")
+    print("="*60)
+    
+    # Statistics Canada GDP table
+    table_id = "36-10-0014-01"
+    chunks = split_periods(start_year, end_year, chunk_years)
+
+    print(f"📡 Requesting data from Statistics Canada...")
+    print(f"   Table: {table_id}")
+    print(f"   Years: {start_year}-{end_year} in {len(chunks)} chunks")
+
+    merged = {}  # {(REF_DATE, VECTOR): row}
+    fieldnames = None
+    failed_chunks = []
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_chunk, session, period, base_url): period for period in chunks}
+
+        for future in as_completed(futures):
+            period = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"❌ Chunk {period[0][:4]}-{period[1][:4]} failed: {e}")
+                failed_chunks.append(period)
+                continue
+
+            kept = 0
+            for row in rows:
+                try:
+                    year = int(str(row['REF_DATE'])[:4])
+                except ValueError:
+                    continue
+                if start_year <= year <= end_year:
+                    if fieldnames is None:
+                        fieldnames = list(row.keys())
+                    merged[(row['REF_DATE'], row.get('VECTOR', ''))] = row
+                    kept += 1
+
+            print(f"✅ Chunk {period[0][:4]}-{period[1][:4]}: {kept} rows")
+
+    if not merged:
+        print("❌ No target years found in downloaded data")
+        print("💡 You may need to download this data manually from:")
+        print("   https://www150.statcan.gc.ca/t1/tbl1/en/tv.action?pid=3610001401")
+        return False
+
+    years = sorted({int(ref_date[:4]) for ref_date, _ in merged})
+    print(f"📅 Years found: {min(years)} - {max(years)} ({len(years)} years)")
+    print(f"🎯 Target years available: {len(years)}/{end_year - start_year + 1}")
+
+    # Save processed data in a single pass
+    processed_filename = f"statscan_data/gdp_historical_{start_year}_{end_year}.csv"
+    with atomic_write(processed_filename, newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for key in sorted(merged, key=lambda k: (k[1], k[0])):
+            writer.writerow(merged[key])
+    print(f"✅ Processed data saved to: {processed_filename}")
+
+    if failed_chunks:
+        missing = ", ".join(f"{p[0][:4]}-{p[1][:4]}" for p in failed_chunks)
+        print(f"⚠️  Some chunks failed and are missing from the output: {missing}")
+        return False
+
+    return True
+
+def manual_download_instructions():
+    """Provide manual download instructions"""
+    print("\n" + "="*60)
+    print("📋 MANUAL DOWNLOAD INSTRUCTIONS")
+    print("="*60)
+    print("""
+If automatic download failed, follow these steps:
+
+1. 🌐 Visit: https://www150.statcan.gc.ca/t1/tbl1/en/tv.action?pid=3610001401
+
+2. 📊 Configure the table:
+   - Geography: Canada
+   - Prices: Current prices
+   - Estimates: Gross domestic product at market prices
+   - Reference period: 2000 to 2019
+
+3. 💾 Download:
+   - Click "Download options"
+   - Select "Entire table (CSV)"
+   - Save as: ubi-backend/db/statscan_data/gdp_historical_2000_2019.csv
+
+4. 🔄 Re-run this script to verify the download
+
+5. 📈 Update UBI Compass:
+   - Run: python -m ubidata process
+   - Test: Access years 2008-2017 in UBI Compass
+""")
+
+def verify_existing_data(start_year: int = 2000, end_year: int = 2019):
+    """Check if historical GDP data already exists"""
+    
+    files_to_check = [
+        f"statscan_data/gdp_historical_{start_year}_{end_year}.csv",
+        "statscan_data/gdp_canada_36100014.csv"
+    ]
+    
+    for filename in files_to_check:
+        if os.path.exists(filename):
+            try:
+                df = pd.read_csv(filename, encoding='utf-8')
+                if 'REF_DATE' in df.columns:
+                    years = sorted(df['REF_DATE'].unique())
+                    historical_years = [y for y in years if start_year <= y <= end_year]
+                    
+                    if historical_years:
+                        print(f"✅ Found historical data in {filename}")
+                        print(f"   Years: {min(historical_years)} - {max(historical_years)} ({len(historical_years)} years)")
+                        return True
+                        
+            except Exception as e:
+                print(f"⚠️  Error reading {filename}: {e}")
+    
+    return False
+
+def run(args):
+    print("🧭 UBI Compass - Historical GDP Data Downloader")
+    print("="*60)
+    
+    # Create directory if it doesn't exist
+    os.makedirs("statscan_data", exist_ok=True)
+    
+    # Check if we already have the data
+    if verify_existing_data(args.start, args.end):
+        print("\n🎉 Historical GDP data already available!")
+        print("💡 You can now analyze years 2008-2017 in UBI Compass")
+        return
+    
+    # Try to download
+    print("\n📡 Attempting automatic download...")
+    success = download_historical_gdp(args.start, args.end, args.chunk_years, args.workers)
+    
+    if success:
+        print("\n🎉 SUCCESS!")
+        print("✅ Historical GDP data downloaded successfully")
+        print("💡 Next steps:")
+        print("   1. Run: python -m ubidata process")
+        print("   2. Update UBI Compass database")
+        print("   3. Test years 2008-2017 in UBI Compass")
+    else:
+        print("\n⚠️  Automatic download failed")
+        manual_download_instructions()
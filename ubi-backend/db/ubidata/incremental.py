@@ -0,0 +1,150 @@
+"""
+Incremental evaluation of UBI scenarios
+The feasibility calculation is split into the same sub-results as
+calculateUBIFeasibility → calculateUBICosts / calculateTaxRevenue, each a cached node
+in a dependency graph. Changing one parameter recomputes only the nodes downstream of
+it, so a tax-rate slider or a single-gene mutation reuses population and cost nodes.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .scenario import (age_counts, assess_feasibility, calculate_tax_revenue, calculate_ubi_costs,
+                       economic_context, load_parameters, open_population, population_breakdown)
+
+
+class Node:
+    def __init__(self, name: str, deps: List[str], func: Callable):
+        self.name = name
+        self.deps = deps
+        self.func = func
+
+
+class ScenarioGraph:
+    def __init__(self, cube_path="population-canada.cube"):
+        self.cube = open_population(cube_path)
+        self.nodes = {}
+        self.values = {}        # Cached value per node and per parameter
+        self.last_report = {}
+
+        # Parameters are the graph's leaves: nodes list them as dependencies by their UBIParameters name
+        self.add("ageCounts", ["year"], lambda v: age_counts(self.cube, v["year"]))
+        self.add("economics", ["year"], lambda v: economic_context(v["year"]))
+        self.add("population", ["ageCounts", "childAgeCutoff", "adultAgeCutoff", "seniorAgeCutoff"],
+                 lambda v: {k: float(x) for k, x in population_breakdown(
+                     v["ageCounts"], v["childAgeCutoff"], v["adultAgeCutoff"], v["seniorAgeCutoff"]).items()})
+        self.add("costs", ["population", "childUbiAmount", "youthUbiAmount", "adultUbiAmount",
+                           "seniorBonus"],
+                 lambda v: calculate_ubi_costs(v, v["population"]))
+        self.add("taxation", ["population", "economics", "adultUbiAmount", "exemptionAmount",
+                              "taxPercentage"],
+                 lambda v: {k: float(x) for k, x in calculate_tax_revenue(
+                     v, v["population"], v["economics"]["averageIncome"]).items()})
+        self.add("netUbiCost", ["costs", "taxation"],
+                 lambda v: v["costs"]["grossUbiCost"] - v["taxation"]["totalTaxRevenue"])
+        self.add("gdpPercentage", ["netUbiCost", "economics"],
+                 lambda v: v["netUbiCost"] / v["economics"]["gdp"] * 100)
+        self.add("budgetPercentage", ["netUbiCost", "economics"],
+                 lambda v: v["netUbiCost"] / v["economics"]["totalGovernmentBudget"] * 100)
+        self.add("feasibility", ["gdpPercentage"], lambda v: assess_feasibility(v["gdpPercentage"]))
+
+    def add(self, name: str, deps: List[str], func: Callable) -> None:
+        """Register a node; nodes must be added after the nodes they depend on"""
+        self.nodes[name] = Node(name, deps, func)
+
+    @staticmethod
+    def same(old, new) -> bool:
+        """Whether a recomputed value equals the cached one (NumPy arrays compared elementwise)"""
+        try:
+            return bool(np.array_equal(old, new)) if isinstance(old, np.ndarray) else old == new
+        except Exception:
+            return False
+
+    def evaluate(self, parameters: Dict) -> Dict:
+        """FeasibilityResult for the parameters, recomputing only what their changes affect
+
+        A node whose inputs changed is recomputed; if its value comes out the same as the
+        cached one, the nodes after it are not invalidated (e.g. a senior cutoff change
+        with no senior bonus leaves the costs untouched).
+        """
+        start = time.perf_counter()
+        changed = {k for k, v in parameters.items() if k not in self.values or self.values[k] != v}
+        self.values.update(parameters)
+
+        dirty = set(changed)
+        recomputed, unchanged = [], []
+        for name, node in self.nodes.items():  # Insertion order is topological
+            if name in self.values and not any(dep in dirty for dep in node.deps):
+                continue
+            missing = [dep for dep in node.deps if dep not in self.values]
+            if missing:
+                raise KeyError(f"{name} needs {', '.join(missing)}")
+
+            value = node.func(self.values)
+            recomputed.append(name)
+            if name in self.values and self.same(self.values[name], value):
+                unchanged.append(name)
+            else:
+                dirty.add(name)
+            self.values[name] = value
+
+        self.last_report = {
+            "changed": sorted(changed),
+            "recomputed": recomputed,
+            "unchanged": unchanged,
+            "reused": [name for name in self.nodes if name not in recomputed],
+            "seconds": time.perf_counter() - start,
+        }
+        return self.result(parameters)
+
+    def result(self, parameters: Dict) -> Dict:
+        """Assemble the cached node values into calculateUBIFeasibility's result shape"""
+        v = self.values
+        return {
+            "parameters": dict(parameters),
+            "population": v["population"],
+            "costs": v["costs"],
+            "taxation": v["taxation"],
+            "economics": v["economics"],
+            "netUbiCost": v["netUbiCost"],
+            "gdpPercentage": v["gdpPercentage"],
+            "budgetPercentage": v["budgetPercentage"],
+            "feasibility": v["feasibility"],
+        }
+
+
+def parse_sweep(sweep: Optional[str]) -> List[Dict]:
+    """Parameter changes from "key=v1,v2;key2=v3", applied one step at a time"""
+    steps = []
+    for part in [p for p in (sweep or "").split(";") if p]:
+        key, values = part.split("=", 1)
+        for value in values.split(","):
+            steps.append({key.strip(): float(value) if "." in value else int(value)})
+    return steps
+
+
+def run(args):
+    print("🧭 UBI Compass - Incremental Scenario Evaluation")
+    print("="*60)
+
+    parameters = load_parameters(args.scenario, year=args.year)
+    graph = ScenarioGraph(cube_path=args.cube)
+
+    steps = [{}] + parse_sweep(args.sweep)
+    for change in steps:
+        parameters.update(change)
+        result = graph.evaluate(parameters)
+        report = graph.last_report
+
+        label = ", ".join(f"{k}={v}" for k, v in change.items()) or "initial"
+        print(f"\n🔄 {label}: net ${result['netUbiCost'] / 1e9:,.1f}B, "
+              f"{result['gdpPercentage']:.2f}% of GDP, {result['feasibility']}")
+        print(f"   Recomputed {len(report['recomputed'])}/{len(graph.nodes)} nodes "
+              f"in {report['seconds'] * 1e6:.0f} µs: {', '.join(report['recomputed']) or 'none'}")
+        if report["unchanged"]:
+            print(f"   Unchanged after recompute: {', '.join(report['unchanged'])}")
+        if report["reused"]:
+            print(f"   Reused: {', '.join(report['reused'])}")
+    return graph
@@ -0,0 +1,191 @@
+"""
+Statistics Canada Table Metadata Cache
+Fetches cube metadata for many tables in batched WDS requests and keeps the
+dimension/member trees on disk, so other stages can look up member ids,
+member names and release dates without touching the network.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from .catalog import PRIORITY_TABLES
+from .datadir import atomic_write
+
+DEFAULT_BASE_URL = "https://www150.statcan.gc.ca/t1/wds/rest/"
+
+
+def product_id(pid) -> int:
+    """Convert a table PID (e.g. 18-10-0005-01) or product id to the 8-digit WDS product id"""
+    return int(str(pid).replace("-", "")[:8])
+
+
+class StatsCanMetadataCache:
+    def __init__(self, cache_dir="statscan_data/metadata", base_url=DEFAULT_BASE_URL,
+                 max_age_hours=24, batch_size=25, max_concurrency=4):
+        self.cache_dir = cache_dir
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+
+        # Cached metadata older than this is refetched; None keeps it forever
+        self.max_age_hours = max_age_hours
+
+        # Number of products per getCubeMetadata POST, and how many POSTs run at once
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # In-process indexes, filled as tables are loaded
+        self._tables = {}           # {product_id: compact metadata}
+        self._member_ids = {}       # {(product_id, dimension): {member name: member id}}
+        self._member_names = {}     # {(product_id, dimension): {member id: member name}}
+
+    def _cache_path(self, pid: int) -> str:
+        """Path of the on-disk cache entry for a product"""
+        return os.path.join(self.cache_dir, f"{pid}.json")
+
+    def _is_fresh(self, path: str) -> bool:
+        """Whether a cache entry exists and is younger than max_age_hours"""
+        if not os.path.exists(path):
+            return False
+        if self.max_age_hours is None:
+            return True
+        return (time.time() - os.path.getmtime(path)) < self.max_age_hours * 3600
+
+    @staticmethod
+    def _compact(cube: Dict) -> Dict:
+        """Keep only the parts of a getCubeMetadata object the pipeline uses"""
+        dimensions = []
+        for dim in sorted(cube.get("dimension", []), key=lambda d: d["dimensionPositionId"]):
+            dimensions.append({
+                "position": dim["dimensionPositionId"],
+                "name": dim["dimensionNameEn"],
+                "members": [
+                    {
+                        "id": m["memberId"],
+                        "name": m["memberNameEn"],
+                        "parent": m.get("parentMemberId"),
+                        "uom": m.get("memberUomCode"),
+                    }
+                    for m in dim.get("member", [])
+                ],
+            })
+
+        return {
+            "productId": product_id(cube["productId"]),
+            "title": cube.get("cubeTitleEn", ""),
+            "releaseTime": cube.get("releaseTime", ""),
+            "startDate": cube.get("cubeStartDate", ""),
+            "endDate": cube.get("cubeEndDate", ""),
+            "dimensions": dimensions,
+        }
+
+    def _index(self, table: Dict) -> None:
+        """Add a table's dimension trees to the in-process lookups"""
+        pid = table["productId"]
+        self._tables[pid] = table
+        for dim in table["dimensions"]:
+            key = (pid, dim["name"])
+            self._member_ids[key] = {m["name"]: m["id"] for m in dim["members"]}
+            self._member_names[key] = {m["id"]: m["name"] for m in dim["members"]}
+
+    def _post_batch(self, pids: List[int]) -> List[Dict]:
+        """Fetch cube metadata for one batch of products in a single POST"""
+        payload = [{"productId": pid} for pid in pids]
+        response = requests.post(f"{self.base_url}getCubeMetadata", json=payload, timeout=60)
+        response.raise_for_status()
+        return [item["object"] for item in response.json() if item.get("status") == "SUCCESS"]
+
+    async def fetch_async(self, pids: List[int]) -> Dict[int, Dict]:
+        """Fetch metadata for many products with concurrent batched requests"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = [pids[i:i + self.batch_size] for i in range(0, len(pids), self.batch_size)]
+
+        async def fetch(batch):
+            async with semaphore:
+                try:
+                    return await loop.run_in_executor(None, self._post_batch, batch)
+                except Exception as e:
+                    print(f"❌ Error fetching metadata for {batch}: {e}")
+                    return []
+
+        fetched = {}
+        for cubes in await asyncio.gather(*(fetch(b) for b in batches)):
+            for cube in cubes:
+                table = self._compact(cube)
+                fetched[table["productId"]] = table
+        return fetched
+
+    def load(self, pids: Iterable, refresh: bool = False, offline: bool = False) -> Dict[int, Dict]:
+        """Load metadata for the given tables, fetching only what is missing or stale
+
+        With offline=True nothing is fetched and only the on-disk cache is used.
+        """
+        wanted = list(dict.fromkeys(product_id(p) for p in pids))
+        to_fetch = []
+
+        for pid in wanted:
+            path = self._cache_path(pid)
+            if not refresh and (offline or self._is_fresh(path)) and os.path.exists(path):
+                if pid not in self._tables:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        self._index(json.load(f))
+            elif not offline:
+                to_fetch.append(pid)
+
+        if to_fetch:
+            print(f"Fetching metadata for {len(to_fetch)} tables...")
+            for pid, table in asyncio.run(self.fetch_async(to_fetch)).items():
+                with atomic_write(self._cache_path(pid), encoding='utf-8') as f:
+                    json.dump(table, f, ensure_ascii=False)
+                self._index(table)
+
+        return {pid: self._tables[pid] for pid in wanted if pid in self._tables}
+
+    def table(self, pid) -> Optional[Dict]:
+        """Get the cached metadata of a table, loading it from disk if needed"""
+        key = product_id(pid)
+        if key not in self._tables:
+            self.load([key], offline=True)
+        return self._tables.get(key)
+
+    def dimension_names(self, pid) -> List[str]:
+        """Get a table's dimension names in position order"""
+        table = self.table(pid)
+        return [d["name"] for d in table["dimensions"]] if table else []
+
+    def member_id(self, pid, dimension: str, name: str) -> Optional[int]:
+        """Look up a member id by its English name"""
+        self.table(pid)
+        return self._member_ids.get((product_id(pid), dimension), {}).get(name)
+
+    def member_name(self, pid, dimension: str, member_id: int) -> Optional[str]:
+        """Look up a member's English name by its id"""
+        self.table(pid)
+        return self._member_names.get((product_id(pid), dimension), {}).get(member_id)
+
+    def release_date(self, pid) -> Optional[str]:
+        """Get the release time of the cached table metadata"""
+        table = self.table(pid)
+        return table["releaseTime"] if table else None
+
+
+def run(args):
+    print("🧭 UBI Compass - Statistics Canada Metadata Cache")
+    print("="*60)
+
+    pids = args.pids or [table_info["pid"] for table_info in PRIORITY_TABLES.values()]
+    cache = StatsCanMetadataCache(cache_dir=args.cache_dir)
+    tables = cache.load(pids, refresh=args.refresh)
+
+    for pid, table in tables.items():
+        print(f"📊 {pid}: {table['title']} (released {table['releaseTime']})")
+        for dim in table["dimensions"]:
+            print(f"   {dim['name']}: {len(dim['members'])} members")
+
+    print(f"\n📁 Metadata cached in: {os.path.abspath(cache.cache_dir)}")
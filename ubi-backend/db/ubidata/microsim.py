@@ -0,0 +1,276 @@
+"""
+Microsimulation of UBI scenarios on a synthetic population
+Builds one record per person from the population cube's age counts and the tax filer
+income brackets (table 11-10-0008, loaded as tax_filer_data), stored as columnar
+arrays, then applies UBI, clawback, flat tax and program replacement person by person
+in vectorized chunks. Captures what the aggregate formulas average away: exemption
+thresholds, clawbacks and who loses OAS/CCB/EI/social assistance.
+"""
+
+import json
+import os
+import re
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .datadir import atomic_write
+from .scenario import (age_counts, calculate_ubi_feasibility, economic_context, load_parameters,
+                       open_population, population_breakdown)
+
+# UbiGenome's *Replacement genes (0-100%) and the clawback, on top of UBIParameters
+MICROSIM_PARAMETERS = {
+    "oasReplacement": 0,
+    "ccbReplacement": 0,
+    "eiReplacement": 0,
+    "socialAssistanceReplacement": 0,
+    "clawbackRate": 0,           # % of income above the threshold taken back from UBI
+    "clawbackThreshold": 50000,
+}
+
+# Annual program spending as in calculateFitness (genetic-optimizer.ts)
+PROGRAMS = {
+    "oas": ("oasReplacement", 58000000000),
+    "ccb": ("ccbReplacement", 25000000000),
+    "ei": ("eiReplacement", 22000000000),
+    "socialAssistance": ("socialAssistanceReplacement", 15000000000),
+}
+
+OAS_AGE = 65
+OAS_MAX_BENEFIT = 8000           # Annual OAS pension before the recovery tax
+OAS_RECOVERY_THRESHOLD = 81761   # 2022 OAS recovery tax threshold
+OAS_RECOVERY_RATE = 0.15
+EI_MAX_INSURABLE = 60300         # 2022 maximum insurable earnings
+SOCIAL_ASSISTANCE_INCOME = 15000
+INCOME_AGE = 15                  # Tax filer counts cover people aged 15 and over
+TOTAL_MEMBERS = {"Sex": "Both sexes", "Age group": "All age groups"}
+
+BANDS = ["children", "youth", "adults", "seniors"]
+CHUNK_SIZE = 1 << 22
+
+
+class IncomeBrackets:
+    def __init__(self, csv_path: str, year: int):
+        data = pd.read_csv(csv_path, encoding='utf-8-sig')
+        data = data[(data["GEO"] == "Canada") & (data["UOM"] == "Number")]
+        # A full-table download has every sex and age group; the brackets are for everyone
+        for column, member in TOTAL_MEMBERS.items():
+            if column in data.columns:
+                data = data[data[column] == member]
+        self.year = int(min(data["REF_DATE"].unique(), key=lambda y: abs(y - year)))
+        data = data[data["REF_DATE"] == self.year]
+        repeated = data["Persons with income"][data["Persons with income"].duplicated()].unique()
+        if len(repeated):
+            raise ValueError(f"{csv_path} has more than one {self.year} Canada row for "
+                             f"{', '.join(repeated[:3])}; expected one per income bracket")
+
+        self.persons = float(data.loc[data["Persons with income"] == "All persons with income", "VALUE"].iloc[0])
+        # "of $X and over" counts give the lower bounds; "under $5,000" starts at 0
+        at_least = {0: self.persons}
+        for label, value in zip(data["Persons with income"], data["VALUE"]):
+            match = re.search(r"of \$([\d,]+) and over", label)
+            if match:
+                at_least[int(match.group(1).replace(",", ""))] = float(value)
+
+        self.lower = np.array(sorted(at_least), dtype=np.float64)
+        over = np.array([at_least[bound] for bound in self.lower])
+        self.counts = over - np.append(over[1:], 0.0)
+        # Pareto tail above the top bound, fitted on the last two "and over" counts
+        self.pareto_alpha = np.log(over[-2] / over[-1]) / np.log(self.lower[-1] / self.lower[-2])
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """n incomes: a bracket by its share of filers, then uniform within it (Pareto in the top one)"""
+        cumulative = np.cumsum(self.counts) / self.counts.sum()
+        bracket = np.minimum(np.searchsorted(cumulative, rng.random(n), side="right"), len(self.lower) - 1)
+        u = rng.random(n)
+        low = self.lower[bracket]
+        high = np.append(self.lower[1:], np.inf)[bracket]
+        income = low + u * np.where(np.isinf(high), 0.0, high - low)
+        top = bracket == len(self.lower) - 1
+        income[top] = self.lower[-1] * (1.0 - u[top]) ** (-1.0 / self.pareto_alpha)
+        return income.astype(np.float32)
+
+
+class SyntheticPopulation:
+    def __init__(self, ages: np.ndarray, income: np.ndarray, weight: float, brackets: IncomeBrackets):
+        self.age = ages          # uint8 per record
+        self.income = income     # float32 per record, 0 for people without income
+        self.weight = weight     # People represented by each record
+        self.brackets = brackets
+
+    def __len__(self):
+        return len(self.age)
+
+    @property
+    def nbytes(self) -> int:
+        return self.age.nbytes + self.income.nbytes
+
+
+def build_population(cube, tax_filers_csv: str, year: int, sample=1.0, seed=42) -> SyntheticPopulation:
+    """One record per person (or per 1/sample people), ages from the cube, incomes from the brackets"""
+    rng = np.random.default_rng(seed)
+    counts = age_counts(cube, year)
+    records = np.round(counts * sample).astype(np.int64)
+    ages = np.repeat(np.arange(len(records), dtype=np.uint8), records)
+
+    brackets = IncomeBrackets(tax_filers_csv, year)
+    # Filers are spread evenly over ages 15+; the brackets carry no age detail
+    share = min(1.0, brackets.persons * sample / max(np.count_nonzero(ages >= INCOME_AGE), 1))
+    income = np.zeros(len(ages), dtype=np.float32)
+    for start in range(0, len(ages), CHUNK_SIZE):
+        chunk = income[start:start + CHUNK_SIZE]
+        has_income = (ages[start:start + CHUNK_SIZE] >= INCOME_AGE) & (rng.random(len(chunk), dtype=np.float32) < share)
+        chunk[has_income] = brackets.sample(rng, np.count_nonzero(has_income))
+    return SyntheticPopulation(ages, income, 1.0 / sample, brackets)
+
+
+def program_benefits(age: np.ndarray, income: np.ndarray) -> Dict[str, np.ndarray]:
+    """Unscaled benefit weights per record for each replaceable program"""
+    return {
+        "oas": np.where(age >= OAS_AGE, np.maximum(
+            0.0, OAS_MAX_BENEFIT - OAS_RECOVERY_RATE * np.maximum(income - OAS_RECOVERY_THRESHOLD, 0.0)), 0.0),
+        "ccb": (age < 18).astype(np.float64),
+        "ei": np.where((age >= INCOME_AGE) & (age < OAS_AGE), np.minimum(income, EI_MAX_INSURABLE), 0.0),
+        "socialAssistance": ((age >= 18) & (age < OAS_AGE) & (income < SOCIAL_ASSISTANCE_INCOME)).astype(np.float64),
+    }
+
+
+class Microsimulation:
+    def __init__(self, population: SyntheticPopulation, chunk_size=CHUNK_SIZE):
+        self.population = population
+        self.chunk_size = chunk_size
+
+    def chunks(self):
+        """(age, income) slices of the columnar arrays"""
+        for start in range(0, len(self.population), self.chunk_size):
+            stop = start + self.chunk_size
+            yield self.population.age[start:stop], self.population.income[start:stop].astype(np.float64)
+
+    def program_scales(self) -> Dict[str, float]:
+        """Dollars per benefit weight, so each program's per-person benefits add up to its total"""
+        weights = dict.fromkeys(PROGRAMS, 0.0)
+        for age, income in self.chunks():
+            for name, benefit in program_benefits(age, income).items():
+                weights[name] += benefit.sum()
+        weight = self.population.weight
+        return {name: total / (weights[name] * weight) if weights[name] else 0.0
+                for name, (_, total) in PROGRAMS.items()}
+
+    def run(self, parameters: Dict) -> Dict:
+        """Totals and distribution for one scenario, accumulated chunk by chunk"""
+        p = dict(MICROSIM_PARAMETERS, **parameters)
+        scales = self.program_scales()
+        totals = dict.fromkeys(["grossUbiCost", "clawback", "totalTaxRevenue", "programSavings",
+                                "taxpayers", "worseOff"], 0.0)
+        totals.update({f"{band}UbiCost": 0.0 for band in BANDS})
+        totals.update({f"{name}Savings": 0.0 for name in PROGRAMS})
+        worse_off = dict.fromkeys(BANDS, 0.0)
+
+        for age, income in self.chunks():
+            band = np.select([age < p["childAgeCutoff"], age < p["adultAgeCutoff"], age < p["seniorAgeCutoff"]],
+                             [0, 1, 2], 3)
+            # Annual UBI per person by band, as in calculateUBICosts (seniors get adult UBI + bonus)
+            amounts = np.array([p["childUbiAmount"] * 12, p["youthUbiAmount"] * 12, p["adultUbiAmount"],
+                                p["adultUbiAmount"] + p["seniorBonus"] * 12], dtype=np.float64)
+            ubi = amounts[band]
+            clawback = np.minimum(ubi, p["clawbackRate"] / 100 * np.maximum(income - p["clawbackThreshold"], 0.0))
+            ubi_paid = ubi - clawback
+
+            # Flat tax on each person's own income above the exemption; adult and senior UBI is taxable
+            taxable_ubi = np.where(band >= 2, ubi_paid, 0.0)
+            tax = np.maximum(income + taxable_ubi - p["exemptionAmount"], 0.0) * (p["taxPercentage"] / 100)
+
+            lost = np.zeros(len(age))
+            for name, benefit in program_benefits(age, income).items():
+                replaced = benefit * scales[name] * (p[PROGRAMS[name][0]] / 100)
+                totals[f"{name}Savings"] += replaced.sum()
+                lost += replaced
+
+            totals["grossUbiCost"] += ubi_paid.sum()
+            totals["clawback"] += clawback.sum()
+            totals["totalTaxRevenue"] += tax.sum()
+            totals["programSavings"] += lost.sum()
+            totals["taxpayers"] += np.count_nonzero(tax)
+            loses = lost > ubi_paid
+            totals["worseOff"] += np.count_nonzero(loses)
+            for i, name in enumerate(BANDS):
+                in_band = band == i
+                totals[f"{name}UbiCost"] += ubi_paid[in_band].sum()
+                worse_off[name] += np.count_nonzero(loses & in_band)
+
+        weight = self.population.weight
+        result = {key: float(value * weight) for key, value in totals.items()}
+        result["worseOffByBand"] = {band: float(count * weight) for band, count in worse_off.items()}
+        result["netUbiCost"] = result["grossUbiCost"] - result["totalTaxRevenue"] - result["programSavings"]
+        return result
+
+
+def run(args):
+    print("🧭 UBI Compass - Microsimulation")
+    print("="*60)
+
+    parameters = load_parameters(args.scenario, year=args.year)
+    parameters = dict(MICROSIM_PARAMETERS, **parameters)
+    for gene in ("oasReplacement", "ccbReplacement", "eiReplacement", "socialAssistanceReplacement"):
+        if getattr(args, gene) is not None:
+            parameters[gene] = getattr(args, gene)
+    year = parameters["year"]
+
+    if not os.path.exists(args.tax_filers):
+        print(f"❌ {args.tax_filers} not found; run `python -m ubidata download` first")
+        return None
+
+    start = time.perf_counter()
+    cube = open_population(args.cube)
+    try:
+        population = build_population(cube, args.tax_filers, year, sample=args.sample, seed=args.seed)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return None
+    built = time.perf_counter() - start
+    print(f"👥 {len(population):,} records for {year} ({population.nbytes / 1e6:,.0f} MB columnar, "
+          f"{population.weight:g} people per record) in {built:.2f}s")
+    print(f"   Incomes from {population.brackets.year} tax filer brackets "
+          f"({population.brackets.persons:,.0f} persons with income, Pareto tail α={population.brackets.pareto_alpha:.2f})")
+
+    start = time.perf_counter()
+    result = Microsimulation(population, chunk_size=args.chunk_size).run(parameters)
+    simulated = time.perf_counter() - start
+    print(f"⏱️  Simulated in {simulated:.2f}s ({len(population) / simulated:,.0f} records/s)")
+
+    # The app's aggregate formulas for the same scenario, for comparison
+    counts = age_counts(cube, year)
+    breakdown = population_breakdown(counts, parameters["childAgeCutoff"], parameters["adultAgeCutoff"],
+                                     parameters["seniorAgeCutoff"])
+    aggregate = calculate_ubi_feasibility(parameters, breakdown, economic_context(year))
+
+    print(f"\n{'':<22}{'microsim':>12}{'aggregate':>12}")
+    rows = [("Gross UBI cost", result["grossUbiCost"], aggregate["costs"]["grossUbiCost"]),
+            ("Tax revenue", result["totalTaxRevenue"], aggregate["taxation"]["totalTaxRevenue"]),
+            ("Program savings", result["programSavings"], 0.0),
+            ("Net UBI cost", result["netUbiCost"], aggregate["netUbiCost"])]
+    for label, micro, aggr in rows:
+        print(f"{label:<22}{f'${micro / 1e9:,.1f}B':>12}{f'${aggr / 1e9:,.1f}B':>12}")
+    print(f"{'% of GDP':<22}{result['netUbiCost'] / economic_context(year)['gdp'] * 100:>11.2f}%"
+          f"{float(aggregate['gdpPercentage']):>11.2f}%")
+
+    if result["clawback"]:
+        print(f"\n✂️  Clawed back: ${result['clawback'] / 1e9:,.1f}B")
+    print(f"💼 Taxpayers: {result['taxpayers']:,.0f}")
+    if result["programSavings"]:
+        savings = ", ".join(f"{name} ${result[f'{name}Savings'] / 1e9:,.1f}B" for name in PROGRAMS
+                            if result[f"{name}Savings"])
+        print(f"🔁 Replaced programs: {savings}")
+        bands = ", ".join(f"{band} {n:,.0f}" for band, n in result["worseOffByBand"].items() if n)
+        print(f"⚠️  Worse off (lose more benefits than their UBI): {result['worseOff']:,.0f} people"
+              + (f" ({bands})" if bands else ""))
+
+    if args.output:
+        with atomic_write(args.output, encoding='utf-8') as f:
+            json.dump({"parameters": parameters, "records": len(population), "sample": args.sample,
+                       "seconds": round(built + simulated, 4), "microsim": result,
+                       "aggregateNetUbiCost": float(aggregate["netUbiCost"])}, f, indent=2)
+        print(f"📁 Results saved: {args.output}")
+    return result
@@ -0,0 +1,202 @@
+"""
+Monte Carlo uncertainty bands for UBI scenario costs
+Perturbs the age-band populations, average income and GDP behind a scenario within
+simple error models and evaluates every draw as batched array math, split across a
+process pool. Reports percentile bands instead of a single point estimate.
+"""
+
+import concurrent.futures as cf
+import contextlib
+import io
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .datadir import atomic_write
+from .scenario import (FEASIBILITY_LEVELS, age_counts, calculate_ubi_feasibility, economic_context,
+                       load_parameters, open_population, population_breakdown)
+
+PERCENTILES = [5, 25, 50, 75, 95]
+BANDS = ["children", "youth", "adults", "seniors"]
+
+
+class ErrorModel:
+    def __init__(self, population_sd=0.005, interpolation_sd_per_year=0.003, income_sd=0.05, gdp_sd=0.02,
+                 census_sd=0.0):
+        # Relative standard deviations. Population error grows with the distance to the
+        # nearest census year, since the years between are interpolated.
+        self.population_sd = population_sd
+        self.interpolation_sd_per_year = interpolation_sd_per_year
+        # Floor taken from the census checksum mismatch (age 0 total vs. sum of ages)
+        self.census_sd = census_sd
+        self.income_sd = income_sd
+        self.gdp_sd = gdp_sd
+
+    def population_sd_for(self, year: int, census_years: List[int]) -> float:
+        """Relative population error for a year"""
+        distance = min(abs(year - census_year) for census_year in census_years) if census_years else 0
+        return max(self.population_sd + self.interpolation_sd_per_year * distance, self.census_sd)
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+def census_mismatch(census_path: str) -> float:
+    """Largest relative gap between the census total and the sum of single ages"""
+    from .interpolation import PopulationInterpolator
+
+    interpolator = PopulationInterpolator()
+    # The loader prints every row; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not interpolator.load_census_data(census_path):
+            return 0.0
+
+    worst = 0.0
+    for ages in interpolator.census_data.values():
+        total = ages.get(0, 0)
+        if total:
+            worst = max(worst, abs(total - sum(ages.get(age, 0) for age in range(1, 100))) / total)
+    return worst
+
+
+def simulate_batch(parameters: Dict, bands: Dict, economics: Dict, population_sd: float, income_sd: float,
+                   gdp_sd: float, draws: int, seed) -> Dict[str, np.ndarray]:
+    """Evaluate one batch of draws; every quantity is an array of length draws"""
+    rng = np.random.default_rng(seed)
+
+    # A shared factor moves the whole population; band factors move the age mix
+    common = rng.normal(0.0, population_sd, draws)
+    population = {}
+    for band in BANDS:
+        own = rng.normal(0.0, population_sd, draws)
+        population[band] = np.maximum(bands[band] * (1.0 + common + own), 0.0)
+    population["total"] = sum(population[band] for band in BANDS)
+
+    drawn = dict(economics)
+    drawn["averageIncome"] = economics["averageIncome"] * rng.lognormal(-income_sd ** 2 / 2, income_sd, draws)
+    drawn["gdp"] = economics["gdp"] * np.maximum(1.0 + rng.normal(0.0, gdp_sd, draws), 0.01)
+
+    result = calculate_ubi_feasibility(parameters, population, drawn)
+    return {
+        "grossUbiCost": result["costs"]["grossUbiCost"],
+        "totalTaxRevenue": result["taxation"]["totalTaxRevenue"],
+        "netUbiCost": result["netUbiCost"],
+        "gdpPercentage": result["gdpPercentage"],
+        "budgetPercentage": result["budgetPercentage"],
+    }
+
+
+class MonteCarloEngine:
+    def __init__(self, parameters: Dict, cube_path="population-canada.cube", census_path="population-age-id.csv",
+                 error_model: Optional[ErrorModel] = None, batch_size=50000, workers=None, seed=42):
+        self.parameters = parameters
+        self.error_model = error_model or ErrorModel()
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+
+        year = parameters["year"]
+        cube = open_population(cube_path)
+        breakdown = population_breakdown(age_counts(cube, year), parameters["childAgeCutoff"],
+                                         parameters["adultAgeCutoff"], parameters["seniorAgeCutoff"])
+        self.bands = {band: float(breakdown[band]) for band in BANDS}
+        self.economics = economic_context(year)
+
+        if os.path.exists(census_path) and not self.error_model.census_sd:
+            self.error_model.census_sd = census_mismatch(census_path)
+        census_years = [2000 + code for code in (2, 7, 12, 17, 22)]
+        self.population_sd = self.error_model.population_sd_for(year, census_years)
+
+    def point_estimate(self) -> Dict:
+        """The deterministic result the app would show"""
+        population = dict(self.bands, total=sum(self.bands.values()))
+        return calculate_ubi_feasibility(self.parameters, population, self.economics)
+
+    def run(self, draws: int) -> Dict[str, np.ndarray]:
+        """All draws, evaluated batch by batch across the process pool"""
+        batches = [min(self.batch_size, draws - start) for start in range(0, draws, self.batch_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(batches))
+        args = (self.parameters, self.bands, self.economics, self.population_sd,
+                self.error_model.income_sd, self.error_model.gdp_sd)
+
+        self.workers_used = min(self.workers, len(batches))
+        if self.workers_used == 1:
+            results = [simulate_batch(*args, n, s) for n, s in zip(batches, seeds)]
+        else:
+            with cf.ProcessPoolExecutor(max_workers=self.workers_used) as pool:
+                results = list(pool.map(simulate_batch, *zip(*[args + (n, s) for n, s in zip(batches, seeds)])))
+
+        return {key: np.concatenate([r[key] for r in results]) for key in results[0]}
+
+    @staticmethod
+    def summarize(samples: Dict[str, np.ndarray]) -> Dict:
+        """Percentile bands per output, plus how often each feasibility level occurs"""
+        summary = {key: dict(zip((f"p{p}" for p in PERCENTILES), np.percentile(values, PERCENTILES).tolist()))
+                   for key, values in samples.items()}
+        gdp = samples["gdpPercentage"]
+        levels = [gdp <= 0, (gdp > 0) & (gdp < 5), (gdp >= 5) & (gdp < 10), gdp >= 10]
+        summary["feasibility"] = {level: float(mask.mean()) for level, mask in zip(FEASIBILITY_LEVELS, levels)}
+        return summary
+
+
+def format_amount(amount: float) -> str:
+    """Billions with one decimal, like formatCurrency in the app"""
+    return f"${amount / 1e9:,.1f}B"
+
+
+def run(args):
+    print("🧭 UBI Compass - Monte Carlo Uncertainty")
+    print("="*60)
+
+    parameters = load_parameters(args.scenario, year=args.year)
+    error_model = ErrorModel(population_sd=args.population_sd, income_sd=args.income_sd, gdp_sd=args.gdp_sd)
+    engine = MonteCarloEngine(parameters, cube_path=args.cube, census_path=args.census, error_model=error_model,
+                              batch_size=args.batch_size, workers=args.workers, seed=args.seed)
+
+    start = time.perf_counter()
+    samples = engine.run(args.draws)
+    elapsed = time.perf_counter() - start
+    summary = engine.summarize(samples)
+    point = engine.point_estimate()
+
+    print(f"📊 {args.draws:,} draws for {parameters['year']} in {elapsed:.2f}s "
+          f"({args.draws / elapsed:,.0f} draws/s, {engine.workers_used} workers)")
+    print(f"   Population error: ±{engine.population_sd:.2%}, income ±{error_model.income_sd:.1%}, "
+          f"GDP ±{error_model.gdp_sd:.1%} (1 sd)")
+
+    print(f"\n{'':<18}{'point':>10}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES))
+    rows = [("Gross UBI cost", "grossUbiCost", point["costs"]["grossUbiCost"]),
+            ("Tax revenue", "totalTaxRevenue", point["taxation"]["totalTaxRevenue"]),
+            ("Net UBI cost", "netUbiCost", point["netUbiCost"])]
+    for label, key, value in rows:
+        bands = "".join(f"{format_amount(v):>10}" for v in summary[key].values())
+        print(f"{label:<18}{format_amount(value):>10}{bands}")
+    bands = "".join(f"{v:>9.2f}%" for v in summary["gdpPercentage"].values())
+    print(f"{'% of GDP':<18}{point['gdpPercentage']:>9.2f}%{bands}")
+
+    shares = [f"{level} {share:.1%}" for level, share in summary["feasibility"].items() if share]
+    print(f"\n🎯 Feasibility: {', '.join(shares)}")
+
+    if args.output:
+        report = {
+            "parameters": parameters,
+            "draws": args.draws,
+            "seed": args.seed,
+            "seconds": round(elapsed, 4),
+            "error_model": {**error_model.to_dict(), "population_sd_used": engine.population_sd},
+            "point": {
+                "grossUbiCost": float(point["costs"]["grossUbiCost"]),
+                "totalTaxRevenue": float(point["taxation"]["totalTaxRevenue"]),
+                "netUbiCost": float(point["netUbiCost"]),
+                "gdpPercentage": float(point["gdpPercentage"]),
+                "feasibility": point["feasibility"],
+            },
+            "percentiles": summary,
+        }
+        with atomic_write(args.output, encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📁 Percentile bands saved: {args.output}")
+    return summary
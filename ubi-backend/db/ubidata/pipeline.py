@@ -0,0 +1,459 @@
+"""
+Pipelined runner for download → extract → process → load
+Each table's stages are tasks with dependencies, so a table is processed as soon as
+its own download finishes while other tables are still downloading. Stages run on
+bounded pools and finished tasks are cached by a fingerprint of their inputs.
+"""
+
+import concurrent.futures as cf
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from .catalog import PRIORITY_TABLES
+from .datadir import SnapshotStore, atomic_write, table_lock
+
+STAGES = ["download", "extract", "process", "load"]
+
+
+def download_table(input_dir: str, base_url: str, table_key: str, use_vectors: bool) -> Dict:
+    """Download one catalog table (full ZIP, or its configured vectors) into input_dir"""
+    from .downloader import StatsCanaDataDownloader
+
+    downloader = StatsCanaDataDownloader(output_dir=input_dir, base_url=base_url)
+    table_info = downloader.priority_tables[table_key]
+    if use_vectors:
+        ok = downloader.download_table_vectors(table_key)
+        path = os.path.join(input_dir, table_info["csv_file"])
+    else:
+        ok = downloader.download_table_csv(table_info["pid"], table_key)
+        path = os.path.join(input_dir, zip_name(table_key))
+    if not ok:
+        raise RuntimeError(f"download of {table_key} failed")
+    return {"outputs": [path]}
+
+
+def extract_table(zip_path: str, extract_dir: str, csv_name: str) -> Dict:
+    """Extract a table ZIP and return the data CSV inside it
+
+    Members are extracted to a temporary directory and renamed into place, so a process
+    task of another run never reads a half-extracted CSV.
+    """
+    parent = os.path.dirname(os.path.abspath(extract_dir))
+    with table_lock(parent, os.path.basename(extract_dir)):
+        tmp_dir = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(extract_dir)}.")
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                zip_ref.extractall(tmp_dir)
+            for root, _, names in os.walk(tmp_dir):
+                for name in names:
+                    target = os.path.join(extract_dir, os.path.relpath(os.path.join(root, name), tmp_dir))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(os.path.join(root, name), target)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    csv_path = os.path.join(extract_dir, csv_name)
+    if not os.path.exists(csv_path):
+        raise RuntimeError(f"{csv_name} not found in {os.path.basename(zip_path)}")
+    return {"outputs": [csv_path]}
+
+
+def process_table(csv_path: str, file_key: str, input_dir: str, output_dir: str, star_schema: bool,
+                  real_dollars: bool, base_year: int, cpi_path: Optional[str], lock_dir: Optional[str] = None) -> Dict:
+    """Turn one CSV into its SQL file; runs in a worker process"""
+    from .processor import StatsCanaDataProcessor
+
+    processor = StatsCanaDataProcessor(input_dir=input_dir, output_dir=output_dir, star_schema=star_schema,
+                                       real_dollars=real_dollars, base_year=base_year, cpi_path=cpi_path,
+                                       lock_dir=lock_dir)
+    output_path = processor.process_file(file_key, csv_path)
+    if not output_path:
+        raise RuntimeError(f"processing {file_key} produced no SQL")
+    return {"outputs": [output_path] + processor.extra_outputs, "artifacts": processor.artifacts,
+            "metrics": processor.metrics.to_dict()["tables"]}
+
+
+def load_sql(sql_path: str, database_url: str) -> Dict:
+    """Import one SQL file with psql, stopping at the first error"""
+    subprocess.run(["psql", database_url, "-q", "-v", "ON_ERROR_STOP=1", "-f", sql_path],
+                   check=True, capture_output=True, text=True)
+    return {"outputs": []}
+
+
+def load_sql_files(sql_paths: List[str], database_url: str) -> Dict:
+    """Import a table's SQL files in order (main table first, then its rollup)"""
+    for sql_path in sql_paths:
+        load_sql(sql_path, database_url)
+    return {"outputs": []}
+
+
+def zip_name(table_key: str) -> str:
+    """File name the downloader gives a table's full ZIP"""
+    pid = PRIORITY_TABLES[table_key]["pid"]
+    return f"{pid.replace('-', '_')}_{table_key.replace(' ', '_')}.zip"
+
+
+class Task:
+    def __init__(self, table: str, stage: str, func: Callable, deps: Optional[List[str]] = None,
+                 inputs: Optional[List[str]] = None, params: Optional[Dict] = None,
+                 max_age_s: Optional[float] = None):
+        self.table = table
+        self.stage = stage
+        self.name = f"{stage}:{table}"
+        self.func = func
+        self.deps = deps or []
+
+        # Files whose size and mtime go into the cache fingerprint, plus any settings that change the output
+        self.inputs = inputs or []
+        self.params = params or {}
+
+        # Tasks without inputs (downloads) are cached for a fixed time instead
+        self.max_age_s = max_age_s
+
+    def fingerprint(self) -> str:
+        """Hash of the task settings and the current state of its input files"""
+        files = []
+        for path in self.inputs:
+            stat = os.stat(path) if os.path.exists(path) else None
+            files.append([path, stat.st_size if stat else None, stat.st_mtime_ns if stat else None])
+        payload = json.dumps({"task": self.name, "params": self.params, "inputs": files}, sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class TaskCache:
+    def __init__(self, path: str, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.entries = {}
+        if enabled and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                print(f"⚠️  Ignoring unreadable pipeline cache {path}: {e}")
+
+    def get(self, task: Task) -> Optional[Dict]:
+        """Cached result of a task, if its fingerprint matches and its outputs still exist"""
+        entry = self.entries.get(task.name)
+        if not self.enabled or not entry or entry["fingerprint"] != task.fingerprint():
+            return None
+        if task.max_age_s is not None and time.time() - entry["finished"] > task.max_age_s:
+            return None
+        if not all(os.path.exists(path) for path in entry["result"]["outputs"]):
+            return None
+        return entry["result"]
+
+    def put(self, task: Task, result: Dict) -> None:
+        """Remember a finished task and rewrite the cache file"""
+        self.entries[task.name] = {"fingerprint": task.fingerprint(), "finished": time.time(), "result": result}
+        with atomic_write(self.path, encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2)
+
+
+class PipelineRunner:
+    def __init__(self, input_dir="statscan_data", output_dir="processed_data", tables=None,
+                 offline=False, use_vectors=False, base_url="https://www150.statcan.gc.ca/t1/wds/rest/",
+                 star_schema=False, real_dollars=True, base_year=2002, database_url=None, workers=None,
+                 max_age_hours=24, use_cache=True, publish=False):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.tables = tables or list(PRIORITY_TABLES)
+        self.offline = offline
+        self.use_vectors = use_vectors
+        self.base_url = base_url
+        self.star_schema = star_schema
+        self.real_dollars = real_dollars
+        self.base_year = base_year
+        self.database_url = database_url
+        self.max_age_hours = max_age_hours
+
+        # Pool size per stage. Downloads stay few to be nice to the server; processing is CPU-bound
+        # and gets worker processes; loads go through one connection at a time by default.
+        self.workers = {"download": 2, "extract": 2, "process": min(len(self.tables), os.cpu_count() or 1),
+                        "load": 1}
+        self.workers.update({stage: n for stage, n in (workers or {}).items() if n})
+
+        os.makedirs(self.input_dir, exist_ok=True)
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.cache = TaskCache(os.path.join(self.output_dir, "pipeline_cache.json"), enabled=use_cache)
+
+        # With publish, this run's files go to a new version directory that becomes current only
+        # once every task succeeded; otherwise straight into output_dir, under per-table locks
+        self.store = SnapshotStore(self.output_dir) if publish else None
+        self.tables_dir = self.store.begin() if publish else self.output_dir
+
+        # {task name: {"status": ..., "stage": ..., "seconds": ...}} filled while running
+        self.report = {}
+
+    def _table_tasks(self, key: str) -> List[Task]:
+        """The download → extract → process → load chain for one catalog table"""
+        table_info = PRIORITY_TABLES[key]
+        csv_path = os.path.join(self.input_dir, table_info["csv_file"])
+        zip_path = os.path.join(self.input_dir, zip_name(key))
+        vector_mode = self.use_vectors and table_info.get("vectors")
+        tasks = []
+
+        if not self.offline:
+            tasks.append(Task(key, "download", partial(download_table, self.input_dir, self.base_url, key,
+                                                        bool(vector_mode)),
+                              params={"base_url": self.base_url, "vectors": bool(vector_mode)},
+                              max_age_s=self.max_age_hours * 3600))
+            source = csv_path if vector_mode else zip_path
+        elif os.path.exists(csv_path):
+            source = csv_path
+        elif os.path.exists(zip_path):
+            source = zip_path
+        else:
+            print(f"⚠️  No local data for {key} ({table_info['csv_file']} or {zip_name(key)}), skipping...")
+            return []
+
+        if source == zip_path:
+            extract_dir = zip_path[:-len(".zip")]
+            csv_name = f"{table_info['pid'].replace('-', '')[:8]}.csv"
+            tasks.append(Task(key, "extract", partial(extract_table, zip_path, extract_dir, csv_name),
+                              deps=[t.name for t in tasks], inputs=[zip_path]))
+            source = os.path.join(extract_dir, csv_name)
+
+        file_key = os.path.splitext(table_info["csv_file"])[0]
+        # Where the outputs go is part of the fingerprint: a hit must have left its files in this
+        # run's directory. Published runs share one entry, since each hit is linked into the new version.
+        tables_dir = None if self.store else os.path.abspath(self.output_dir)
+        tasks.append(Task(key, "process", None, deps=[tasks[-1].name] if tasks else [], inputs=[source],
+                          params={"file_key": file_key, "star_schema": self.star_schema,
+                                  "real_dollars": self.real_dollars, "base_year": self.base_year,
+                                  "publish": bool(self.store), "tables_dir": tables_dir}))
+
+        if self.database_url:
+            tasks.append(Task(key, "load", None, deps=[tasks[-1].name],
+                              params={"database_url": self.database_url}))
+        return tasks
+
+    def build_tasks(self) -> Dict[str, Task]:
+        """All tasks for the selected tables, keyed by name"""
+        tasks = {}
+        for key in self.tables:
+            if key not in PRIORITY_TABLES:
+                print(f"⚠️  Unknown table {key}, skipping... (known: {', '.join(PRIORITY_TABLES)})")
+                continue
+            for task in self._table_tasks(key):
+                tasks[task.name] = task
+
+        # Constant-dollar columns need the CPI table, so monetary tables wait for its CSV
+        cpi_task = tasks.get("process:inflation")
+        for task in tasks.values():
+            if task.stage == "process" and task is not cpi_task and self.real_dollars:
+                if cpi_task:
+                    task.deps += cpi_task.deps
+                    task.inputs.append(cpi_task.inputs[0])
+                task.params["cpi_path"] = cpi_task.inputs[0] if cpi_task else None
+        return tasks
+
+    def _prepare(self, task: Task, results: Dict[str, Dict]) -> Task:
+        """Bind inputs that are only known once the task's dependencies have finished"""
+        if task.stage == "process":
+            task.func = partial(process_table, task.inputs[0], task.params["file_key"], self.input_dir,
+                                self.tables_dir, self.star_schema, self.real_dollars, self.base_year,
+                                task.params.get("cpi_path"), self.output_dir)
+        elif task.stage == "load":
+            sql_paths = results[task.deps[0]]["outputs"]
+            task.inputs = list(sql_paths)
+            task.func = partial(load_sql_files, sql_paths, self.database_url)
+        return task
+
+    def run(self) -> Dict[str, Dict]:
+        """Run every task as soon as its dependencies are done; returns results by task name"""
+        self.tasks = tasks = self.build_tasks()
+        pending = dict(tasks)
+        results = {}
+        failed = set()
+        running = {}
+        started = {}
+
+        pools = {stage: (cf.ProcessPoolExecutor if stage == "process" else cf.ThreadPoolExecutor)(
+                     max_workers=self.workers[stage]) for stage in STAGES}
+        try:
+            while pending or running:
+                # Start (or take from the cache) everything whose dependencies are satisfied
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name, task in list(pending.items()):
+                        if any(dep in failed for dep in task.deps):
+                            del pending[name]
+                            failed.add(name)
+                            self.report[name] = {"stage": task.stage, "status": "skipped", "seconds": 0.0}
+                            progressed = True
+                        elif all(dep in results for dep in task.deps):
+                            del pending[name]
+                            self._prepare(task, results)
+                            cached = self.cache.get(task)
+                            if cached is not None:
+                                results[name] = cached
+                                self.report[name] = {"stage": task.stage, "status": "cached", "seconds": 0.0}
+                                print(f"♻️  {name} - cached")
+                                progressed = True
+                            else:
+                                started[name] = time.perf_counter()
+                                running[pools[task.stage].submit(task.func)] = task
+
+                if not running:
+                    continue
+
+                done, _ = cf.wait(running, return_when=cf.FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    seconds = round(time.perf_counter() - started[task.name], 4)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        failed.add(task.name)
+                        self.report[task.name] = {"stage": task.stage, "status": "failed", "seconds": seconds,
+                                                  "error": str(getattr(e, "stderr", "") or e).strip()}
+                        print(f"❌ {task.name} failed after {seconds:.2f}s: {self.report[task.name]['error']}")
+                        continue
+                    results[task.name] = result
+                    self.cache.put(task, result)
+                    self.report[task.name] = {"stage": task.stage, "status": "done", "seconds": seconds}
+                    print(f"✅ {task.name} - {seconds:.2f}s")
+        finally:
+            for pool in pools.values():
+                pool.shutdown()
+
+        return results
+
+    def critical_path(self) -> float:
+        """Longest chain of task times through the dependency graph"""
+        finish = {}
+
+        def finish_time(name: str) -> float:
+            if name not in finish:
+                start = max((finish_time(dep) for dep in self.tasks[name].deps), default=0.0)
+                finish[name] = start + self.report.get(name, {}).get("seconds", 0.0)
+            return finish[name]
+
+        return max((finish_time(name) for name in self.tasks), default=0.0)
+
+    def write_report(self, results: Dict[str, Dict], wall_s: float) -> str:
+        """Save pipeline_report.json and the processor's summary for the processed tables"""
+        report = {
+            "run_date": datetime.now().isoformat(timespec="seconds"),
+            "wall_s": round(wall_s, 4),
+            "task_s": round(sum(entry["seconds"] for entry in self.report.values()), 4),
+            "critical_path_s": round(self.critical_path(), 4),
+            "workers": self.workers,
+            "tasks": self.report,
+        }
+        report_path = os.path.join(self.tables_dir, "pipeline_report.json")
+        with atomic_write(report_path, encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        processed = [r for name, r in results.items() if name.startswith("process:")]
+        if processed:
+            from .processor import StatsCanaDataProcessor
+
+            processor = StatsCanaDataProcessor(input_dir=self.input_dir, output_dir=self.tables_dir)
+            for result in processed:
+                processor.metrics.tables.update(result.get("metrics", {}))
+            processor.create_summary_report([r["outputs"][0] for r in processed])
+        return report_path
+
+    def publish(self, results: Dict[str, Dict], keep: int = 5) -> Optional[str]:
+        """Make this run's version current, linking in the files of tables taken from the cache"""
+        if not self.store:
+            return None
+        reused = [path for name, result in results.items() if name.startswith("process:")
+                  for path in result["outputs"] + result.get("artifacts", [])]
+        version = self.store.publish(self.tables_dir, adopt=reused)
+        self.store.prune(keep=keep)
+        return version
+
+    def write_bundle(self, results: Dict[str, Dict], output: str, cube_path: str) -> Optional[Dict]:
+        """Rebuild the frontend's static data bundle from the CSVs this run processed"""
+        from .bundle import make_bundle
+        from .scenario import open_population
+
+        try:
+            cube = open_population(cube_path)
+        except FileNotFoundError as e:
+            print(f"⚠️  No static bundle written: {e}")
+            return None
+
+        def source(key):
+            task = self.tasks.get(f"process:{key}")
+            return task.inputs[0] if task and task.name in results else None
+
+        _, _, index = make_bundle(cube, output, source("inflation"), source("federal_finance"), source("tax_filers"))
+        return index
+
+    def print_report(self, wall_s: float) -> None:
+        """Per-task status table and how close the run came to its critical path"""
+        print("\n📋 PIPELINE SUMMARY")
+        print("="*60)
+        for name, entry in self.report.items():
+            icon = {"done": "✅", "cached": "♻️ ", "failed": "❌", "skipped": "⏭️ "}[entry["status"]]
+            print(f"{icon} {name:<32} {entry['status']:<8} {entry['seconds']:>8.2f}s")
+
+        task_s = sum(entry["seconds"] for entry in self.report.values())
+        print(f"\n⏱️  Wall time: {wall_s:.2f}s (sum of tasks {task_s:.2f}s, "
+              f"slowest chain {self.critical_path():.2f}s)")
+
+
+def run(args):
+    print("🧭 UBI Compass - Data Pipeline")
+    print("="*60)
+
+    runner = PipelineRunner(
+        input_dir=args.input_dir,
+        output_dir=args.output_dir,
+        tables=[t for t in args.tables.split(",") if t],
+        offline=args.offline,
+        use_vectors=args.vectors,
+        base_url=args.base_url,
+        star_schema=args.star_schema,
+        real_dollars=not args.no_real_dollars,
+        base_year=args.base_year,
+        database_url=args.database_url,
+        workers={"download": args.download_workers, "process": args.process_workers,
+                 "load": args.load_workers},
+        max_age_hours=args.max_age_hours,
+        use_cache=not args.no_cache,
+        publish=args.publish,
+    )
+
+    start = time.perf_counter()
+    results = runner.run()
+    wall_s = time.perf_counter() - start
+
+    runner.print_report(wall_s)
+    report_path = runner.write_report(results, wall_s)
+    print(f"📁 Pipeline report saved: {report_path}")
+
+    if not args.database_url:
+        print("\n💡 No --database-url given; SQL files were left in "
+              f"{os.path.abspath(runner.tables_dir)} for import")
+
+    failed = [name for name, entry in runner.report.items() if entry["status"] == "failed"]
+    if failed:
+        if runner.store:
+            runner.store.abort(runner.tables_dir)
+            print("\n⚠️  Nothing published; the current version is unchanged")
+        print(f"\n❌ {len(failed)} task(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+
+    if runner.store:
+        version = runner.publish(results, keep=args.keep_versions)
+        print(f"📌 Published version {version}: {os.path.join(args.output_dir, 'current')}")
+
+    if args.bundle:
+        index = runner.write_bundle(results, args.bundle, args.cube)
+        if index:
+            print(f"📦 Static data bundle {index['dataVersion']} written to {args.bundle}")
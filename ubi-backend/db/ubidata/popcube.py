@@ -0,0 +1,135 @@
+"""
+Binary population cube (year × geography × sex × age, int32)
+A fixed 64-byte header and a JSON label block are followed by the counts in C order,
+aligned to 64 bytes, so Python can np.memmap the file and Node can view it as an
+Int32Array without parsing. As in the populations table, age 0 holds the total.
+
+Header (little-endian): magic "UBIPOPC\\0", version u16, ndim u16, years/geographies/
+sexes/ages counts u32 x4, labels offset u32, labels length u32, data offset u32.
+"""
+
+import json
+import os
+import struct
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .datadir import atomic_write
+
+CUBE_MAGIC = b"UBIPOPC\0"
+CUBE_VERSION = 1
+CUBE_HEADER = struct.Struct("<8sHHIIIIIII24x")  # 64 bytes
+CUBE_ALIGN = 64
+AXES = ("years", "geographies", "sexes", "ages")
+
+
+def write_cube(path: str, data: np.ndarray, years: Sequence[int], geographies: Sequence[str],
+               sexes: Sequence[str], ages: Sequence[int]) -> str:
+    """Write a cube file atomically, so readers never map a half-written file"""
+    labels = {"years": [int(y) for y in years], "geographies": list(geographies),
+              "sexes": list(sexes), "ages": [int(a) for a in ages]}
+    shape = tuple(len(labels[axis]) for axis in AXES)
+    data = np.ascontiguousarray(data, dtype="<i4")
+    if data.shape != shape:
+        raise ValueError(f"cube data has shape {data.shape}, labels describe {shape}")
+
+    label_bytes = json.dumps(labels, separators=(",", ":")).encode("utf-8")
+    labels_offset = CUBE_HEADER.size
+    data_offset = -(-(labels_offset + len(label_bytes)) // CUBE_ALIGN) * CUBE_ALIGN
+
+    with atomic_write(path, 'wb') as f:
+        f.write(CUBE_HEADER.pack(CUBE_MAGIC, CUBE_VERSION, len(shape), *shape,
+                                 labels_offset, len(label_bytes), data_offset))
+        f.write(label_bytes)
+        f.write(b"\0" * (data_offset - labels_offset - len(label_bytes)))
+        f.write(data.tobytes())
+    return path
+
+
+def cube_from_rows(rows: Iterable[Tuple[int, str, str, int, int]]) -> Tuple[np.ndarray, Dict[str, List]]:
+    """Dense cube and labels from (year, geography, sex, age, population) rows; missing cells are 0"""
+    rows = list(rows)
+    years = sorted({r[0] for r in rows})
+    geographies = list(dict.fromkeys(r[1] for r in rows))
+    sexes = list(dict.fromkeys(r[2] for r in rows))
+    ages = sorted({r[3] for r in rows})
+
+    index = [{v: i for i, v in enumerate(axis)} for axis in (years, geographies, sexes, ages)]
+    data = np.zeros([len(axis) for axis in index], dtype="<i4")
+    for year, geography, sex, age, population in rows:
+        data[index[0][year], index[1][geography], index[2][sex], index[3][age]] = population
+    return data, {"years": years, "geographies": geographies, "sexes": sexes, "ages": ages}
+
+
+class PopulationCube:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(CUBE_HEADER.size)
+            if len(header) < CUBE_HEADER.size:
+                raise ValueError(f"{path} is too short to be a population cube")
+            (magic, version, ndim, *shape, labels_offset, labels_length,
+             self.data_offset) = CUBE_HEADER.unpack(header)
+            if magic != CUBE_MAGIC or ndim != len(AXES):
+                raise ValueError(f"{path} is not a population cube")
+            if version > CUBE_VERSION:
+                raise ValueError(f"{path} is cube version {version}; this reader knows {CUBE_VERSION}")
+            f.seek(labels_offset)
+            self.labels = json.loads(f.read(labels_length).decode("utf-8"))
+
+        self.shape = tuple(shape)
+        self.years, self.geographies, self.sexes, self.ages = (self.labels[axis] for axis in AXES)
+        self._positions = [{v: i for i, v in enumerate(self.labels[axis])} for axis in AXES]
+
+        # Read-only mapping: pages are loaded on first touch and shared between processes
+        self.data = np.memmap(path, dtype="<i4", mode="r", offset=self.data_offset, shape=self.shape)
+
+    def index(self, year: int, age: int, geography: Optional[str] = None, sex: Optional[str] = None) -> Tuple:
+        """Array index of a cell; geography and sex default to the first entry (Canada, both sexes)"""
+        geography = self.geographies[0] if geography is None else geography
+        sex = self.sexes[0] if sex is None else sex
+        return tuple(positions[key] for positions, key in zip(self._positions, (year, geography, sex, age)))
+
+    def get(self, year: int, age: int, geography: Optional[str] = None, sex: Optional[str] = None) -> int:
+        """Population of one cell"""
+        return int(self.data[self.index(year, age, geography, sex)])
+
+    def age_range(self, year: int, first_age: int, last_age: int, geography: Optional[str] = None,
+                  sex: Optional[str] = None) -> int:
+        """Population aged first_age..last_age (inclusive) in one year"""
+        y, g, s, _ = self.index(year, self.ages[0], geography, sex)
+        ages = np.asarray(self.ages)
+        mask = (ages >= max(first_age, 1)) & (ages <= last_age)
+        return int(self.data[y, g, s][mask].sum(dtype=np.int64))
+
+
+def open_cube(path: str) -> PopulationCube:
+    """Map a population cube read-only"""
+    return PopulationCube(path)
+
+
+def run(args):
+    print("🧭 UBI Compass - Population Cube")
+    print("="*60)
+
+    start = time.perf_counter()
+    cube = open_cube(args.path)
+    opened_us = (time.perf_counter() - start) * 1e6
+
+    print(f"📦 {args.path}: {' × '.join(str(n) for n in cube.shape)} int32 "
+          f"({cube.data.nbytes:,} bytes at offset {cube.data_offset})")
+    print(f"   Years: {cube.years[0]}-{cube.years[-1]} ({len(cube.years)})")
+    print(f"   Geographies: {', '.join(cube.geographies)}")
+    print(f"   Sexes: {', '.join(cube.sexes)}")
+    print(f"   Ages: {cube.ages[0]}-{cube.ages[-1]} (age 0 is the total)")
+    print(f"⏱️  Opened in {opened_us:.0f} µs")
+
+    for year in ([args.year] if args.year else cube.years):
+        if year not in cube.years:
+            print(f"⚠️  {year} is not in the cube")
+            continue
+        print(f"   {year}: total {cube.get(year, 0):,}, "
+              f"0-17 {cube.age_range(year, 0, 17):,}, 65+ {cube.age_range(year, 65, cube.ages[-1]):,}")
+    return cube
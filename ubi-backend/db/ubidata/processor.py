@@ -0,0 +1,879 @@
+"""
+Statistics Canada Data Processor for UBI Analysis
+Processes downloaded CSV files and creates SQL insert statements
+"""
+
+import cProfile
+import io
+import json
+import marshal
+import os
+import csv
+import pstats
+import sys
+import time
+import tracemalloc
+import zipfile
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+import re
+
+from .ccofog import PROGRAM_FUNCTIONS, REPLACEABLE, ROOT, SubtreeIndex
+from .datadir import atomic_write, table_lock
+from .quality import QualityGate, summary_line
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, where the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+class ProcessingMetrics:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.tables = {}  # {table: {"stages": {stage: {...}}, "rows_in": ..., ...}}
+
+    def _table(self, table: str) -> Dict:
+        """Metrics entry for a table, created on first use"""
+        return self.tables.setdefault(table, {"stages": {}})
+
+    def stage(self, table: str, stage: str):
+        """Context manager timing one stage (wall and CPU) of a table; a no-op when disabled"""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(table, stage)
+
+    @contextmanager
+    def _timed(self, table: str, stage: str):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            stages = self._table(table)["stages"]
+            timing = stages.setdefault(stage, {"wall_s": 0.0, "cpu_s": 0.0})
+            timing["wall_s"] += time.perf_counter() - wall_start
+            timing["cpu_s"] += time.process_time() - cpu_start
+
+    def record_table(self, table: str, output_path: str = "", **counts) -> None:
+        """Record row counts, bytes written and the peak RSS once a table is done"""
+        if not self.enabled:
+            return
+        entry = self._table(table)
+        entry.update(counts)
+        entry["bytes_written"] = os.path.getsize(output_path) if output_path and os.path.exists(output_path) else 0
+        entry["peak_rss_mb"] = peak_rss_mb()
+
+    def to_dict(self) -> Dict:
+        """JSON-ready metrics with per-table totals"""
+        tables = {}
+        for table, entry in self.tables.items():
+            stages = {name: {k: round(v, 6) for k, v in timing.items()} for name, timing in entry["stages"].items()}
+            tables[table] = {**entry, "stages": stages,
+                             "wall_s": round(sum(t["wall_s"] for t in entry["stages"].values()), 6)}
+        return {"peak_rss_mb": peak_rss_mb(), "tables": tables}
+
+    def markdown(self) -> List[str]:
+        """Performance section lines for processing_summary.md"""
+        lines = ["| Table | Stage | Wall (s) | CPU (s) |", "|---|---|---:|---:|"]
+        for table, entry in self.tables.items():
+            for stage, timing in entry["stages"].items():
+                lines.append(f"| {table} | {stage} | {timing['wall_s']:.4f} | {timing['cpu_s']:.4f} |")
+
+        lines += ["", "| Table | Rows in | Rows in years | Rows out | Quality errors | Quality warnings | "
+                      "Bytes written | Peak RSS (MB) |",
+                  "|---|---:|---:|---:|---:|---:|---:|---:|"]
+        for table, entry in self.tables.items():
+            lines.append(f"| {table} | {entry.get('rows_in', '')} | {entry.get('rows_filtered', '')} | "
+                         f"{entry.get('rows_out', '')} | {entry.get('quality_errors', '')} | "
+                         f"{entry.get('quality_warnings', '')} | {entry.get('bytes_written', '')} | "
+                         f"{entry.get('peak_rss_mb') if entry.get('peak_rss_mb') is not None else 'n/a'} |")
+        return lines
+
+class StatsCanaDataProcessor:
+    # Output tables: (SQL column, CSV column, SQL type)
+    table_columns = {
+        "income_distribution": [
+            ("year", "REF_DATE", "INT"),
+            ("age_group", "Age group", "VARCHAR(50)"),
+            ("income_source", "Income source", "VARCHAR(100)"),
+            ("sex", "Sex", "VARCHAR(20)"),
+            ("value", "VALUE", "DECIMAL(15,2)"),
+            ("unit", "UOM", "VARCHAR(50)"),
+        ],
+        "gdp_data": [
+            ("year", "REF_DATE", "INT"),
+            ("geography", "GEO", "VARCHAR(100)"),
+            ("gdp_component", "Estimates", "VARCHAR(100)"),
+            ("value", "VALUE", "DECIMAL(15,2)"),
+            ("unit", "UOM", "VARCHAR(50)"),
+        ],
+        "federal_finance": [
+            ("year", "REF_DATE", "INT"),
+            ("geography", "GEO", "VARCHAR(100)"),
+            ("revenue_expenditure", "Revenue and expenditure", "VARCHAR(100)"),
+            ("component", "Components", "VARCHAR(200)"),
+            ("value", "VALUE", "DECIMAL(15,2)"),
+            ("unit", "UOM", "VARCHAR(50)"),
+        ],
+        "cpi_data": [
+            ("year", "REF_DATE", "INT"),
+            ("geography", "GEO", "VARCHAR(100)"),
+            ("products", "Products and product groups", "VARCHAR(200)"),
+            ("value", "VALUE", "DECIMAL(8,2)"),
+            ("unit", "UOM", "VARCHAR(50)"),
+        ],
+        "tax_filer_data": [
+            ("year", "REF_DATE", "INT"),
+            ("geography", "GEO", "VARCHAR(100)"),
+            ("age_group", "Age group", "VARCHAR(50)"),
+            ("sex", "Sex", "VARCHAR(20)"),
+            ("income_bracket", "Total income", "VARCHAR(100)"),
+            ("value", "VALUE", "DECIMAL(15,2)"),
+            ("unit", "UOM", "VARCHAR(50)"),
+        ],
+    }
+    table_columns["provincial_finance"] = table_columns["federal_finance"]
+
+    table_comments = {
+        "income_distribution": "Income distribution data from Statistics Canada",
+        "gdp_data": "GDP data from Statistics Canada",
+        "federal_finance": "Federal government finance data",
+        "provincial_finance": "Provincial government finance data",
+        "cpi_data": "CPI/Inflation data from Statistics Canada",
+        "tax_filer_data": "Tax filer data from Statistics Canada",
+    }
+
+    # Tables whose "Dollars" rows get a constant-dollar value_real column deflated by CPI
+    real_dollar_tables = {"income_distribution", "gdp_data", "federal_finance", "provincial_finance",
+                          "tax_filer_data"}
+    current_dollar_units = {"Dollars", "Current dollars"}
+
+    # Finance tables that also get a {table}_rollup of totals by CCOFOG division
+    rollup_tables = {"federal_finance", "provincial_finance"}
+    rollup_key = ("year", "geography", "component", "function_code")
+    function_column = "Canadian Classification of Functions of Government (CCOFOG)"
+    component_column = "Public sector components"
+
+    # Natural key of every output table: a StatsCan vector identifies one coordinate (all
+    # dimension members) of a table, so (year, vector) identifies a row
+    key_columns = ("year", "vector")
+
+    def __init__(self, input_dir="statscan_data", output_dir="processed_data", metrics=True,
+                 star_schema=False, real_dollars=True, base_year=2002, cpi_path=None, strict_quality=False,
+                 outlier_ratio=10.0, lock_dir=None):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        # Per-table locks ({lock_dir}/.locks/{table}.lock) so concurrent runs into one directory take turns
+        self.lock_dir = lock_dir or output_dir
+
+        # Star schema mode writes {table}_star.sql with dimension tables and an integer fact table
+        self.star_schema = star_schema
+
+        # Rows per multi-row INSERT ... ON CONFLICT statement
+        self.batch_size = 1000
+
+        # Constant-dollar columns use the Canada all-items CPI, rebased so base_year = 100;
+        # cpi_path defaults to the CPI CSV found in input_dir
+        self.real_dollars = real_dollars
+        self.base_year = base_year
+        self.cpi_path = cpi_path
+        self._deflators = None
+
+        # Create output directory in current working directory
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Scale, status, duplicate and outlier checks on every table, reported in quality/{table}.json;
+        # with strict_quality a table with errors is not written
+        self.quality = QualityGate(outlier_ratio=outlier_ratio)
+        self.strict_quality = strict_quality
+        self.quality_dir = os.path.join(self.output_dir, "quality")
+
+        # Text copy of each table's loaded rows, diffed against the last loaded copy by delta loads
+        self.snapshot_dir = os.path.join(self.output_dir, "snapshot")
+        # SQL files written besides each table's main file (finance rollups), loaded after it
+        self.extra_outputs = []
+        # Non-SQL files written per table (row snapshot, quality report)
+        self.artifacts = []
+
+        # Year range for UBI analysis
+        self.target_years = list(range(2000, 2023))
+
+        # Per-stage timings and row counts; disabled metrics cost nothing
+        self.metrics = ProcessingMetrics(enabled=metrics)
+        
+    def extract_zip_files(self) -> List[str]:
+        """Extract all ZIP files in the input directory"""
+        extracted_files = []
+        
+        print("📦 Extracting ZIP files...")
+        
+        for filename in os.listdir(self.input_dir):
+            if filename.endswith('.zip'):
+                zip_path = os.path.join(self.input_dir, filename)
+                extract_dir = os.path.join(self.input_dir, filename.replace('.zip', ''))
+                
+                try:
+                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                        zip_ref.extractall(extract_dir)
+                        extracted_files.append(extract_dir)
+                        print(f"✅ Extracted: {filename}")
+                except Exception as e:
+                    print(f"❌ Failed to extract {filename}: {e}")
+        
+        return extracted_files
+
+    def find_csv_files(self) -> Dict[str, str]:
+        """Find all CSV files in input directory"""
+        csv_files = {}
+
+        # Look for CSV files directly in the input directory
+        for file in os.listdir(self.input_dir):
+            if file.endswith('.csv'):
+                full_path = os.path.join(self.input_dir, file)
+                # Use the filename (without extension) as the key
+                file_key = file.replace('.csv', '')
+                csv_files[file_key] = full_path
+                print(f"📄 Found CSV file: {file}")
+
+        # Also check subdirectories (for extracted ZIP files)
+        for root, dirs, files in os.walk(self.input_dir):
+            for file in files:
+                if file.endswith('.csv') and root != self.input_dir:
+                    full_path = os.path.join(root, file)
+                    # Use the directory name as the key
+                    dir_name = os.path.basename(root)
+                    csv_files[dir_name] = full_path
+                    print(f"📄 Found CSV file in subdirectory: {file}")
+
+        return csv_files
+
+    def find_cpi_csv(self) -> Optional[str]:
+        """Path of the CPI CSV in the input directory (or an extracted ZIP below it)"""
+        for root, dirs, files in os.walk(self.input_dir):
+            for file in sorted(files):
+                key = f"{os.path.basename(root)}/{file}".lower()
+                if file.endswith('.csv') and ("18100005" in key or "cpi" in key or "inflation" in key):
+                    return os.path.join(root, file)
+        return None
+
+    def deflators(self) -> Optional[pd.Series]:
+        """Multiplier per year turning current dollars into base-year dollars; None if unavailable"""
+        if self._deflators is not None or not self.real_dollars:
+            return self._deflators
+
+        cpi_path = self.cpi_path or self.find_cpi_csv()
+        if not cpi_path or not os.path.exists(cpi_path):
+            print("⚠️  No CPI data found, skipping constant-dollar columns")
+            self.real_dollars = False
+            return None
+
+        cpi = pd.read_csv(cpi_path, encoding='utf-8', usecols=['REF_DATE', 'GEO', 'Products and product groups',
+                                                               'VALUE'])
+        cpi = cpi[(cpi['GEO'] == 'Canada') & (cpi['Products and product groups'] == 'All-items')]
+        # Monthly REF_DATEs (2002-01) average into an annual index
+        annual = cpi.groupby(cpi['REF_DATE'].astype(str).str[:4].astype(int))['VALUE'].mean()
+
+        if self.base_year not in annual.index:
+            print(f"⚠️  CPI has no {self.base_year} value, skipping constant-dollar columns")
+            self.real_dollars = False
+            return None
+
+        self._deflators = annual.loc[self.base_year] / annual
+        return self._deflators
+
+    def output_columns(self, table_name: str) -> List[Tuple[str, str, str]]:
+        """Columns written for a table, including value_real when constant dollars apply"""
+        columns = self.table_columns[table_name]
+        columns = columns[:1] + [("vector", "VECTOR", "VARCHAR(20)")] + columns[1:]
+        if table_name in self.real_dollar_tables and self.deflators() is not None:
+            value_type = next(sql_type for _, csv_col, sql_type in columns if csv_col == 'VALUE')
+            columns = columns + [("value_real", "VALUE_REAL", value_type)]
+        return columns
+
+    def add_real_dollars(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Add VALUE_REAL (constant base-year dollars) for the current-dollar rows of a table"""
+        if table_name not in self.real_dollar_tables or self.deflators() is None or 'VALUE' not in df.columns:
+            return df
+        years = df['REF_DATE'].astype(str).str[:4].astype(int)
+        dollars = df['UOM'].isin(self.current_dollar_units) if 'UOM' in df.columns else False
+        real = (df['VALUE'] * years.map(self._deflators)).round(2)
+        return df.assign(VALUE_REAL=real.where(dollars))
+
+    def _keyed_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows that get loaded: non-missing, non-zero values, one per (year, vector)"""
+        values = df['VALUE'] if 'VALUE' in df.columns else pd.Series(0, index=df.index)
+        df = df[values.notna() & (values != 0)]
+        # A multi-row upsert may not touch the same key twice; the last row wins as in the downloader
+        return df.drop_duplicates(subset=['REF_DATE', 'VECTOR'], keep='last')
+
+    @staticmethod
+    def canonical_numbers(values: pd.Series) -> pd.Series:
+        """Numbers as %.15g text (97511 and 97511.0 both become "97511"), '' for missing;
+        anything that is not a number (e.g. a fiscal year "2019/2020") is kept as it is"""
+        numbers = pd.to_numeric(values, errors='coerce').astype(np.float64)
+        text = values.astype(str).where(values.notna(), '')
+        parsed = numbers.notna().to_numpy()
+        if parsed.any():
+            text = text.copy()
+            text[parsed] = np.char.mod('%.15g', numbers.to_numpy()[parsed])
+        return text
+
+    def snapshot_rows(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """The loaded rows as text under their SQL column names, '' for NULL; what delta loads diff
+
+        Numeric columns are written in one canonical form, so a blank cell elsewhere in the
+        table (which makes pandas read VALUE as float) does not change every row's text.
+        """
+        rows = self._keyed_rows(df)
+        snapshot = {}
+        for col, csv_col, sql_type in self.output_columns(table_name):
+            if csv_col not in rows.columns:
+                snapshot[col] = pd.Series('', index=rows.index)
+            elif sql_type.startswith(("INT", "DECIMAL")):
+                snapshot[col] = self.canonical_numbers(rows[csv_col])
+            else:
+                snapshot[col] = rows[csv_col].astype(str).where(rows[csv_col].notna(), '')
+        return pd.DataFrame(snapshot)
+
+    def _table_ddl(self, table_name: str, columns: List[Tuple[str, str]], value_columns: List[str]) -> List[str]:
+        """CREATE TABLE with the natural primary key, plus covering indexes for lookups by year and year+geography"""
+        key = ", ".join(self.key_columns)
+        include = ", ".join(value_columns)
+        geography = next((col for col, _ in columns if col in ("geography", "geography_id")), None)
+        statements = [
+            f"-- Keyed by ({key}); drop a {table_name} table loaded from an unkeyed dump before loading this file",
+            f"CREATE TABLE IF NOT EXISTS {table_name} (",
+            ",\n".join([f"    {col} {sql_type}" for col, sql_type in columns] + [f"    PRIMARY KEY ({key})"]),
+            ");",
+            f"CREATE INDEX IF NOT EXISTS {table_name}_year_idx ON {table_name} (year) INCLUDE ({include});",
+        ]
+        if geography:
+            statements.append(f"CREATE INDEX IF NOT EXISTS {table_name}_year_geo_idx "
+                              f"ON {table_name} (year, {geography}) INCLUDE ({include});")
+        statements.append("")
+        return statements
+
+    def _upsert_statements(self, table_name: str, columns: List[str], rows: List[str],
+                           key: Optional[Tuple[str, ...]] = None,
+                           source: Optional[Tuple[str, str]] = None) -> List[str]:
+        """Batched INSERT ... ON CONFLICT DO UPDATE; rows whose values did not change are left untouched
+
+        With source = (select list, FROM clause after the VALUES list), each batch is inserted as
+        SELECT ... FROM (VALUES ...) v(...), e.g. to resolve ids by joining other tables.
+        """
+        key = key or self.key_columns
+        column_list = ", ".join(columns)
+        updated = [col for col in columns if col not in key]
+        conflict = (f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET "
+                    + ", ".join(f"{col} = EXCLUDED.{col}" for col in updated)
+                    + f"\nWHERE ({', '.join(f'{table_name}.{col}' for col in updated)}) IS DISTINCT FROM "
+                    + f"({', '.join(f'EXCLUDED.{col}' for col in updated)});")
+
+        statements = []
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            if source:
+                statements.append(f"INSERT INTO {table_name} ({column_list})\nSELECT {source[0]}\nFROM (VALUES")
+                statements.append(",\n".join(f"({r})" for r in batch))
+                statements.append(f") {source[1]}")
+            else:
+                statements.append(f"INSERT INTO {table_name} ({column_list}) VALUES")
+                statements.append(",\n".join(f"({r})" for r in batch))
+            statements.append(conflict)
+        return statements
+
+    def _wide_statements(self, table_name: str, df: pd.DataFrame) -> Tuple[List[str], int]:
+        """Keyed CREATE TABLE plus batched upserts, with dimension values stored as text"""
+        columns = self.output_columns(table_name)
+        value_columns = [col for col, csv_col, _ in columns if csv_col in ('VALUE', 'VALUE_REAL')]
+
+        sql_statements = []
+        sql_statements.append(f"-- {self.table_comments[table_name]}")
+        if columns[-1][0] == "value_real":
+            sql_statements.append(f"-- value_real: value in constant {self.base_year} dollars (CPI all-items, Canada)")
+        sql_statements += self._table_ddl(
+            table_name,
+            [(col, f"{sql_type} NOT NULL" if col in self.key_columns else sql_type) for col, _, sql_type in columns],
+            value_columns)
+
+        # Process each row
+        rows = []
+        for _, row in self._keyed_rows(df).iterrows():
+            values = []
+            for _, csv_col, _ in columns:
+                if csv_col == 'REF_DATE':
+                    values.append(str(row['REF_DATE']))
+                elif csv_col == 'VALUE':
+                    values.append(str(row['VALUE']))
+                elif csv_col == 'VALUE_REAL':
+                    values.append(str(row[csv_col]) if pd.notna(row[csv_col]) else "NULL")
+                else:
+                    values.append("'" + str(row.get(csv_col, '')).replace("'", "''") + "'")
+            rows.append(", ".join(values))
+
+        sql_statements += self._upsert_statements(table_name, [col for col, _, _ in columns], rows)
+        return sql_statements, len(rows)
+
+    def _star_statements(self, table_name: str, df: pd.DataFrame) -> Tuple[List[str], int]:
+        """Dimension tables of interned text values plus a compact integer-keyed fact table
+
+        Each text column becomes {table}_dim_{column}(id, name); the fact table
+        {table}_fact holds (year, vector, <column>_id..., value), keyed by (year, vector)
+        and loaded with batched upserts. A {table}_wide view restores the original text layout.
+
+        Dimension rows are keyed by name: a load adds only names the table lacks, giving them
+        the next free ids, so ids already referenced by facts never change. The file numbers
+        its names locally and a temporary {table}_map_{column} turns those numbers into ids.
+        """
+        columns = self.output_columns(table_name)
+        dimensions = [(col, csv_col) for col, csv_col, _ in columns
+                      if csv_col not in ('REF_DATE', 'VECTOR', 'VALUE', 'VALUE_REAL')]
+        real_dollars = columns[-1][0] == "value_real"
+        value_type = next(sql_type for _, csv_col, sql_type in columns if csv_col == 'VALUE')
+        fact_table = f"{table_name}_fact"
+
+        # Same row selection as the wide output
+        df = self._keyed_rows(df)
+
+        sql_statements = [f"-- {self.table_comments[table_name]} (star schema)", ""]
+        # Vector ids are "v" plus an integer; the fact table keeps the integer
+        fact_columns = {"year": df['REF_DATE'].astype(str),
+                        "vector": df['VECTOR'].astype(str).str.lstrip('v')}
+        id_columns = []
+        select = ["v.year::SMALLINT", "v.vector::BIGINT"]
+        maps = []
+
+        for col, csv_col in dimensions:
+            text = df[csv_col].astype(str) if csv_col in df.columns else pd.Series('', index=df.index)
+            codes, names = pd.factorize(text, sort=True)
+            dim_table = f"{table_name}_dim_{col}"
+            map_table = f"{table_name}_map_{col}"
+
+            sql_statements.append(f"CREATE TABLE IF NOT EXISTS {dim_table} (")
+            # INT rather than sized from this file's names: later loads keep appending to the same table
+            sql_statements.append("    id INT PRIMARY KEY,")
+            sql_statements.append("    name TEXT NOT NULL UNIQUE")
+            sql_statements.append(");")
+            sql_statements.append(f"DROP TABLE IF EXISTS pg_temp.{map_table};")
+            sql_statements.append(f"CREATE TEMP TABLE {map_table} (code INT PRIMARY KEY, name TEXT NOT NULL, id INT);")
+            if len(names):
+                sql_statements.append(f"INSERT INTO {map_table} (code, name) VALUES")
+                sql_statements.append(",\n".join(
+                    f"({i + 1}, '{str(name).replace(chr(39), chr(39) * 2)}')" for i, name in enumerate(names)
+                ) + ";")
+            sql_statements.append(f"INSERT INTO {dim_table} (id, name)")
+            sql_statements.append(f"SELECT (SELECT COALESCE(MAX(id), 0) FROM {dim_table}) + ROW_NUMBER() OVER (ORDER BY m.code), m.name")
+            sql_statements.append(f"FROM {map_table} m WHERE NOT EXISTS (SELECT 1 FROM {dim_table} d WHERE d.name = m.name)")
+            sql_statements.append("ON CONFLICT (name) DO NOTHING;")
+            sql_statements.append(f"UPDATE {map_table} m SET id = d.id FROM {dim_table} d WHERE d.name = m.name;")
+            sql_statements.append("")
+
+            fact_columns[f"{col}_id"] = pd.Series(codes + 1, index=df.index).astype(str)
+            id_columns.append(f"{col}_id")
+            select.append(f"m_{col}.id")
+            maps.append((col, map_table))
+
+        fact_columns["value"] = df['VALUE'].astype(str) if len(df) else pd.Series(dtype=str)
+        select.append(f"v.value::{value_type}")
+        if real_dollars:
+            fact_columns["value_real"] = df['VALUE_REAL'].astype(str).where(df['VALUE_REAL'].notna(), 'NULL')
+            select.append(f"v.value_real::{value_type}")
+
+        sql_statements += self._table_ddl(
+            fact_table,
+            [("year", "SMALLINT NOT NULL"), ("vector", "BIGINT NOT NULL")]
+            + [(name, f"INT NOT NULL REFERENCES {table_name}_dim_{name[:-3]} (id)") for name in id_columns]
+            + [("value", value_type)]
+            + ([("value_real", value_type)] if real_dollars else []),
+            ["value"] + (["value_real"] if real_dollars else []))
+
+        rows = pd.DataFrame(fact_columns).agg(', '.join, axis=1).tolist() if len(df) else []
+        # Fact rows carry the file's local codes; each batch swaps them for ids through the maps
+        source = (", ".join(select),
+                  f"AS v({', '.join(fact_columns)})"
+                  + "".join(f", {map_table} m_{col}" for col, map_table in maps)
+                  + (" WHERE " + " AND ".join(f"m_{col}.code = v.{col}_id" for col, _ in maps) if maps else ""))
+        sql_statements += self._upsert_statements(fact_table, list(fact_columns), rows, source=source)
+        sql_statements.append("")
+
+        # View with the original wide column names for existing queries
+        # (vector goes last: CREATE OR REPLACE VIEW can only append columns to an existing view)
+        select = (["f.year"] + [f"d_{col}.name AS {col}" for col, _ in dimensions] + ["f.value"]
+                  + (["f.value_real"] if real_dollars else []) + ["'v' || f.vector AS vector"])
+        joins = [f"JOIN {table_name}_dim_{col} d_{col} ON d_{col}.id = f.{col}_id" for col, _ in dimensions]
+        sql_statements.append(f"CREATE OR REPLACE VIEW {table_name}_wide AS")
+        sql_statements.append(f"SELECT {', '.join(select)}\nFROM {fact_table} f\n" + "\n".join(joins) + ";")
+
+        return sql_statements, len(rows)
+
+    def finance_rollup(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, SubtreeIndex]:
+        """Spending by year × geography × component × CCOFOG division, plus all-functions and UBI-replaceable totals
+
+        Totals come from the CCOFOG subtree index: a division takes its published row, or the
+        sum of its groups where that is missing. Components and geographies overlap (the
+        consolidated total contains the provinces), so only functions are summed.
+        """
+        values = ('VALUE',) + (('VALUE_REAL',) if 'VALUE_REAL' in df.columns else ())
+        keys = ['REF_DATE', 'GEO', self.component_column]
+        # Suppressed cells carry no value, but their labels still place the codes below them
+        index = SubtreeIndex(df[df['VALUE'].notna()], self.function_column, keys, values,
+                             labels=df[self.function_column].unique())
+
+        nodes = index.tree.nodes
+        codes = [ROOT, REPLACEABLE] + nodes[ROOT].children
+        names = {**{code: nodes[code].name for code in codes if code in nodes},
+                 REPLACEABLE: "Replaceable by UBI (" + ", ".join(
+                     nodes[c].name for c in PROGRAM_FUNCTIONS.values() if c in nodes) + ")"}
+        rows = [index.code_index[code] for code in codes]
+
+        rollup = pd.DataFrame({
+            'year': np.tile(index.keys.get_level_values(0), len(codes)),
+            'geography': np.tile(index.keys.get_level_values(1), len(codes)),
+            'component': np.tile(index.keys.get_level_values(2), len(codes)),
+            'function_code': np.repeat(codes, len(index.keys)),
+            'function_name': np.repeat([names[code] for code in codes], len(index.keys)),
+            'level': np.repeat([nodes[code].level if code in nodes else 0 for code in codes], len(index.keys)),
+            **{col: index.totals[col][rows].ravel() for col in values},
+        })
+        units = df.groupby(keys)['UOM'].first() if 'UOM' in df.columns else None
+        rollup['unit'] = (units.reindex(pd.MultiIndex.from_frame(rollup[['year', 'geography', 'component']]))
+                          .to_numpy() if units is not None else '')
+        rollup = rollup.dropna(subset=['VALUE'])
+        return rollup.sort_values(['year', 'geography', 'component', 'level', 'function_code'],
+                                  ignore_index=True), index
+
+    def _rollup_statements(self, table_name: str, rollup: pd.DataFrame, index: SubtreeIndex) -> List[str]:
+        """The CCOFOG hierarchy plus a small keyed {table}_rollup table, with their upserts"""
+        rollup_table = f"{table_name}_rollup"
+        value_type = next(sql_type for _, csv_col, sql_type in self.table_columns[table_name] if csv_col == 'VALUE')
+        real_dollars = 'VALUE_REAL' in rollup.columns
+        columns = [("year", "SMALLINT NOT NULL"), ("geography", "VARCHAR(100) NOT NULL"),
+                   ("component", "VARCHAR(200) NOT NULL"), ("function_code", "VARCHAR(10) NOT NULL"),
+                   ("function_name", "VARCHAR(200) NOT NULL"), ("level", "SMALLINT NOT NULL"),
+                   ("value", value_type)] + ([("value_real", value_type)] if real_dollars else []) \
+            + [("unit", "VARCHAR(50)")]
+
+        # Function hierarchy shared by the finance tables; children of a code are one index lookup away
+        functions = [node for code, node in index.tree.nodes.items() if code != ROOT]
+        statements = [
+            "-- CCOFOG function hierarchy (codes as in the labels; several codes join as '7015,7016,7018')",
+            "CREATE TABLE IF NOT EXISTS ccofog_functions (",
+            "    code VARCHAR(40) PRIMARY KEY,",
+            "    parent_code VARCHAR(40) NOT NULL,",
+            "    name VARCHAR(200) NOT NULL,",
+            "    level SMALLINT NOT NULL",
+            ");",
+            "CREATE INDEX IF NOT EXISTS ccofog_functions_parent_idx ON ccofog_functions (parent_code);",
+        ]
+        if functions:
+            statements += self._upsert_statements("ccofog_functions", ["code", "parent_code", "name", "level"], [
+                ", ".join(["'" + str(v).replace("'", "''") + "'" for v in (node.code, node.parent, node.name)]
+                          + [str(node.level)])
+                for node in functions], key=("code",))
+        statements += [
+            "",
+            f"-- {self.table_comments[table_name]}: subtree totals of each CCOFOG division (level 1), all functions "
+            f"(level 0, 'ALL') and the programs replaceable by UBI (level 0, 'UBI')",
+            f"CREATE TABLE IF NOT EXISTS {rollup_table} (",
+            ",\n".join([f"    {col} {sql_type}" for col, sql_type in columns]
+                       + [f"    PRIMARY KEY ({', '.join(self.rollup_key)})"]),
+            ");",
+            # The primary key serves year and year+geography lookups; this one serves a category's trend
+            f"CREATE INDEX IF NOT EXISTS {rollup_table}_function_idx ON {rollup_table} "
+            f"(function_code, geography, year) INCLUDE (value);",
+            "",
+        ]
+
+        def quoted(series):
+            return "'" + series.astype(str).str.replace("'", "''", regex=False) + "'"
+
+        def number(series):
+            return series.round(2).astype(str).where(series.notna(), 'NULL')
+
+        formatted = pd.DataFrame({
+            "year": rollup['year'].astype(str),
+            "geography": quoted(rollup['geography']),
+            "component": quoted(rollup['component']),
+            "function_code": quoted(rollup['function_code']),
+            "function_name": quoted(rollup['function_name']),
+            "level": rollup['level'].astype(str),
+            "value": number(rollup['VALUE']),
+            **({"value_real": number(rollup['VALUE_REAL'])} if real_dollars else {}),
+            "unit": quoted(rollup['unit']),
+        })
+        rows = formatted.agg(', '.join, axis=1).tolist() if len(formatted) else []
+        statements += self._upsert_statements(rollup_table, list(formatted.columns), rows, key=self.rollup_key)
+        return statements
+
+    def _process_table(self, csv_path: str, table_name: str, data_label: str) -> str:
+        """Read, filter and convert one StatsCan CSV into a SQL file for table_name, holding its table lock"""
+        with table_lock(self.lock_dir, table_name):
+            return self._convert_table(csv_path, table_name, data_label)
+
+    def _convert_table(self, csv_path: str, table_name: str, data_label: str) -> str:
+        """Body of _process_table; every file is written under a temporary name and renamed into place"""
+        metrics = self.metrics
+
+        try:
+            # Read the CSV file
+            with metrics.stage(table_name, "read"):
+                df = pd.read_csv(csv_path, encoding='utf-8')
+
+            # Filter for target years
+            with metrics.stage(table_name, "filter"):
+                df_filtered = df[df['REF_DATE'].isin(self.target_years)]
+
+            # Common scalar factor, unusable STATUS values nulled, duplicates and outliers reported
+            with metrics.stage(table_name, "quality"):
+                df_filtered, quality = self.quality.check(df_filtered)
+                quality_path = os.path.join(self.quality_dir, f"{table_name}.json")
+                with atomic_write(quality_path, encoding='utf-8') as f:
+                    json.dump({"table": table_name, "source": os.path.basename(csv_path), **quality}, f, indent=2)
+                self.artifacts.append(quality_path)
+            metrics.record_table(table_name, quality_errors=quality["errors"], quality_warnings=quality["warnings"])
+            print(summary_line(table_name, quality))
+            if self.strict_quality and not quality["passed"]:
+                print(f"❌ {table_name} failed the quality gate; see {self.quality_dir}/{table_name}.json")
+                return ""
+
+            # Constant-dollar companion values, computed for the whole table at once
+            with metrics.stage(table_name, "deflate"):
+                df_filtered = self.add_real_dollars(table_name, df_filtered)
+
+            # Create SQL statements
+            with metrics.stage(table_name, "format"):
+                if self.star_schema:
+                    sql_statements, inserted = self._star_statements(table_name, df_filtered)
+                else:
+                    sql_statements, inserted = self._wide_statements(table_name, df_filtered)
+
+            # Save to file
+            suffix = "_star" if self.star_schema else ""
+            output_path = os.path.join(self.output_dir, f"{table_name}{suffix}.sql")
+            with metrics.stage(table_name, "write"):
+                with atomic_write(output_path, encoding='utf-8') as f:
+                    f.write('\n'.join(sql_statements))
+
+            # Row snapshot for `python -m ubidata delta`, independent of the SQL layout
+            with metrics.stage(table_name, "snapshot"):
+                snapshot_path = os.path.join(self.snapshot_dir, f"{table_name}.csv")
+                with atomic_write(snapshot_path, encoding='utf-8', newline='') as f:
+                    self.snapshot_rows(table_name, df_filtered).to_csv(f, index=False)
+                self.artifacts.append(snapshot_path)
+
+            # Pre-aggregated spending totals for the dashboards
+            if table_name in self.rollup_tables:
+                if {self.function_column, self.component_column} <= set(df_filtered.columns):
+                    with metrics.stage(table_name, "rollup"):
+                        rollup, index = self.finance_rollup(df_filtered)
+                        problems = index.validate()
+                        rollup_path = os.path.join(self.output_dir, f"{table_name}_rollup.sql")
+                        with atomic_write(rollup_path, encoding='utf-8') as f:
+                            f.write('\n'.join(self._rollup_statements(table_name, rollup, index)))
+                    self.extra_outputs.append(rollup_path)
+                    metrics.record_table(table_name, ccofog_mismatches=len(problems))
+                    print(f"✅ {table_name} rollup: {len(rollup):,} rows from {len(df_filtered):,}: {rollup_path}")
+                    if problems:
+                        worst = max(problems, key=lambda p: abs(p['difference']))
+                        print(f"⚠️  {len(problems)} CCOFOG parents differ from their children's sum "
+                              f"(worst: {worst['code']} {worst['REF_DATE']} {worst['GEO']}, off by {worst['difference']:,.0f})")
+                else:
+                    print(f"⚠️  {table_name} has no CCOFOG/component columns; rollup skipped")
+
+            metrics.record_table(table_name, rows_in=len(df), rows_filtered=len(df_filtered),
+                                 rows_out=inserted, output_path=output_path)
+
+            print(f"✅ {data_label[0].upper() + data_label[1:]} processed: {output_path}")
+            return output_path
+
+        except Exception as e:
+            print(f"❌ Error processing {data_label}: {e}")
+            return ""
+
+    def process_income_data(self, csv_path: str) -> str:
+        """Process income distribution data"""
+        print("💰 Processing income distribution data...")
+        return self._process_table(csv_path, "income_distribution", "income data")
+
+    def process_gdp_data(self, csv_path: str) -> str:
+        """Process GDP data"""
+        print("📈 Processing GDP data...")
+        return self._process_table(csv_path, "gdp_data", "GDP data")
+
+    def process_government_finance(self, csv_path: str, table_type: str) -> str:
+        """Process government finance data"""
+        print(f"🏛️ Processing {table_type} finance data...")
+        return self._process_table(csv_path, f"{table_type}_finance", f"{table_type} finance data")
+
+    def process_cpi_data(self, csv_path: str) -> str:
+        """Process Consumer Price Index (inflation) data"""
+        print("📊 Processing CPI/Inflation data...")
+        return self._process_table(csv_path, "cpi_data", "CPI data")
+
+    def process_tax_filer_data(self, csv_path: str) -> str:
+        """Process tax filer income data"""
+        print("💼 Processing tax filer data...")
+        return self._process_table(csv_path, "tax_filer_data", "tax filer data")
+
+    def create_summary_report(self, processed_files: List[str]) -> None:
+        """Create a summary report of processed data"""
+        report_path = os.path.join(self.output_dir, "processing_summary.md")
+        
+        with atomic_write(report_path) as f:
+            f.write("# Statistics Canada Data Processing Summary\n\n")
+            f.write(f"**Processing Date**: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"**Target Years**: {self.target_years[0]}-{self.target_years[-1]}\n\n")
+            
+            f.write("## Processed Files\n\n")
+            for file_path in processed_files:
+                if file_path:
+                    filename = os.path.basename(file_path)
+                    f.write(f"- ✅ {filename}\n")
+            
+            if self.metrics.enabled and self.metrics.tables:
+                f.write("\n## Performance\n\n")
+                f.write("\n".join(self.metrics.markdown()) + "\n")
+
+            f.write("\n## Next Steps\n\n")
+            f.write("1. Review generated SQL files for data quality\n")
+            f.write("2. Import SQL files into PostgreSQL database\n")
+            f.write("3. Create data validation queries\n")
+            f.write("4. Build UBI feasibility calculation models\n")
+            f.write("5. Integrate with UBI Compass application\n")
+        
+        print(f"📋 Summary report created: {report_path}")
+
+        if self.metrics.enabled:
+            metrics_path = os.path.join(self.output_dir, "processing_metrics.json")
+            with atomic_write(metrics_path, encoding='utf-8') as f:
+                json.dump({
+                    "processing_date": pd.Timestamp.now().isoformat(timespec="seconds"),
+                    **self.metrics.to_dict(),
+                }, f, indent=2)
+            print(f"⏱️  Processing metrics saved: {metrics_path}")
+
+    def process_file(self, file_key: str, csv_path: str) -> Optional[str]:
+        """Process one CSV file according to its table type; None if the type is unknown"""
+        if "income" in file_key.lower() or "11100239" in file_key:
+            return self.process_income_data(csv_path)
+        elif "gdp" in file_key.lower() or "36100014" in file_key:
+            return self.process_gdp_data(csv_path)
+        elif "federal" in file_key.lower() or "10100005" in file_key:
+            return self.process_government_finance(csv_path, "federal")
+        elif "provincial" in file_key.lower() or "10100020" in file_key:
+            return self.process_government_finance(csv_path, "provincial")
+        elif "cpi" in file_key.lower() or "inflation" in file_key.lower() or "18100005" in file_key:
+            return self.process_cpi_data(csv_path)
+        elif "tax_filers" in file_key.lower() or "11100008" in file_key:
+            return self.process_tax_filer_data(csv_path)
+        return None
+
+    def profile_file(self, file_key: str, csv_path: str) -> Optional[str]:
+        """Process one CSV under cProfile and tracemalloc, saving the reports next to the output"""
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        try:
+            profiler.enable()
+            result = self.process_file(file_key, csv_path)
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        base = os.path.join(self.output_dir, f"profile_{file_key}")
+        profiler.create_stats()
+        with atomic_write(f"{base}.prof", 'wb') as f:
+            marshal.dump(profiler.stats, f)  # What Profile.dump_stats writes, without the plain open()
+
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(30)
+        report.write(f"\nPeak traced memory: {peak / (1024 * 1024):.2f} MB\n\nTop allocations:\n")
+        for stat in snapshot.statistics("lineno")[:20]:
+            report.write(f"{stat}\n")
+        with atomic_write(f"{base}.txt", encoding='utf-8') as f:
+            f.write(report.getvalue())
+
+        print(f"🔬 Profile saved: {base}.prof / {base}.txt")
+        return result
+
+    def process_all_data(self, profile: Optional[str] = None) -> None:
+        """Process all downloaded Statistics Canada data
+
+        profile names a file key (or part of one) to run under cProfile/tracemalloc.
+        """
+        print("🚀 Starting Statistics Canada data processing...")
+        print("="*60)
+        
+        # Extract ZIP files
+        extracted_dirs = self.extract_zip_files()
+        
+        # Find CSV files
+        csv_files = self.find_csv_files()
+        
+        print(f"\n📊 Found {len(csv_files)} CSV files to process")
+        
+        processed_files = []
+        
+        # Process each type of data
+        for file_key, csv_path in csv_files.items():
+            print(f"\n🔄 Processing: {file_key}")
+
+            if profile and profile.lower() in file_key.lower():
+                result = self.profile_file(file_key, csv_path)
+            else:
+                result = self.process_file(file_key, csv_path)
+
+            if result is None:
+                print(f"⚠️  Unknown data type for {file_key}, skipping...")
+            else:
+                processed_files.append(result)
+        
+        # Create summary report
+        self.create_summary_report(processed_files)
+        
+        print("\n" + "="*60)
+        print("✅ Data processing complete!")
+        print(f"📁 Processed files saved to: {os.path.abspath(self.output_dir)}")
+
+def run(args):
+    print("🧭 UBI Compass - Statistics Canada Data Processor")
+    print("="*60)
+    
+    store = version_dir = None
+    output_dir = args.output_dir
+    if args.publish:
+        # Build into a new version directory; readers keep using the current one until it is published
+        from .datadir import SnapshotStore
+
+        store = SnapshotStore(args.output_dir)
+        output_dir = version_dir = store.begin()
+
+    processor = StatsCanaDataProcessor(args.input_dir, output_dir, metrics=not args.no_metrics,
+                                       star_schema=args.star_schema, real_dollars=not args.no_real_dollars,
+                                       base_year=args.base_year, strict_quality=args.strict_quality,
+                                       outlier_ratio=args.outlier_ratio, lock_dir=args.output_dir)
+    try:
+        processor.process_all_data(profile=args.profile)
+    except BaseException:
+        if store:
+            store.abort(version_dir)
+        raise
+
+    if store:
+        version = store.publish(version_dir)
+        removed = store.prune(keep=args.keep_versions)
+        print(f"📌 Published version {version}: {os.path.join(args.output_dir, 'current')}"
+              + (f" ({len(removed)} old versions removed)" if removed else ""))
+    
+    print("\n🎯 Ready for database import and UBI analysis!")
@@ -0,0 +1,210 @@
+"""
+Data-quality gate for Statistics Canada tables
+Runs once over a table's columns as it is processed: puts every VALUE on the table's
+common scalar factor, nulls values whose STATUS says they must not be used, finds
+duplicate (period, vector) keys and year-over-year outliers, and returns a per-table
+report. A table fails the gate only on errors (conflicting duplicates, unknown scale).
+"""
+
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# SCALAR_ID is the power of ten of SCALAR_FACTOR; used when a CSV has no SCALAR_ID column
+SCALAR_IDS = {"units": 0, "tens": 1, "hundreds": 2, "thousands": 3, "tens of thousands": 4,
+              "hundreds of thousands": 5, "millions": 6, "tens of millions": 7, "hundreds of millions": 8,
+              "billions": 9}
+SCALAR_FACTORS = {power: name for name, power in SCALAR_IDS.items()}
+
+# STATUS codes whose VALUE is not a usable number; A-E are quality grades and stay
+UNUSABLE_STATUS = {
+    "x": "suppressed (confidentiality)",
+    "F": "too unreliable to be published",
+    "..": "not available",
+    "...": "not applicable",
+}
+TERMINATED = "t"
+
+
+class QualityGate:
+    def __init__(self, outlier_ratio: float = 10.0, max_examples: int = 20):
+        # A value more than outlier_ratio times (or less than 1/outlier_ratio of) the same
+        # vector's previous period is reported as an outlier
+        self.outlier_ratio = outlier_ratio
+        self.max_examples = max_examples
+
+    def normalize_scale(self, df: pd.DataFrame, report: Dict) -> pd.DataFrame:
+        """Rescale VALUE to the table's most common scalar factor, honouring DECIMALS"""
+        if 'SCALAR_ID' in df.columns:
+            power = pd.to_numeric(df['SCALAR_ID'], errors='coerce')
+        elif 'SCALAR_FACTOR' in df.columns:
+            power = df['SCALAR_FACTOR'].astype(str).str.strip().str.lower().map(SCALAR_IDS)
+        else:
+            report["scale"] = {"factor": None, "rescaled_rows": 0, "unknown_rows": 0}
+            return df
+
+        known = power.notna()
+        target = int(power[known].mode().iloc[0]) if known.any() else 0
+        shift = (power - target).fillna(0).to_numpy()
+        rescale = shift != 0
+        report["scale"] = {"factor": SCALAR_FACTORS.get(target, f"10^{target}"),
+                           "rescaled_rows": int(rescale.sum()), "unknown_rows": int((~known).sum())}
+        if not rescale.any():
+            return df
+
+        values = df['VALUE'].to_numpy(dtype=np.float64) * 10.0 ** shift
+        decimals = pd.to_numeric(df['DECIMALS'], errors='coerce').fillna(0).to_numpy() if 'DECIMALS' in df.columns \
+            else np.zeros(len(df))
+        # A millions value with 1 decimal becomes a units value with none; the decimals left
+        # after rescaling remove the float noise of the multiplication
+        decimals = np.maximum(decimals - shift, 0)
+        values = np.round(values * 10.0 ** decimals) / 10.0 ** decimals
+        columns = {"VALUE": values}
+        if 'SCALAR_ID' in df.columns:
+            columns["SCALAR_ID"] = power.where(~known, target)
+        if 'SCALAR_FACTOR' in df.columns:
+            columns["SCALAR_FACTOR"] = df['SCALAR_FACTOR'].where(~known, SCALAR_FACTORS.get(target, f"10^{target}"))
+        if 'DECIMALS' in df.columns:
+            columns["DECIMALS"] = decimals.astype(np.int64)
+        return df.assign(**columns)
+
+    @staticmethod
+    def _flags(df: pd.DataFrame, column: str) -> Tuple[pd.Series, Dict]:
+        """(non-null flags, raw flag -> stripped flag); only the few distinct flags are stripped"""
+        if column not in df.columns:
+            return pd.Series([], dtype=object), {}
+        flags = df[column]
+        flags = flags[flags.notna()]
+        return flags, {raw: str(raw).strip() for raw in flags.unique()}
+
+    @staticmethod
+    def _counts(flags: pd.Series, clean: Dict) -> Dict[str, int]:
+        counts = {}
+        for raw, n in flags.value_counts().items():
+            if clean[raw]:
+                counts[clean[raw]] = counts.get(clean[raw], 0) + int(n)
+        return counts
+
+    def apply_status(self, df: pd.DataFrame, report: Dict) -> pd.DataFrame:
+        """Null the values of unusable STATUS codes and count every flag"""
+        status, clean = self._flags(df, 'STATUS')
+        positions = df.index.get_indexer(status.index)
+        unusable = np.zeros(len(df), dtype=bool)
+        unusable[positions] = status.isin([raw for raw, code in clean.items() if code in UNUSABLE_STATUS]).to_numpy()
+        flagged = np.zeros(len(df), dtype=bool)
+        flagged[positions] = status.isin([raw for raw, code in clean.items() if code]).to_numpy()
+        values = df['VALUE']
+        missing = values.isna().to_numpy()
+
+        report["status"] = self._counts(status, clean)
+        report["unusable_rows"] = int(unusable.sum())
+        # StatsCan normally leaves these cells empty; a number under them must not be loaded
+        report["unusable_with_value"] = int((unusable & ~missing).sum())
+        report["missing_unflagged"] = int((missing & ~flagged).sum())
+        report["symbols"] = self._counts(*self._flags(df, 'SYMBOL'))
+        terminated, clean = self._flags(df, 'TERMINATED')
+        ended = terminated.isin([raw for raw, code in clean.items() if code == TERMINATED])
+        report["terminated_vectors"] = int(df.loc[ended.index[ended.to_numpy()], 'VECTOR'].nunique()) \
+            if 'VECTOR' in df.columns else 0
+
+        if report["unusable_with_value"]:
+            df = df.assign(VALUE=values.where(~unusable))
+        return df
+
+    def check_series(self, df: pd.DataFrame, report: Dict) -> None:
+        """Duplicate (REF_DATE, VECTOR) keys and period-over-period outliers, from one sort of the keys
+
+        Conflicting duplicates (same key, different values) are errors. A value more than
+        outlier_ratio times, or less than 1/outlier_ratio of, the vector's previous period
+        is an outlier; it is reported, not changed.
+        """
+        vectors, vector_labels = pd.factorize(df['VECTOR'])
+        periods, period_labels = pd.factorize(df['REF_DATE'], sort=True)
+        order = np.lexsort((periods, vectors))
+        vectors, periods = vectors[order], periods[order]
+        values = df['VALUE'].to_numpy(dtype=np.float64)[order]
+
+        # Neighbours in (vector, period) order; duplicates are adjacent
+        same_vector = vectors[1:] == vectors[:-1]
+        same_key = same_vector & (periods[1:] == periods[:-1])
+        previous, current = values[:-1], values[1:]
+        differs = (previous != current) & ~(np.isnan(previous) & np.isnan(current))
+
+        duplicated = np.zeros(len(values), dtype=bool)
+        duplicated[1:] |= same_key
+        duplicated[:-1] |= same_key
+        first_repeat = same_key & ~np.concatenate([[False], same_key[:-1]])
+        # A key conflicts when any of its adjacent pairs differ; count each key once
+        key_id = np.cumsum(np.concatenate([[True], ~same_key]))[1:]
+        conflicting = np.unique(key_id[same_key & differs])
+        conflict_positions = np.flatnonzero(same_key & differs)
+        conflict_positions = conflict_positions[np.unique(key_id[conflict_positions], return_index=True)[1]]
+        report["duplicates"] = {
+            "rows": int(duplicated.sum()),
+            "keys": int(first_repeat.sum()),
+            "conflicting_keys": int(len(conflicting)),
+            "examples": [{"REF_DATE": self._plain(period_labels[periods[i]]),
+                          "VECTOR": self._plain(vector_labels[vectors[i]])}
+                         for i in conflict_positions[:self.max_examples]],
+        }
+
+        # Against the previous period of the same vector (the last of any duplicates)
+        comparable = (same_vector & ~same_key & np.isfinite(previous) & np.isfinite(current)
+                      & (previous != 0) & (current != 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(comparable, np.abs(current / np.where(comparable, previous, 1.0)), 1.0)
+        positions = np.flatnonzero(comparable & (np.abs(np.log(ratio)) > np.log(self.outlier_ratio)))
+        report["outliers"] = {
+            "ratio": self.outlier_ratio,
+            "count": int(len(positions)),
+            "examples": [{"VECTOR": self._plain(vector_labels[vectors[i + 1]]),
+                          "from": self._plain(period_labels[periods[i]]),
+                          "to": self._plain(period_labels[periods[i + 1]]),
+                          "previous": float(previous[i]), "value": float(current[i]),
+                          "ratio": round(float(current[i] / previous[i]), 4)}
+                         for i in positions[:self.max_examples]],
+        }
+
+    @staticmethod
+    def _plain(value):
+        return value.item() if isinstance(value, np.generic) else value
+
+    def check(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+        """(cleaned rows, report) for one table"""
+        start = time.perf_counter()
+        report = {"rows": len(df)}
+        if 'VALUE' not in df.columns:
+            report.update(errors=1, warnings=0, passed=False, problem="no VALUE column")
+            return df, report
+
+        df = df.assign(VALUE=pd.to_numeric(df['VALUE'], errors='coerce'))
+        df = self.normalize_scale(df, report)
+        df = self.apply_status(df, report)
+        if 'VECTOR' in df.columns and 'REF_DATE' in df.columns:
+            self.check_series(df, report)
+
+        errors = report.get("duplicates", {}).get("conflicting_keys", 0) + report["scale"]["unknown_rows"]
+        warnings = (report.get("outliers", {}).get("count", 0) + report["unusable_with_value"]
+                    + report["missing_unflagged"] + report["scale"]["rescaled_rows"])
+        report.update(errors=int(errors), warnings=int(warnings), passed=errors == 0,
+                      seconds=round(time.perf_counter() - start, 6))
+        return df, report
+
+
+def summary_line(table_name: str, report: Dict) -> str:
+    """One-line console summary of a table's report"""
+    parts = [f"{report['rows']:,} rows"]
+    scale = report.get("scale", {})
+    if scale.get("rescaled_rows"):
+        parts.append(f"{scale['rescaled_rows']:,} rescaled to {scale['factor']}")
+    if report.get("unusable_rows"):
+        parts.append(f"{report['unusable_rows']:,} flagged unusable")
+    duplicates = report.get("duplicates", {})
+    if duplicates.get("rows"):
+        parts.append(f"{duplicates['keys']:,} duplicate keys ({duplicates['conflicting_keys']:,} conflicting)")
+    if report.get("outliers", {}).get("count"):
+        parts.append(f"{report['outliers']['count']:,} outliers")
+    icon = "✅" if report["passed"] and not report["warnings"] else ("⚠️ " if report["passed"] else "❌")
+    return f"{icon} {table_name} quality: " + ", ".join(parts)
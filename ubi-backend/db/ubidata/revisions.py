@@ -0,0 +1,335 @@
+"""
+Append-only revision history of StatsCan tables
+Each release of a table is stored as a delta against the table's previous release: the
+(vector, period) cells that were added, revised or removed, tagged with the release date.
+Storage grows with the number of revised cells rather than with the number of releases,
+and "value as of date D" is the last revision of a cell released on or before D, so any
+published estimate can be recomputed from the figures that were current when it was made.
+
+Files: {store}/revisions.dat, a 64-byte header (magic "UBIREVS\\0", version u16, record
+size u16) followed by each release's records sorted by (vector, period), and
+{store}/releases.json, the release list with each release's record range.
+"""
+
+import json
+import os
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .datadir import atomic_write, table_lock
+from .series import csv_files, encode_periods, format_period, period_bound, table_id
+
+REVISION_MAGIC = b"UBIREVS\0"
+REVISION_VERSION = 1
+REVISION_HEADER = struct.Struct("<8sHH52x")  # 64 bytes
+RECORD = np.dtype([("vector", "<i8"), ("value", "<f8"), ("period", "<i4"), ("release", "<i4"),
+                   ("status", "S3"), ("removed", "u1")])
+DATA = "revisions.dat"
+INDEX = "releases.json"
+PERIOD_SPAN = 100_000_000  # Period codes are below this, so vector * PERIOD_SPAN + period orders cells
+
+
+def timestamp(value, end_of_day: bool = False) -> int:
+    """Seconds since the epoch of a date or datetime; a bare date as an upper bound means its last second"""
+    text = str(value).strip()
+    seconds = int(np.datetime64(text.replace(" ", "T")[:19], "s").astype(np.int64))
+    return seconds + 86399 if end_of_day and len(text) <= 10 else seconds
+
+
+def cell_keys(records: np.ndarray) -> np.ndarray:
+    return records["vector"] * PERIOD_SPAN + records["period"]
+
+
+class RevisionStore:
+    def __init__(self, path: str = "revision_store"):
+        self.path = path
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Load the release list and map the records it covers"""
+        try:
+            with open(os.path.join(self.path, INDEX), "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except FileNotFoundError:
+            self.index = {"format": REVISION_VERSION, "end": 0, "tables": {}, "releases": []}
+        self.releases = self.index["releases"]
+        self.release_times = np.array([timestamp(r["released"]) for r in self.releases], dtype=np.int64)
+        self.data = np.zeros(0, dtype=RECORD)
+        if self.index["end"]:
+            path = os.path.join(self.path, DATA)
+            with open(path, "rb") as f:
+                magic, version, record_size = REVISION_HEADER.unpack(f.read(REVISION_HEADER.size))
+            if magic != REVISION_MAGIC or record_size != RECORD.itemsize:
+                raise ValueError(f"{path} is not a revision file")
+            if version > REVISION_VERSION:
+                raise ValueError(f"{path} is revision version {version}; this reader knows {REVISION_VERSION}")
+            self.data = np.memmap(path, dtype=RECORD, mode="r", offset=REVISION_HEADER.size,
+                                  shape=(self.index["end"],))
+        self._by_cell = None
+
+    def table_releases(self, table: str) -> List[Dict]:
+        return [r for r in self.releases if r["table"] == table]
+
+    def _latest(self, records: np.ndarray, as_of=None) -> np.ndarray:
+        """The last revision of each cell released by as_of (all releases if None), removed cells dropped
+
+        records must be in release order; a stable sort by cell keeps that order within a cell.
+        """
+        if as_of is not None:
+            records = records[self.release_times[records["release"]] <= timestamp(as_of, end_of_day=True)]
+        keys = cell_keys(records)
+        order = np.argsort(keys, kind="stable")
+        records, keys = records[order], keys[order]
+        last = np.r_[keys[1:] != keys[:-1], True] if len(keys) else np.zeros(0, dtype=bool)
+        records = records[last]
+        return records[records["removed"] == 0]
+
+    def table_state(self, table: str, as_of=None) -> np.ndarray:
+        """Records of every cell of a table as of a date, sorted by (vector, period)"""
+        segments = [self.data[r["offset"]:r["offset"] + r["length"]] for r in self.table_releases(table)]
+        return self._latest(np.concatenate(segments) if segments else np.zeros(0, dtype=RECORD), as_of)
+
+    def _cell_index(self):
+        """Every record sorted by (vector, period, release), with the sorted vectors for range lookups"""
+        if self._by_cell is None:
+            order = np.lexsort((self.data["release"], self.data["period"], self.data["vector"]))
+            records = np.asarray(self.data[order])
+            self._by_cell = (records, records["vector"])
+        return self._by_cell
+
+    def _vector_records(self, vector) -> np.ndarray:
+        records, vectors = self._cell_index()
+        number = int(str(vector).strip().lstrip("vV"))
+        return records[np.searchsorted(vectors, number):np.searchsorted(vectors, number, side="right")]
+
+    def _frame(self, records: np.ndarray, period_format: int) -> pd.DataFrame:
+        return pd.DataFrame({
+            "REF_DATE": [format_period(int(p), period_format) for p in records["period"]],
+            "VALUE": np.array(records["value"]),
+            "STATUS": np.char.decode(records["status"], "ascii"),
+        })
+
+    def _format(self, records: np.ndarray) -> int:
+        if not len(records):
+            return 1
+        return self.index["tables"][self.releases[int(records["release"][0])]["table"]]["format"]
+
+    def series_as_of(self, vector, as_of=None) -> pd.DataFrame:
+        """REF_DATE, VALUE and STATUS of a vector as published on a date (latest if None)"""
+        records = self._vector_records(vector)
+        return self._frame(self._latest(records, as_of), self._format(records))
+
+    def value_as_of(self, vector, period, as_of=None) -> Optional[float]:
+        """Value of one cell (period as a year or REF_DATE) as published on a date; None if not yet published"""
+        records = self._vector_records(vector)
+        records = records[records["period"] == period_bound(period)]
+        latest = self._latest(records, as_of)
+        return float(latest["value"][0]) if len(latest) else None
+
+    def history(self, vector, period=None) -> pd.DataFrame:
+        """Every published revision of a vector (or one of its periods), with its release date"""
+        records = self._vector_records(vector)
+        if period is not None:
+            records = records[records["period"] == period_bound(period)]
+        frame = self._frame(records, self._format(records))
+        frame.insert(0, "released", [self.releases[int(r)]["released"] for r in records["release"]])
+        frame["removed"] = records["removed"].astype(bool)
+        return frame
+
+    def table_as_of(self, table: str, as_of=None) -> pd.DataFrame:
+        """VECTOR, REF_DATE, VALUE and STATUS of every cell of a table as published on a date"""
+        records = self.table_state(table, as_of)
+        frame = self._frame(records, self.index["tables"].get(table, {}).get("format", 1))
+        frame.insert(0, "VECTOR", "v" + pd.Series(records["vector"], dtype=str))
+        return frame
+
+    def record(self, df: pd.DataFrame, table: str, released, source: str = "",
+               partial: bool = False) -> Dict:
+        """Append a release of a table as a delta against its previous release
+
+        With partial=True (e.g. a vector download) cells missing from df are left as they were
+        instead of being recorded as removed. A release that changes nothing is not stored.
+        """
+        released = str(np.datetime64(str(released).strip().replace(" ", "T")[:19], "s"))
+        with table_lock(self.path, "revisions"):
+            self.refresh()
+            previous = self.table_releases(table)
+            if previous and timestamp(released) < timestamp(previous[-1]["released"]):
+                raise ValueError(f"{table} already has a release dated {previous[-1]['released']}, "
+                                 f"after {released}; releases are appended in date order")
+
+            incoming, period_format = self._cells(df)
+            current = self.table_state(table)
+            incoming_keys, current_keys = cell_keys(incoming), cell_keys(current)
+            if len(current):
+                position = np.minimum(np.searchsorted(current_keys, incoming_keys), len(current) - 1)
+                found, before = current_keys[position] == incoming_keys, current[position]
+            else:
+                found, before = np.zeros(len(incoming), dtype=bool), np.zeros(len(incoming), dtype=RECORD)
+            revised = found & ((before["status"] != incoming["status"])
+                               | ((before["value"] != incoming["value"])
+                                  & ~(np.isnan(before["value"]) & np.isnan(incoming["value"]))))
+            removed = (np.zeros(len(current), dtype=bool) if partial
+                       else ~np.isin(current_keys, incoming_keys, assume_unique=True))
+
+            tombstones = current[removed].copy()
+            tombstones["value"], tombstones["status"], tombstones["removed"] = np.nan, b"", 1
+            delta = np.concatenate([incoming[revised | ~found], tombstones])
+            delta = delta[np.argsort(cell_keys(delta), kind="stable")]
+            stats = {"table": table, "released": released, "cells": len(incoming), "added": int((~found).sum()),
+                     "revised": int(revised.sum()), "removed": int(removed.sum()), "recorded": False}
+            if not len(delta) and previous:
+                return stats
+
+            delta["release"] = len(self.releases)
+            offset = self.index["end"]
+            self._append(delta, offset)
+            self.releases.append({"id": len(self.releases), "table": table, "released": released,
+                                  "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                                  "source": source, "offset": offset, "length": len(delta),
+                                  **{k: stats[k] for k in ("cells", "added", "revised", "removed")}})
+            self.index["tables"].setdefault(table, {"format": period_format})
+            self.index["end"] = offset + len(delta)
+            with atomic_write(os.path.join(self.path, INDEX), encoding="utf-8") as f:
+                json.dump(self.index, f, indent=1)
+            self.refresh()
+        stats["recorded"] = True
+        return stats
+
+    @staticmethod
+    def _cells(df: pd.DataFrame):
+        """Records of a table's rows, one per (vector, period) (the last), sorted; and the period format"""
+        positions, vectors = pd.factorize(df["VECTOR"])
+        numbers = pd.Series(vectors, dtype=str).str.strip().str.lstrip("vV").astype(np.int64).to_numpy()
+        periods, formats = encode_periods(df["REF_DATE"])
+        cells = np.zeros(len(df), dtype=RECORD)
+        cells["vector"] = numbers[positions]
+        cells["period"] = periods
+        cells["value"] = pd.to_numeric(df["VALUE"], errors="coerce").to_numpy(dtype=np.float64)
+        if "STATUS" in df.columns:
+            positions, status = pd.factorize(df["STATUS"].fillna(""))
+            status = pd.Series(status, dtype=str).str.strip().str.encode("ascii", errors="replace")
+            cells["status"] = status.to_numpy(dtype="S3")[positions] if len(status) else b""
+        keys = cell_keys(cells)
+        order = np.argsort(keys, kind="stable")
+        cells, keys = cells[order], keys[order]
+        cells = cells[np.r_[keys[1:] != keys[:-1], True]] if len(cells) else cells
+        period_format = int(np.bincount(formats).argmax()) if len(formats) else 1
+        return cells, period_format
+
+    def _append(self, records: np.ndarray, offset: int) -> None:
+        """Write records after the last published one; the release list is updated after this returns"""
+        path = os.path.join(self.path, DATA)
+        if not os.path.exists(path):
+            with atomic_write(path, "wb") as f:
+                f.write(REVISION_HEADER.pack(REVISION_MAGIC, REVISION_VERSION, RECORD.itemsize))
+        with open(path, "r+b") as f:
+            # Anything past the published end is left over from an interrupted append
+            f.truncate(REVISION_HEADER.size + offset * RECORD.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def storage(self) -> Dict[str, int]:
+        """Records stored against the records full copies of every release would take"""
+        return {"records": int(self.index["end"]), "bytes": int(self.index["end"]) * RECORD.itemsize,
+                "full_copy_records": sum(r["cells"] for r in self.releases)}
+
+
+def open_revisions(path: str = "revision_store") -> RevisionStore:
+    """Open (or start) a revision store directory"""
+    os.makedirs(path, exist_ok=True)
+    return RevisionStore(path)
+
+
+def release_date(csv_path: str, metadata_dir: Optional[str] = None) -> str:
+    """Release time of a downloaded table: its cached WDS metadata, else the file's modification time"""
+    if metadata_dir and os.path.isdir(metadata_dir):
+        from .metadata import StatsCanMetadataCache
+        try:
+            released = StatsCanMetadataCache(cache_dir=metadata_dir).release_date(table_id(csv_path))
+        except ValueError:
+            released = None  # Not a product id
+        if released:
+            return released
+    return datetime.fromtimestamp(os.path.getmtime(csv_path), timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def export_csv(store: RevisionStore, table: str, template_csv: str, output: str, as_of=None) -> int:
+    """Write a table as published on a date, with the dimension columns of a current CSV of it
+
+    SYMBOL (footnote markers) is not part of the history and is left empty.
+    """
+    template = pd.read_csv(template_csv, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    dimensions = template.drop(columns=[c for c in ("REF_DATE", "VALUE", "STATUS", "SYMBOL") if c in template])
+    dimensions = dimensions.drop_duplicates("VECTOR")
+    cells = store.table_as_of(table, as_of)
+    rows = cells.merge(dimensions, on="VECTOR", how="left").reindex(columns=template.columns, fill_value="")
+    rows["VALUE"] = cells["VALUE"].map(lambda v: "" if np.isnan(v) else np.format_float_positional(v, trim="-"))
+    with atomic_write(output, encoding="utf-8") as f:
+        rows.to_csv(f, index=False)
+    return len(rows)
+
+
+def run(args):
+    print("🧭 UBI Compass - Revision History")
+    print("="*60)
+
+    store = open_revisions(args.store)
+    if args.record:
+        for csv_path in csv_files(args.input_dir):
+            start = time.perf_counter()
+            df = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+            released = args.release_date or release_date(csv_path, os.path.join(args.input_dir, "metadata"))
+            try:
+                stats = store.record(df, table_id(csv_path), released, os.path.basename(csv_path), args.partial)
+            except ValueError as e:
+                print(f"❌ {table_id(csv_path)}: {e}")
+                sys.exit(1)
+            changes = (f"{stats['added']:,} added, {stats['revised']:,} revised, {stats['removed']:,} removed "
+                       f"of {stats['cells']:,} cells")
+            if stats["recorded"]:
+                print(f"✅ {stats['table']} released {stats['released']}: {changes} "
+                      f"({time.perf_counter() - start:.2f}s)")
+            else:
+                print(f"⏭️  {stats['table']} released {stats['released']}: unchanged, not recorded")
+
+    storage = store.storage()
+    print(f"📦 {args.store}: {len(store.releases)} releases, {storage['records']:,} cell revisions "
+          f"({storage['bytes']:,} bytes); full copies would hold {storage['full_copy_records']:,} cells")
+    if not args.vectors and not args.export:
+        for release in store.releases[-args.limit:]:
+            print(f"   #{release['id']:<4} {release['table']:<10} {release['released']}  +{release['added']:,} "
+                  f"~{release['revised']:,} -{release['removed']:,}")
+
+    for vector in args.vectors:
+        start = time.perf_counter()
+        frame = store.history(vector, args.period) if args.history else store.series_as_of(vector, args.as_of)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        label = "history" if args.history else f"as of {args.as_of or 'latest release'}"
+        print(f"\n📈 {vector} {label} ({elapsed_ms:.2f} ms)")
+        if frame.empty:
+            print("   no published values")
+        for row in frame.itertuples(index=False):
+            released = f"{row.released}  " if args.history else ""
+            print(f"   {released}{row.REF_DATE:<10} {row.VALUE:>16,.2f} {row.STATUS}"
+                  f"{'  (removed)' if args.history and row.removed else ''}")
+
+    if args.export:
+        if not args.table:
+            print("❌ --export needs --table")
+            sys.exit(1)
+        template = next((p for p in csv_files(args.input_dir) if table_id(p) == args.table), None)
+        if template is None:
+            print(f"❌ No CSV of {args.table} in {args.input_dir} to take the dimension columns from")
+            sys.exit(1)
+        rows = export_csv(store, args.table, template, args.export, args.as_of)
+        print(f"💾 {args.export}: {rows:,} rows of {args.table} as of {args.as_of or 'the latest release'}")
+    return store
@@ -0,0 +1,188 @@
+"""
+UBI feasibility formulas for the Python engines
+Mirrors src/services/calculation-service.ts (calculateUBICosts, calculateTaxRevenue,
+calculateUBIFeasibility) so batch runs agree with the app. The functions accept
+scalars or NumPy arrays, so many draws or scenarios evaluate as one array expression.
+"""
+
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+# Defaults of the /api/statscan/feasibility endpoint; monthly amounts as in UBIParameters
+DEFAULT_PARAMETERS = {
+    "year": 2022,
+    "adultUbiAmount": 24000,     # Annual amount
+    "childUbiAmount": 200,       # Monthly amount
+    "youthUbiAmount": 0,         # Monthly amount
+    "seniorBonus": 0,            # Monthly bonus (added to adult UBI)
+    "childAgeCutoff": 18,        # Age when child UBI stops
+    "adultAgeCutoff": 18,        # Age when adult UBI starts
+    "seniorAgeCutoff": 65,       # Age when senior bonus starts
+    "taxPercentage": 25,         # Flat tax percentage
+    "exemptionAmount": 15000,    # Tax exemption amount
+}
+
+# Same figures as economicEstimates in src/data/population-estimates.ts:
+# (gdp, federalExpenditure, provincialExpenditure, averageIncome, inflationRate)
+ECONOMIC_ESTIMATES = {
+    2022: (2740000000000, 450000000000, 380000000000, 52000, 6.8),
+    2021: (2610000000000, 580000000000, 410000000000, 50000, 3.4),
+    2020: (2240000000000, 650000000000, 420000000000, 48000, 0.7),
+    2019: (2320000000000, 395000000000, 375000000000, 47000, 1.9),
+    2018: (2220000000000, 390000000000, 370000000000, 46000, 2.3),
+    2017: (2140000000000, 385000000000, 365000000000, 45000, 1.6),
+    2016: (2020000000000, 380000000000, 360000000000, 44000, 1.4),
+    2015: (1990000000000, 375000000000, 355000000000, 43000, 1.1),
+    2014: (1970000000000, 370000000000, 350000000000, 42000, 1.9),
+    2013: (1890000000000, 365000000000, 345000000000, 41000, 0.9),
+    2012: (1820000000000, 360000000000, 340000000000, 40000, 1.5),
+    2011: (1780000000000, 350000000000, 330000000000, 39000, 2.9),
+    2010: (1660000000000, 340000000000, 320000000000, 38000, 1.8),
+    2009: (1570000000000, 320000000000, 310000000000, 37000, 0.3),
+    2008: (1650000000000, 280000000000, 290000000000, 36000, 2.4),
+    2007: (1550000000000, 270000000000, 280000000000, 35000, 2.1),
+    2006: (1450000000000, 260000000000, 270000000000, 34000, 2.0),
+    2005: (1350000000000, 250000000000, 260000000000, 33000, 2.2),
+    2004: (1250000000000, 240000000000, 250000000000, 32000, 1.9),
+    2003: (1150000000000, 230000000000, 240000000000, 31000, 2.8),
+    2002: (1050000000000, 220000000000, 230000000000, 30000, 2.2),
+    2001: (950000000000, 210000000000, 220000000000, 29000, 2.5),
+    2000: (850000000000, 200000000000, 210000000000, 28000, 2.7),
+}
+
+FEASIBILITY_LEVELS = ["SURPLUS", "FEASIBLE", "CHALLENGING", "DIFFICULT"]
+
+
+def load_parameters(path: Optional[str] = None, **overrides) -> Dict:
+    """Scenario parameters: defaults, then a JSON file of UBIParameters keys, then overrides"""
+    parameters = dict(DEFAULT_PARAMETERS)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            parameters.update(json.load(f))
+    parameters.update({k: v for k, v in overrides.items() if v is not None})
+    return parameters
+
+
+def economic_context(year: int) -> Dict:
+    """EconomicContext for a year, falling back to 2022 like getEconomicData"""
+    gdp, federal, provincial, average_income, inflation = ECONOMIC_ESTIMATES.get(year, ECONOMIC_ESTIMATES[2022])
+    return {
+        "gdp": gdp,
+        "federalExpenditure": federal,
+        "provincialExpenditure": provincial,
+        "totalGovernmentBudget": federal + provincial,
+        "inflationRate": inflation,
+        "averageIncome": average_income,
+    }
+
+
+def age_counts(cube, year: int) -> np.ndarray:
+    """Population by single year of age (index = age) from a population cube, age 0 zeroed
+
+    In the cube age 0 holds the total, so it is dropped before summing bands.
+    """
+    y, g, s, _ = cube.index(year, cube.ages[0])
+    counts = np.zeros(max(cube.ages) + 1, dtype=np.int64)
+    counts[np.asarray(cube.ages)] = cube.data[y, g, s]
+    counts[0] = 0
+    return counts
+
+
+def population_breakdown(counts: np.ndarray, child_cutoff, adult_cutoff, senior_cutoff) -> Dict:
+    """PopulationBreakdown for age cutoffs; cutoffs may be arrays to get many breakdowns at once
+
+    Children are younger than child_cutoff, youth run up to adult_cutoff, adults up to
+    senior_cutoff, and seniors are senior_cutoff and older (as in calculateUBICosts).
+    """
+    cumulative = np.concatenate([[0], np.cumsum(counts)])
+    last = len(counts)
+
+    def below(age):
+        return cumulative[np.clip(np.asarray(age), 0, last)]
+
+    children = below(child_cutoff)
+    youth = below(adult_cutoff) - children
+    adults = below(senior_cutoff) - below(adult_cutoff)
+    seniors = cumulative[last] - below(senior_cutoff)
+    return {
+        "children": children,
+        "youth": np.maximum(youth, 0),
+        "adults": np.maximum(adults, 0),
+        "seniors": seniors,
+        "total": cumulative[last],
+    }
+
+
+def calculate_ubi_costs(parameters: Dict, population: Dict) -> Dict:
+    """Calculate UBI costs for all age groups"""
+    child_ubi_cost = population["children"] * (parameters["childUbiAmount"] * 12)
+    youth_ubi_cost = population["youth"] * (parameters["youthUbiAmount"] * 12)
+    adult_ubi_cost = population["adults"] * parameters["adultUbiAmount"]
+    senior_bonus_cost = population["seniors"] * (parameters["seniorBonus"] * 12)
+
+    # Seniors get adult UBI + senior bonus
+    senior_ubi_cost = population["seniors"] * parameters["adultUbiAmount"]
+    total_adult_ubi_cost = adult_ubi_cost + senior_ubi_cost
+
+    return {
+        "childUbiCost": child_ubi_cost,
+        "youthUbiCost": youth_ubi_cost,
+        "adultUbiCost": total_adult_ubi_cost,
+        "seniorBonusCost": senior_bonus_cost,
+        "grossUbiCost": child_ubi_cost + youth_ubi_cost + total_adult_ubi_cost + senior_bonus_cost,
+    }
+
+
+def calculate_tax_revenue(parameters: Dict, population: Dict, average_income) -> Dict:
+    """Calculate tax revenue from UBI implementation (only adults and seniors pay tax)"""
+    taxpaying_population = population["adults"] + population["seniors"]
+    total_income_with_ubi = average_income + parameters["adultUbiAmount"]
+    taxable_amount = np.maximum(0, total_income_with_ubi - parameters["exemptionAmount"])
+    tax_per_person = taxable_amount * (parameters["taxPercentage"] / 100)
+
+    return {
+        "averageIncome": average_income,
+        "totalIncomeWithUbi": total_income_with_ubi,
+        "taxableAmount": taxable_amount,
+        "taxPerPerson": tax_per_person,
+        "totalTaxRevenue": tax_per_person * taxpaying_population,
+    }
+
+
+def assess_feasibility(gdp_percentage):
+    """Feasibility level for a GDP percentage (or an array of them)"""
+    level = np.select([gdp_percentage <= 0, gdp_percentage < 5, gdp_percentage < 10], FEASIBILITY_LEVELS[:3],
+                      FEASIBILITY_LEVELS[3])
+    return str(level) if np.ndim(level) == 0 else level
+
+
+def calculate_ubi_feasibility(parameters: Dict, population: Dict, economics: Dict) -> Dict:
+    """Main calculation combining costs, tax revenue and the feasibility assessment"""
+    costs = calculate_ubi_costs(parameters, population)
+    taxation = calculate_tax_revenue(parameters, population, economics["averageIncome"])
+    net_ubi_cost = costs["grossUbiCost"] - taxation["totalTaxRevenue"]
+    gdp_percentage = (net_ubi_cost / economics["gdp"]) * 100
+
+    return {
+        "parameters": parameters,
+        "population": population,
+        "costs": costs,
+        "taxation": taxation,
+        "economics": economics,
+        "netUbiCost": net_ubi_cost,
+        "gdpPercentage": gdp_percentage,
+        "budgetPercentage": (net_ubi_cost / economics["totalGovernmentBudget"]) * 100,
+        "feasibility": assess_feasibility(gdp_percentage),
+    }
+
+
+def open_population(path: str = "population-canada.cube"):
+    """Open the population cube written by `python -m ubidata interpolate`"""
+    from .popcube import open_cube
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; run `python -m ubidata interpolate` to create it")
+    return open_cube(path)
@@ -0,0 +1,417 @@
+"""
+Vector-keyed time-series store for StatsCan series
+A StatsCan vector (v41693271) identifies one series, so the store keeps each vector's
+observations as one contiguous, period-ordered run of (period, status, value) records
+in a flat data file, and a JSON index maps vectors to their run and dimension members
+to vectors. Reading a whole series is one dictionary lookup and one array slice.
+
+Every run is allocated with spare capacity: new periods are written into it in place,
+and only a run that overflows (or has a revised value) is copied to the end of the file.
+Records a published index can see are never overwritten, and the index is replaced
+atomically, so readers need no lock. Compaction writes a new data file generation.
+
+Data file: a 64-byte header (magic "UBISERS\\0", version u16, record size u16) followed
+by 16-byte records; periods are YYYYMMDD integers with 00 for missing parts.
+"""
+
+import json
+import os
+import re
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .datadir import atomic_write, table_lock
+
+SERIES_MAGIC = b"UBISERS\0"
+SERIES_VERSION = 1
+SERIES_HEADER = struct.Struct("<8sHH52x")  # 64 bytes
+RECORD = np.dtype([("period", "<i4"), ("status", "S4"), ("value", "<f8")])
+INDEX = "index.json"
+
+# Columns every StatsCan table CSV has; the columns between them are the table's dimensions
+META_COLUMNS = {"REF_DATE", "DGUID", "UOM", "UOM_ID", "SCALAR_FACTOR", "SCALAR_ID", "VECTOR", "COORDINATE",
+                "VALUE", "STATUS", "SYMBOL", "TERMINATED", "DECIMALS"}
+
+
+def capacity_for(length: np.ndarray) -> np.ndarray:
+    """Records reserved for runs of length observations: a quarter spare, at least 4"""
+    return length + np.maximum(length // 4, 4)
+
+
+def encode_periods(ref_dates: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """(YYYYMMDD codes, formats) for REF_DATE strings; the format is the number of date parts,
+    or 0 for fiscal years ("2019/2020", stored as 2019). Only the distinct dates are parsed."""
+    positions, dates = pd.factorize(ref_dates)
+    dates = pd.Series(dates, dtype=str).str.strip()
+    fiscal = dates.str.contains("/", regex=False).to_numpy()
+    parts = dates.str.split("/", n=1).str[0].str.split("-", expand=True).reindex(columns=range(3))
+    numbers = parts.apply(pd.to_numeric, errors="coerce").fillna(0).astype(np.int64).to_numpy()
+    codes = numbers[:, 0] * 10000 + numbers[:, 1] * 100 + numbers[:, 2]
+    formats = np.where(fiscal, 0, parts.notna().sum(axis=1).to_numpy())
+    return codes.astype("<i4")[positions], formats[positions]
+
+
+def format_period(code: int, period_format: int) -> str:
+    """REF_DATE string of a period code"""
+    year, month, day = code // 10000, code // 100 % 100, code % 100
+    if period_format == 0:
+        return f"{year}/{year + 1}"
+    return "-".join([f"{year:04d}", f"{month:02d}", f"{day:02d}"][:period_format])
+
+
+def period_bound(value, upper: bool = False) -> int:
+    """Period code of a year or REF_DATE used as an inclusive range bound"""
+    parts = [int(p) for p in str(value).split("/")[0].split("-")]
+    parts += [99 if upper else 0] * (3 - len(parts))
+    return parts[0] * 10000 + parts[1] * 100 + parts[2]
+
+
+def table_id(csv_path: str) -> str:
+    """StatsCan product id of a table CSV (18100005), or its file name without extension"""
+    match = re.search(r"(\d{8})", os.path.basename(csv_path))
+    return match.group(1) if match else os.path.splitext(os.path.basename(csv_path))[0]
+
+
+class SeriesStore:
+    def __init__(self, path: str = "series_store"):
+        self.path = path
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Load the current index and map its data file"""
+        try:
+            with open(os.path.join(self.path, INDEX), "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except FileNotFoundError:
+            self.index = {"format": SERIES_VERSION, "data": None, "end": 0, "garbage": 0, "tables": {},
+                          "vectors": {}}
+        self.vectors = self.index["vectors"]
+        self.data = self._map(self.index["data"], self.index["end"])
+        self._members = None
+
+    def _map(self, name: Optional[str], end: int) -> np.ndarray:
+        if not name or not end:
+            return np.zeros(0, dtype=RECORD)
+        path = os.path.join(self.path, name)
+        with open(path, "rb") as f:
+            magic, version, record_size = SERIES_HEADER.unpack(f.read(SERIES_HEADER.size))
+        if magic != SERIES_MAGIC or record_size != RECORD.itemsize:
+            raise ValueError(f"{path} is not a series data file")
+        if version > SERIES_VERSION:
+            raise ValueError(f"{path} is series version {version}; this reader knows {SERIES_VERSION}")
+        return np.memmap(path, dtype=RECORD, mode="r", offset=SERIES_HEADER.size, shape=(end,))
+
+    def series(self, vector: str) -> np.ndarray:
+        """All observations of a vector, oldest first (a read-only view of the mapped file)"""
+        entry = self.vectors[self.normalize(vector)]
+        return self.data[entry["offset"]:entry["offset"] + entry["length"]]
+
+    def read(self, vector: str, start=None, end=None) -> pd.DataFrame:
+        """REF_DATE, VALUE and STATUS of a vector, optionally limited to start..end (years or REF_DATEs)"""
+        vector = self.normalize(vector)
+        records = self.series(vector)
+        periods = records["period"]
+        first = 0 if start is None else int(np.searchsorted(periods, period_bound(start)))
+        last = len(records) if end is None else int(np.searchsorted(periods, period_bound(end, upper=True),
+                                                                    side="right"))
+        records = records[first:last]
+        period_format = self.vectors[vector]["format"]
+        return pd.DataFrame({
+            "REF_DATE": [format_period(int(p), period_format) for p in records["period"]],
+            "VALUE": np.array(records["value"]),
+            "STATUS": np.char.decode(records["status"], "ascii"),
+        })
+
+    def describe(self, vector: str) -> Dict:
+        """Table, coordinate, dimension members and units of a vector"""
+        vector = self.normalize(vector)
+        entry = self.vectors[vector]
+        table = self.index["tables"][entry["table"]]
+        members = {dimension: table["members"][i][member]
+                   for i, (dimension, member) in enumerate(zip(table["dimensions"], entry["members"]))}
+        return {"vector": vector, "table": entry["table"], "coordinate": entry["coordinate"], "members": members,
+                "uom": entry["uom"], "scalar_factor": entry["scalar_factor"], "terminated": entry["terminated"],
+                "observations": entry["length"]}
+
+    def members_index(self) -> Dict[Tuple[str, str, str], List[str]]:
+        """(table, dimension, member) -> vectors, built on first use"""
+        if self._members is None:
+            tables = self.index["tables"]
+            members = {}
+            for vector, entry in self.vectors.items():
+                table = tables[entry["table"]]
+                for dimension, names, member in zip(table["dimensions"], table["members"], entry["members"]):
+                    members.setdefault((entry["table"], dimension, names[member]), []).append(vector)
+            self._members = members
+        return self._members
+
+    def find(self, members: Dict[str, str], table: Optional[str] = None) -> List[str]:
+        """Vectors having every given dimension member, e.g. {"GEO": "Canada", "Products and product groups": "All-items"}"""
+        index = self.members_index()
+        matches = None
+        for table_key in ([table] if table else self.index["tables"]):
+            found = None
+            for dimension, member in members.items():
+                vectors = set(index.get((table_key, dimension, member), ()))
+                found = vectors if found is None else found & vectors
+            if found is None:
+                found = {v for v, entry in self.vectors.items() if entry["table"] == table_key}
+            matches = found if matches is None else matches | found
+        return sorted(matches or ())
+
+    @staticmethod
+    def normalize(vector) -> str:
+        vector = str(vector).strip()
+        return vector if vector.lower().startswith("v") else f"v{vector}"
+
+    def ingest(self, df: pd.DataFrame, table: str) -> Dict[str, int]:
+        """Add a table's rows: new vectors, new periods and revised values; returns what changed"""
+        with table_lock(self.path, "series"):
+            self.refresh()  # Another writer may have changed the store since it was opened
+            result = self._ingest(df, table)
+            if self.index["garbage"] > self.index["end"] // 2:
+                self.compact(locked=True)
+        return result
+
+    def _rows(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Rows sorted by (vector, period) with one row per key (the last), and their records"""
+        positions, vectors = pd.factorize(df["VECTOR"])
+        vectors = "v" + pd.Series(vectors, dtype=str).str.strip().str.lstrip("vV")
+        periods, formats = encode_periods(df["REF_DATE"])
+        rows = df.assign(_vector=vectors.to_numpy()[positions], _period=periods, _format=formats)
+        rows = rows.sort_values(["_vector", "_period"], kind="stable")
+        rows = rows[~rows.duplicated(["_vector", "_period"], keep="last")]
+
+        records = np.zeros(len(rows), dtype=RECORD)
+        records["period"] = rows["_period"].to_numpy()
+        records["value"] = pd.to_numeric(rows["VALUE"], errors="coerce").to_numpy(dtype=np.float64)
+        if "STATUS" in rows.columns:
+            positions, status = pd.factorize(rows["STATUS"].fillna(""))
+            status = pd.Series(status, dtype=str).str.strip().str.encode("ascii", errors="replace")
+            records["status"] = status.to_numpy(dtype="S4")[positions] if len(status) else b""
+        return rows, records
+
+    def _table_members(self, table: str, rows: pd.DataFrame, first: np.ndarray) -> np.ndarray:
+        """Member ids (vectors × dimensions) for each vector's first row, extending the table's member lists"""
+        dimensions = [c for c in rows.columns if c not in META_COLUMNS and not c.startswith("_")]
+        entry = self.index["tables"].setdefault(table, {"dimensions": dimensions,
+                                                        "members": [[] for _ in dimensions]})
+        for dimension in dimensions:
+            if dimension not in entry["dimensions"]:
+                entry["dimensions"].append(dimension)
+                entry["members"].append([])
+
+        ids = np.zeros((len(first), len(entry["dimensions"])), dtype=np.int64)
+        for i, dimension in enumerate(entry["dimensions"]):
+            names = entry["members"][i]
+            if dimension not in rows.columns:
+                continue
+            positions = {name: j for j, name in enumerate(names)}
+            codes, uniques = pd.factorize(rows[dimension].iloc[first].fillna("").astype(str))
+            mapping = []
+            for name in uniques:
+                if name not in positions:
+                    positions[name] = len(names)
+                    names.append(name)
+                mapping.append(positions[name])
+            ids[:, i] = np.asarray(mapping, dtype=np.int64)[codes]
+        return ids
+
+    def _ingest(self, df: pd.DataFrame, table: str) -> Dict[str, int]:
+        rows, records = self._rows(df)
+        vectors, first, counts = np.unique(rows["_vector"].to_numpy(), return_index=True, return_counts=True)
+        members = self._table_members(table, rows, first)
+        n = len(vectors)
+
+        # Stored runs of the incoming vectors (length 0 for new ones), gathered in vector order
+        entries = [self.vectors.get(vector) for vector in vectors]
+        exists = np.array([entry is not None for entry in entries], dtype=bool)
+        offset, length, capacity = (np.array([entry[key] if entry else 0 for entry in entries], dtype=np.int64)
+                                    for key in ("offset", "length", "capacity"))
+        run_start = np.cumsum(length) - length
+        stored = self.data[np.repeat(offset, length) + np.arange(length.sum()) - np.repeat(run_start, length)]
+
+        # Union of stored and incoming records per (vector, period); the incoming one wins
+        both = np.concatenate([stored, records])
+        group = np.concatenate([np.repeat(np.arange(n), length), np.repeat(np.arange(n), counts)])
+        source = np.r_[np.zeros(len(stored), dtype=np.int8), np.ones(len(records), dtype=np.int8)]
+        order = np.lexsort((source, both["period"], group))
+        both, group, source = both[order], group[order], source[order]
+        same_key = (group[1:] == group[:-1]) & (both["period"][1:] == both["period"][:-1])
+        previous, current = both[:-1][same_key], both[1:][same_key]
+        changed = ((previous["status"] != current["status"])
+                   | ((previous["value"] != current["value"])
+                      & ~(np.isnan(previous["value"]) & np.isnan(current["value"]))))
+        revised = np.bincount(group[1:][same_key][changed], minlength=n)
+        keep = np.r_[~same_key, True]
+        merged, merged_group = both[keep], group[keep]
+        merged_length = np.bincount(merged_group, minlength=n)
+        merged_start = np.cumsum(merged_length) - merged_length
+        appended = merged_length - length
+
+        # New periods that all follow the last stored one go into the run's spare capacity;
+        # new vectors, revisions and overflowing runs are (re)written at the end of the file
+        last_stored = np.where(length > 0, stored["period"][np.maximum(run_start + length - 1, 0)]
+                               if len(stored) else 0, np.iinfo(np.int32).min)
+        tail_kept = merged["period"][np.maximum(merged_start + length - 1, 0)] == last_stored
+        unchanged = exists & (revised == 0) & (appended == 0)
+        in_place = exists & ~unchanged & (revised == 0) & (merged_length <= capacity) & ((length == 0) | tail_kept)
+        relocate = ~unchanged & ~in_place
+
+        end = self.index["end"]
+        new_capacity = np.where(relocate, capacity_for(merged_length), 0)
+        new_offset = end + np.cumsum(new_capacity) - new_capacity
+        self.index["garbage"] += int(capacity[relocate & exists].sum())
+        end += int(new_capacity.sum())
+
+        rank = np.arange(len(merged)) - merged_start[merged_group]
+        write = relocate[merged_group] | (in_place[merged_group] & (rank >= length[merged_group]))
+        target = np.where(relocate, new_offset, offset)[merged_group] + rank
+        if write.any():
+            self._write(target[write], merged[write], end)
+
+        coordinates, uoms, scales, terminated = (
+            rows[column].to_numpy()[first] if column in rows.columns else np.full(n, "", dtype=object)
+            for column in ("COORDINATE", "UOM", "SCALAR_FACTOR", "TERMINATED"))
+        formats = rows["_format"].to_numpy()[first]
+        metadata_changed = False
+        for i, vector in enumerate(vectors):
+            entry = entries[i] or {}
+            update = {"table": table, "offset": int(new_offset[i] if relocate[i] else offset[i]),
+                      "length": int(merged_length[i]),
+                      "capacity": int(new_capacity[i] if relocate[i] else capacity[i]),
+                      "format": int(formats[i]), "coordinate": str(coordinates[i]), "members": members[i].tolist(),
+                      "uom": str(uoms[i]), "scalar_factor": str(scales[i]),
+                      "terminated": str(terminated[i]).strip() == "t"}
+            if any(entry.get(key) != value for key, value in update.items()):
+                entry.update(update)
+                self.vectors[vector] = entry
+                metadata_changed = True
+        if write.any() or metadata_changed:
+            self._save_index()
+
+        return {"vectors": n, "new_vectors": int((~exists).sum()), "appended": int(appended[exists].sum()),
+                "revised": int(revised.sum()), "relocated": int((relocate & exists).sum()),
+                "unchanged": int(unchanged.sum()), "observations": int(merged_length.sum())}
+
+    def _write(self, positions: np.ndarray, records: np.ndarray, end: int) -> None:
+        """Scatter records into the data file; the caller then publishes the index that makes them visible"""
+        name = self.index["data"] or "series-000001.dat"
+        path = os.path.join(self.path, name)
+        if not os.path.exists(path):
+            with atomic_write(path, "wb") as f:
+                f.write(SERIES_HEADER.pack(SERIES_MAGIC, SERIES_VERSION, RECORD.itemsize))
+        with open(path, "r+b") as f:
+            # Anything past the indexed end is left over from an interrupted write and is reused
+            f.truncate(SERIES_HEADER.size + end * RECORD.itemsize)
+        data = np.memmap(path, dtype=RECORD, mode="r+", offset=SERIES_HEADER.size, shape=(end,))
+        data[positions] = records
+        data.flush()
+        del data
+        with open(path, "rb") as f:
+            os.fsync(f.fileno())
+        self.index.update(data=name, end=end)
+
+    def _save_index(self) -> None:
+        with atomic_write(os.path.join(self.path, INDEX), encoding="utf-8") as f:
+            f.write(json.dumps(self.index, separators=(",", ":")))  # dumps uses the C encoder, dump does not
+        self.refresh()
+
+    def compact(self, locked: bool = False) -> int:
+        """Rewrite the live runs into a new data file generation; returns the records reclaimed"""
+        if not locked:
+            with table_lock(self.path, "series"):
+                self.refresh()
+                return self.compact(locked=True)
+        if not self.index["data"]:
+            return 0
+        generation = int(re.search(r"(\d+)", self.index["data"]).group(1)) + 1
+        name = f"series-{generation:06d}.dat"
+        end = 0
+        with atomic_write(os.path.join(self.path, name), "wb") as f:
+            f.write(SERIES_HEADER.pack(SERIES_MAGIC, SERIES_VERSION, RECORD.itemsize))
+            for entry in self.vectors.values():
+                run = np.zeros(entry["capacity"], dtype=RECORD)
+                run[:entry["length"]] = self.data[entry["offset"]:entry["offset"] + entry["length"]]
+                f.write(run.tobytes())
+                entry["offset"] = end
+                end += entry["capacity"]
+
+        reclaimed = self.index["end"] - end
+        previous = self.index["data"]
+        self.index.update(data=name, end=end, garbage=0)
+        self._save_index()
+        # Readers that mapped the old generation keep their mapping; new readers never see it
+        os.remove(os.path.join(self.path, previous))
+        return reclaimed
+
+
+def open_store(path: str = "series_store") -> SeriesStore:
+    """Open (or start) a series store directory"""
+    os.makedirs(path, exist_ok=True)
+    return SeriesStore(path)
+
+
+def ingest_csv(store: SeriesStore, csv_path: str, table: Optional[str] = None) -> Dict[str, int]:
+    """Add a StatsCan table CSV to the store"""
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    return store.ingest(df, table or table_id(csv_path))
+
+
+def csv_files(input_dir: str) -> Iterable[str]:
+    """Table CSVs in a download directory and the extracted ZIPs below it (not *_MetaData.csv)"""
+    for root, _, files in os.walk(input_dir):
+        for file in sorted(files):
+            if file.endswith(".csv") and not file.lower().endswith("_metadata.csv"):
+                yield os.path.join(root, file)
+
+
+def run(args):
+    print("🧭 UBI Compass - Time-Series Store")
+    print("="*60)
+
+    store = open_store(args.store)
+    if args.build:
+        for csv_path in csv_files(args.input_dir):
+            start = time.perf_counter()
+            stats = ingest_csv(store, csv_path)
+            print(f"✅ {table_id(csv_path)}: {stats['vectors']:,} vectors ({stats['new_vectors']:,} new), "
+                  f"{stats['appended']:,} periods appended, {stats['revised']:,} revised, "
+                  f"{stats['relocated']:,} runs moved in {time.perf_counter() - start:.2f}s")
+    if args.compact:
+        print(f"🧹 Compacted: {store.compact():,} records reclaimed")
+
+    index = store.index
+    print(f"📦 {args.store}: {len(store.vectors):,} vectors in {len(index['tables'])} tables, "
+          f"{index['end']:,} records allocated ({index['garbage']:,} unused)")
+
+    vectors = [store.normalize(v) for v in args.vectors]
+    if args.find:
+        try:
+            members = dict(item.split("=", 1) for item in args.find)
+        except ValueError:
+            print("❌ --find takes DIMENSION=MEMBER")
+            sys.exit(1)
+        start = time.perf_counter()
+        found = store.find(members, args.table)
+        print(f"🔎 {len(found):,} vectors match in {(time.perf_counter() - start) * 1000:.2f} ms")
+        vectors += found[:args.limit]
+
+    start, end = (args.years.split("-", 1) + [None])[:2] if args.years else (None, None)
+    for vector in vectors:
+        if vector not in store.vectors:
+            print(f"⚠️  {vector} is not in the store")
+            continue
+        info = store.describe(vector)
+        series = store.read(vector, start, end or start)
+        print(f"\n📈 {vector} ({info['table']}, {info['coordinate']}): "
+              + "; ".join(f"{k}={v}" for k, v in info["members"].items()))
+        print(f"   {info['uom']}, {info['scalar_factor']}{', terminated' if info['terminated'] else ''}")
+        for row in series.itertuples(index=False):
+            print(f"   {row.REF_DATE:<10} {row.VALUE:>16,.2f} {row.STATUS}")
+    return store
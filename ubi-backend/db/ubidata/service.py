@@ -0,0 +1,324 @@
+"""
+Local cached query service for the processed statistics
+Serves the population cube, economic context and finance rollups as batched JSON
+endpoints (many years per call) from memory, instead of a database round trip per
+row. Results are cached per year in an LRU that is dropped whenever a source file
+changes, and every endpoint keeps p50/p99 latency. Standard library only.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .bundle import ECONOMIC_COLUMNS, economics as economic_tables
+from .scenario import age_counts, economic_context, open_population, population_breakdown
+
+
+class LRUCache:
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, compute: Callable):
+        """Cached value for key, computing and storing it on a miss"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        value = compute()
+        with self.lock:
+            self.entries[key] = value
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class LatencyStats:
+    def __init__(self, window=10000):
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self.lock:
+            self.samples[endpoint].append(seconds)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Request count and p50/p99 in milliseconds per endpoint, over the last window requests"""
+        with self.lock:
+            samples = {endpoint: list(values) for endpoint, values in self.samples.items()}
+        return {endpoint: {"requests": len(values),
+                           "p50_ms": round(float(np.percentile(values, 50)) * 1000, 3),
+                           "p99_ms": round(float(np.percentile(values, 99)) * 1000, 3)}
+                for endpoint, values in samples.items() if values}
+
+
+def parse_years(value, available: List[int]) -> List[int]:
+    """Years from "2000,2005", "2000-2022", a list, or nothing (all available years)"""
+    if value in (None, "", []):
+        return list(available)
+    parts = value if isinstance(value, list) else str(value).split(",")
+    years = []
+    for part in parts:
+        part = str(part).strip()
+        if "-" in part[1:]:
+            start, stop = part.split("-", 1)
+            years += range(int(start), int(stop) + 1)
+        elif part:
+            years.append(int(part))
+    return years
+
+
+class QueryService:
+    def __init__(self, cube_path="population-canada.cube",
+                 finance_csv=os.path.join("statscan_data", "federal_finance_10100005.csv"),
+                 cpi_csv=os.path.join("statscan_data", "cpi_inflation_18100005.csv"),
+                 tax_filer_csv=os.path.join("statscan_data", "tax_filers_11100008.csv"),
+                 cache_entries=4096, snapshot_check_s=1.0):
+        self.cube_path = cube_path
+        self.finance_csv = finance_csv
+        self.cpi_csv = cpi_csv
+        self.tax_filer_csv = tax_filer_csv
+        self.cache = LRUCache(cache_entries)
+        self.latency = LatencyStats()
+        self.snapshot_check_s = snapshot_check_s
+        self.snapshot = None
+        self.checked_at = 0.0
+        self.reload_lock = threading.Lock()
+        self.cube = None
+        self.finance = None
+        self.economic_years = {}
+        self.endpoints = {
+            "years": self.years,
+            "population": self.population,
+            "economics": self.economics,
+            "spending": self.spending,
+        }
+        self.refresh(force=True)
+
+    def snapshot_token(self) -> Tuple:
+        """(size, mtime) of every source file; a new token means the data was regenerated"""
+        token = []
+        for path in (self.cube_path, self.finance_csv, self.cpi_csv, self.tax_filer_csv):
+            try:
+                stat = os.stat(path)
+                token.append((path, stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                token.append((path, None, None))
+        return tuple(token)
+
+    def refresh(self, force=False) -> None:
+        """Reload the datasets and drop the cache if a source changed (checked at most every snapshot_check_s)"""
+        now = time.monotonic()
+        if not force and now - self.checked_at < self.snapshot_check_s:
+            return
+        with self.reload_lock:
+            self.checked_at = now
+            token = self.snapshot_token()
+            if token == self.snapshot and not force:
+                return
+            self.cube = open_population(self.cube_path) if os.path.exists(self.cube_path) else None
+            self.finance = None
+            if os.path.exists(self.finance_csv):
+                from .ccofog import finance_index
+                self.finance = finance_index(self.finance_csv)
+            self.economic_years = self.load_economics()
+            self.snapshot = token
+            self.cache.clear()
+
+    def load_economics(self) -> Dict[int, Dict]:
+        """EconomicContext of every cube and finance year from the CPI, finance and tax filer tables"""
+        years = set(self.available_years())
+        if self.finance is not None:
+            years |= {k[0] for k in self.finance.keys}
+        years = sorted(years)
+        if not years:
+            return {}
+        values, estimated, _ = economic_tables(years, self.cpi_csv, self.finance_csv, self.tax_filer_csv)
+        contexts = {}
+        for year, row, flags in zip(years, values, estimated):
+            context = {key: float(value) for key, value in zip(ECONOMIC_COLUMNS, row)}
+            context["totalGovernmentBudget"] = context["federalExpenditure"] + context["provincialExpenditure"]
+            # Columns still holding the hand-entered estimate (GDP always does)
+            context["estimated"] = [key for key, flag in zip(ECONOMIC_COLUMNS, flags) if flag]
+            context["isEstimated"] = bool(flags.any())
+            contexts[year] = context
+        return contexts
+
+    def available_years(self) -> List[int]:
+        return list(self.cube.years) if self.cube is not None else []
+
+    def years(self, params: Dict) -> Dict:
+        """Years with population data (getAvailableYears)"""
+        return {"years": self.available_years()}
+
+    def population(self, params: Dict) -> Dict:
+        """PopulationData per year for the age cutoffs (getPopulationData)"""
+        if self.cube is None:
+            raise LookupError(f"{self.cube_path} not found")
+        child = int(params.get("childAgeCutoff", 18))
+        youth = int(params.get("youthAgeCutoff", 24))
+        senior = int(params.get("seniorAgeCutoff", 65))
+
+        def compute(year):
+            if year not in self.cube.years:
+                return None
+            bands = population_breakdown(age_counts(self.cube, year), child, youth, senior)
+            return {"totalPopulation": int(bands["total"]), "childPopulation": int(bands["children"]),
+                    "youthPopulation": int(bands["youth"]), "adultPopulation": int(bands["adults"]),
+                    "seniorPopulation": int(bands["seniors"])}
+
+        return {str(year): self.cache.get(("population", self.snapshot, year, child, youth, senior),
+                                          lambda: compute(year))
+                for year in parse_years(params.get("years"), self.available_years())}
+
+    def economics(self, params: Dict) -> Dict:
+        """EconomicContext per year (getEconomicData); years outside the tables get the estimates"""
+        def compute(year):
+            if year in self.economic_years:
+                return self.economic_years[year]
+            return {**economic_context(year), "estimated": list(ECONOMIC_COLUMNS), "isEstimated": True}
+
+        return {str(year): self.cache.get(("economics", self.snapshot, year), lambda: compute(year))
+                for year in parse_years(params.get("years"), self.available_years())}
+
+    def spending(self, params: Dict) -> Dict:
+        """Finance rollup per year: all functions, UBI-replaceable and each CCOFOG division (millions)"""
+        if self.finance is None:
+            raise LookupError(f"{self.finance_csv} not found")
+        from .ccofog import REPLACEABLE, ROOT
+
+        geography = params.get("geography", "Canada")
+        component = params.get("component") or next(
+            (k[2] for k in self.finance.keys if k[1] == geography), None)
+        codes = [ROOT, REPLACEABLE] + self.finance.tree.nodes[ROOT].children
+        finance_years = sorted({k[0] for k in self.finance.keys})
+
+        def compute(year):
+            key = (year, geography, component)
+            if key not in self.finance.key_index:
+                return None
+            return {code: self.finance.total(code, *key) for code in codes}
+
+        return {"geography": geography, "component": component,
+                "years": {str(year): self.cache.get(("spending", self.snapshot, year, geography, component),
+                                                    lambda: compute(year))
+                          for year in parse_years(params.get("years"), finance_years)}}
+
+    def stats(self, params: Dict) -> Dict:
+        """Latency percentiles, cache effectiveness and the snapshot in use"""
+        return {"latency": self.latency.summary(),
+                "cache": {"entries": len(self.cache.entries), "hits": self.cache.hits,
+                          "misses": self.cache.misses},
+                "snapshot": [list(entry) for entry in self.snapshot]}
+
+    def handle(self, endpoint: str, params: Dict) -> Tuple[int, Dict]:
+        """(HTTP status, JSON payload) for one endpoint call; "batch" runs a list of calls"""
+        start = time.perf_counter()
+        try:
+            self.refresh()
+            if not isinstance(params, dict):
+                raise ValueError("request parameters must be a JSON object")
+            if endpoint == "batch":
+                calls = params.get("requests", [])
+                if not isinstance(calls, list) or not all(isinstance(call, dict) for call in calls):
+                    raise ValueError('batch expects {"requests": [{"endpoint": ..., ...}, ...]}')
+                results = [self.handle(call.get("endpoint", ""), call)[1] for call in calls]
+                return 200, {"results": results}
+            if endpoint == "stats":
+                return 200, self.stats(params)
+            if endpoint not in self.endpoints:
+                return 404, {"error": f"unknown endpoint {endpoint}"}
+            return 200, self.endpoints[endpoint](params)
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except LookupError as e:
+            return 404, {"error": str(e)}
+        finally:
+            if endpoint in self.endpoints or endpoint == "batch":
+                self.latency.record(endpoint, time.perf_counter() - start)
+
+
+def make_handler(service: QueryService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Dict) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _endpoint(self) -> Optional[str]:
+            path = urlparse(self.path).path.rstrip("/")
+            return path[len("/api/"):] if path.startswith("/api/") else None
+
+        def do_GET(self):
+            endpoint = self._endpoint()
+            if endpoint is None:
+                return self._send(404, {"error": "not found"})
+            params = {k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+            self._send(*service.handle(endpoint, params))
+
+        def do_POST(self):
+            endpoint = self._endpoint()
+            if endpoint is None:
+                return self._send(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                params = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError as e:
+                return self._send(400, {"error": f"invalid JSON: {e}"})
+            self._send(*service.handle(endpoint, params))
+
+        def log_message(self, format, *args):
+            pass  # Per-request logging would dominate the latency being measured
+
+    return Handler
+
+
+def serve(service: QueryService, host="127.0.0.1", port=8085) -> ThreadingHTTPServer:
+    """HTTP server for a service; call serve_forever() on it (or run it in a thread for tests)"""
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def run(args):
+    print("🧭 UBI Compass - Statistics Query Service")
+    print("="*60)
+
+    service = QueryService(cube_path=args.cube, finance_csv=args.finance_csv, cpi_csv=args.cpi_csv,
+                           tax_filer_csv=args.tax_filer_csv, cache_entries=args.cache_entries)
+    if service.cube is None:
+        print(f"⚠️  {args.cube} not found; population endpoints will return 404")
+    if service.finance is None:
+        print(f"⚠️  {args.finance_csv} not found; spending endpoints will return 404")
+
+    server = serve(service, args.host, args.port)
+    print(f"🚀 Listening on http://{args.host}:{args.port}/api/")
+    print("   GET  years | population?years=2000-2022&childAgeCutoff=18&youthAgeCutoff=24&seniorAgeCutoff=65")
+    print("   GET  economics?years=... | spending?years=...&geography=Canada | stats")
+    print('   POST batch {"requests": [{"endpoint": "population", "years": [2020, 2021]}, ...]}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n📊 {json.dumps(service.stats({})['latency'])}")
+    return service
@@ -0,0 +1,376 @@
+"""
+Synthetic Statistics Canada Dataset Generator
+Writes schema-faithful StatsCan CSVs/ZIPs and census files in the
+population-id-age.csv format at any size, so the pipeline can be tested
+offline at realistic scale. Output is streamed and fully determined by the seed.
+"""
+
+import io
+import os
+import random
+import zipfile
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .datadir import atomic_write
+
+# Geography members and their DGUIDs, as they appear in the downloaded tables
+GEOGRAPHIES = [
+    ("Canada", "2016A000011124"),
+    ("Newfoundland and Labrador", "2016A000210"),
+    ("Prince Edward Island", "2016A000211"),
+    ("Nova Scotia", "2016A000212"),
+    ("New Brunswick", "2016A000213"),
+    ("Quebec", "2016A000224"),
+    ("Ontario", "2016A000235"),
+    ("Manitoba", "2016A000246"),
+    ("Saskatchewan", "2016A000247"),
+    ("Alberta", "2016A000248"),
+    ("British Columbia", "2016A000259"),
+    ("Yukon", "2016A000260"),
+    ("Northwest Territories", "2016A000261"),
+    ("Nunavut", "2016A000262"),
+]
+
+# Top-level CCOFOG functions; each gets synthetic sub-functions whose values sum to the parent
+CCOFOG_FUNCTIONS = [
+    ("General public services", 701),
+    ("Defence", 702),
+    ("Public order and safety", 703),
+    ("Economic affairs", 704),
+    ("Environmental protection", 705),
+    ("Housing and community amenities", 706),
+    ("Health", 707),
+    ("Recreation, culture and religion", 708),
+    ("Education", 709),
+    ("Social protection", 710),
+]
+
+def ccofog_members(children_per_function: int = 5) -> List[Tuple[str, Optional[int]]]:
+    """CCOFOG labels as (label, index of parent member or None)"""
+    members = []
+    for name, code in CCOFOG_FUNCTIONS:
+        parent = len(members)
+        members.append((f"{name} [{code}]", None))
+        for child in range(1, children_per_function + 1):
+            members.append((f"{name}, sub-function {child} [{code}{child}]", parent))
+    return members
+
+INCOME_THRESHOLDS = ["5,000", "10,000", "15,000", "20,000", "25,000", "35,000",
+                     "50,000", "75,000", "100,000", "150,000", "200,000", "250,000"]
+
+# Table layouts modelled on the checked-in statscan_data fixtures
+TABLES = {
+    "cpi_inflation": {
+        "pid": "18-10-0005-01",
+        "download_key": "inflation",
+        "dimensions": {
+            "Products and product groups": [
+                "All-items", "Food", "Shelter", "Household operations, furnishings and equipment",
+                "Clothing and footwear", "Transportation", "Gasoline", "Health and personal care",
+                "Recreation, education and reading",
+                "Alcoholic beverages, tobacco products and recreational cannabis",
+                "All-items excluding food and energy", "All-items excluding energy",
+                "Energy", "Goods", "Services",
+            ],
+        },
+        "uom": ("2002=100", "17"),
+        "scalar": ("units", "0"),
+        "decimals": 1,
+        "base_value": 100.0,
+        "growth": (0.02, 0.015),
+        "first_vector": 41693271,
+    },
+    "tax_filers": {
+        "pid": "11-10-0008-01",
+        "download_key": "tax_filers",
+        "dimensions": {
+            "Sex": ["Both sexes", "Males", "Females"],
+            "Age group": ["All age groups", "0 to 24 years", "25 to 34 years", "35 to 44 years",
+                          "45 to 54 years", "55 to 64 years", "65 years and over"],
+            "Persons with income": (["All persons with income", "Persons with income under $5,000"]
+                                    + [f"Persons with income of ${t} and over" for t in INCOME_THRESHOLDS]
+                                    + ["Median total income"]),
+        },
+        "uom": ("Number", "223"),
+        "scalar": ("units", "0"),
+        "decimals": 0,
+        "base_value": 1_000_000.0,
+        "growth": (0.015, 0.02),
+        "first_vector": 20790253,
+    },
+    "gdp_canada": {
+        "pid": "36-10-0014-01",
+        "download_key": "gdp_data",
+        "dimensions": {
+            "Receipts, payments and balances": ["Receipts", "Payments", "Balances"],
+            "Current account and capital account": [
+                "Total current account", "Goods and services", "Goods", "Services", "Primary income",
+                "Compensation of employees", "Investment income", "Direct investment income",
+                "Portfolio investment income", "Other investment income", "Secondary income",
+                "Private transfers", "Government transfers", "Capital account",
+            ],
+            "Countries or regions": ["All countries", "United States", "United Kingdom",
+                                     "Other European Union countries", "Japan", "Other countries"],
+        },
+        "uom": ("Dollars", "81"),
+        "scalar": ("millions", "6"),
+        "decimals": 0,
+        "base_value": 50_000.0,
+        "growth": (0.03, 0.05),
+        "first_vector": 61914308,
+    },
+    "federal_finance": {
+        "pid": "10-10-0005-01",
+        "download_key": "federal_finance",
+        "dimensions": {
+            "Public sector components": ["Consolidated Canadian general government",
+                                         "Consolidated provincial-territorial and local governments"],
+            "Canadian Classification of Functions of Government (CCOFOG)": ccofog_members(),
+        },
+        "uom": ("Dollars", "81"),
+        "scalar": ("millions", "6"),
+        "decimals": 0,
+        "base_value": 2_000.0,
+        "growth": (0.03, 0.04),
+        "first_vector": 107022152,
+    },
+    "provincial_finance": {
+        "pid": "10-10-0020-01",
+        "download_key": "provincial_finance",
+        "dimensions": {
+            "Public sector components": ["Provincial and territorial general government",
+                                         "Local general government"],
+            "Canadian Classification of Functions of Government (CCOFOG)": ccofog_members(),
+        },
+        "uom": ("Dollars", "81"),
+        "scalar": ("millions", "6"),
+        "decimals": 0,
+        "base_value": 500.0,
+        "growth": (0.03, 0.04),
+        "first_vector": 108000000,
+    },
+}
+
+CSV_COLUMNS_BEFORE = ["REF_DATE", "GEO", "DGUID"]
+CSV_COLUMNS_AFTER = ["UOM", "UOM_ID", "SCALAR_FACTOR", "SCALAR_ID", "VECTOR", "COORDINATE",
+                     "VALUE", "STATUS", "SYMBOL", "TERMINATED", "DECIMALS"]
+
+# Status flags StatsCan uses for suppressed / unavailable cells (the VALUE is blank)
+SUPPRESSED_STATUSES = ["x", "F", ".."]
+
+def parse_count(text: str) -> int:
+    """Parse row counts such as 20000, 5M or 1.5G"""
+    multipliers = {"k": 10**3, "m": 10**6, "g": 10**9}
+    text = text.strip().lower().replace("_", "")
+    if text and text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+def quote(value) -> str:
+    """Quote a field the way StatsCan CSV exports do"""
+    return '"' + str(value).replace('"', '""') + '"'
+
+class SyntheticTableWriter:
+    def __init__(self, key: str, spec: Dict, seed: int, years: List[int],
+                 suppressed_rate: float = 0.001, estimated_rate: float = 0.01):
+        self.key = key
+        self.spec = spec
+        self.years = years
+        self.suppressed_rate = suppressed_rate
+        self.estimated_rate = estimated_rate
+
+        # Each table gets its own stream so adding a table does not change the others
+        self.rng = random.Random(seed ^ zlib.crc32(key.encode("utf-8")))
+
+        self.dimension_names = list(spec["dimensions"].keys())
+        self.members = [self._normalize(m) for m in spec["dimensions"].values()]
+
+    @staticmethod
+    def _normalize(members) -> List[Tuple[str, Optional[int]]]:
+        """Dimension members as (label, parent index) pairs"""
+        return [m if isinstance(m, tuple) else (m, None) for m in members]
+
+    @property
+    def header(self) -> List[str]:
+        return CSV_COLUMNS_BEFORE + self.dimension_names + CSV_COLUMNS_AFTER
+
+    def _extend_members(self, series_needed: int) -> None:
+        """Add synthetic members to the first non-hierarchical dimension until enough series exist"""
+        per_group = len(GEOGRAPHIES)
+        for members in self.members:
+            per_group *= len(members)
+        if per_group >= series_needed:
+            return
+
+        target = 0
+        for i, members in enumerate(self.members):
+            if all(parent is None for _, parent in members):
+                target = i
+                break
+
+        others = per_group // len(self.members[target])
+        needed = -(-series_needed // others)
+        name = self.dimension_names[target]
+        for n in range(len(self.members[target]), needed):
+            self.members[target].append((f"{name} {n + 1}", None))
+
+    def _walk(self, start: float) -> List[float]:
+        """A random-walk series over the configured years"""
+        mean, spread = self.spec["growth"]
+        values = []
+        value = start
+        for _ in self.years:
+            values.append(value)
+            value *= 1 + self.rng.gauss(mean, spread)
+        return values
+
+    def _group_values(self, members: List[Tuple[str, Optional[int]]]) -> List[List[float]]:
+        """Series for every member of the innermost dimension; parents are the sum of their children"""
+        base = self.spec["base_value"]
+        values = [None] * len(members)
+        children = {}
+        for i, (_, parent) in enumerate(members):
+            if parent is not None:
+                children.setdefault(parent, []).append(i)
+
+        for i in range(len(members)):
+            if i not in children:
+                values[i] = self._walk(base * self.rng.uniform(0.2, 2.0))
+        for parent, kids in children.items():
+            values[parent] = [sum(values[k][y] for k in kids) for y in range(len(self.years))]
+        return values
+
+    def _format_value(self, value: float) -> Tuple[str, str]:
+        """VALUE and STATUS for one cell, occasionally suppressed or flagged as an estimate"""
+        draw = self.rng.random()
+        if draw < self.suppressed_rate:
+            return "", self.rng.choice(SUPPRESSED_STATUSES)
+        status = "E" if draw < self.suppressed_rate + self.estimated_rate else ""
+        return f"{value:.{self.spec['decimals']}f}", status
+
+    def iter_lines(self, rows: int) -> Iterator[str]:
+        """Yield CSV lines (without header) until the row budget is reached"""
+        series_needed = -(-rows // len(self.years))
+        self._extend_members(series_needed)
+
+        uom, uom_id = self.spec["uom"]
+        scalar, scalar_id = self.spec["scalar"]
+        unit_fields = f"{quote(uom)},{quote(uom_id)},{quote(scalar)},{quote(scalar_id)}"
+        tail = f'"","",{quote(self.spec["decimals"])}\n'
+
+        outer = self.members[:-1]
+        inner = self.members[-1]
+        emitted = 0
+        series = 0
+
+        for geo_index, (geo, dguid) in enumerate(GEOGRAPHIES):
+            # Mixed-radix walk over the outer dimensions; the innermost one is generated as a group
+            counters = [0] * len(outer)
+            while True:
+                group_values = self._group_values(inner)
+                outer_labels = [outer[d][counters[d]][0] for d in range(len(outer))]
+
+                for inner_index, (inner_label, _) in enumerate(inner):
+                    vector = f"v{self.spec['first_vector'] + series}"
+                    coordinate = ".".join(str(i + 1) for i in [geo_index] + counters + [inner_index])
+                    labels = ",".join(quote(l) for l in outer_labels + [inner_label])
+                    prefix = f"{quote(geo)},{quote(dguid)},{labels},{unit_fields},{quote(vector)},{quote(coordinate)},"
+
+                    for year, value in zip(self.years, group_values[inner_index]):
+                        formatted, status = self._format_value(value)
+                        yield f'"{year}",{prefix}{quote(formatted)},{quote(status)},{tail}'
+                        emitted += 1
+                        if emitted >= rows:
+                            return
+                    series += 1
+
+                # Advance the outer counters (last dimension fastest)
+                d = len(outer) - 1
+                while d >= 0:
+                    counters[d] += 1
+                    if counters[d] < len(outer[d]):
+                        break
+                    counters[d] = 0
+                    d -= 1
+                if d < 0:
+                    break
+
+    def write(self, stream: io.TextIOBase, rows: int, buffer_lines: int = 10_000) -> int:
+        """Stream the table to an open text stream; returns the number of data rows written"""
+        stream.write(",".join(quote(c) for c in self.header) + "\n")
+        written = 0
+        buffer = []
+        for line in self.iter_lines(rows):
+            buffer.append(line)
+            if len(buffer) >= buffer_lines:
+                stream.write("".join(buffer))
+                written += len(buffer)
+                buffer = []
+        stream.write("".join(buffer))
+        return written + len(buffer)
+
+def write_table(output_dir: str, key: str, rows: int, seed: int, years: List[int],
+                as_zip: bool = False, suppressed_rate: float = 0.001) -> str:
+    """Write one synthetic table as a CSV (manual download layout) or a ZIP (downloader layout)"""
+    spec = TABLES[key]
+    writer = SyntheticTableWriter(key, spec, seed, years, suppressed_rate=suppressed_rate)
+    product_id = spec["pid"].replace("-", "")[:8]
+    data_dir = os.path.join(output_dir, "statscan_data")
+    os.makedirs(data_dir, exist_ok=True)
+
+    if as_zip:
+        path = os.path.join(data_dir, f"{spec['pid'].replace('-', '_')}_{spec['download_key']}.zip")
+        with atomic_write(path, 'wb') as f, zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            with zf.open(f"{product_id}.csv", 'w', force_zip64=True) as raw:
+                with io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as stream:
+                    written = writer.write(stream, rows)
+    else:
+        path = os.path.join(data_dir, f"{key}_{product_id}.csv")
+        with atomic_write(path, encoding='utf-8-sig', newline='', buffering=1024 * 1024) as stream:
+            written = writer.write(stream, rows)
+
+    print(f"✅ {key}: {written:,} rows → {path}")
+    return path
+
+def write_census(output_dir: str, seed: int, year_codes: List[int], max_age: int = 100,
+                 filename: str = "population-id-age.csv") -> str:
+    """Write census counts as 'Year Code;Age;Total' rows; age 0 holds the total of all ages"""
+    rng = random.Random(seed ^ zlib.crc32(b"census"))
+    path = os.path.join(output_dir, filename)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Age profile: flat through working ages, tapering off after 60
+    profile = [max(0.02, 1.0 - max(0, age - 60) / 42) for age in range(1, max_age + 1)]
+
+    with atomic_write(path, newline='') as f:
+        f.write("Year Code;Age;Total\n")
+        scale = 400_000
+        for year_code in year_codes:
+            counts = [int(scale * weight * rng.uniform(0.9, 1.1)) for weight in profile]
+            f.write(f"{year_code};0;{sum(counts)}\n")
+            for age, count in enumerate(counts, start=1):
+                f.write(f"{year_code};{age};{count}\n")
+            scale *= 1 + rng.gauss(0.05, 0.01)
+
+    print(f"✅ census: {len(year_codes) * (max_age + 1):,} rows → {path}")
+    return path
+
+def run(args):
+    print("🧭 UBI Compass - Synthetic StatsCan Data Generator")
+    print("="*60)
+
+    rows = parse_count(args.rows)
+    years = list(range(args.start_year, args.end_year + 1))
+
+    for key in [t for t in args.tables.split(",") if t] or list(TABLES):
+        if key not in TABLES:
+            print(f"⚠️  Unknown table {key}, skipping... (known: {', '.join(TABLES)})")
+            continue
+        write_table(args.output_dir, key, rows, args.seed, years, args.zip, args.suppressed_rate)
+
+    if not args.no_census:
+        codes = [int(c) for c in args.census_codes.split(",") if c]
+        write_census(args.output_dir, args.seed, codes)
+
+    print(f"\n📁 Synthetic data saved to: {os.path.abspath(args.output_dir)}")
@@ -0,0 +1,298 @@
+"""
+Pre-forked worker pool for batch scenario evaluation
+The population cube (as cumulative age counts per year) and the economic estimates are
+copied once into shared memory when the pool starts. Scenario batches are written to a
+shared parameter buffer, and workers write results into a shared result buffer, so a
+task message is only a row range and nothing large is pickled per task.
+"""
+
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .datadir import atomic_write
+from .scenario import (FEASIBILITY_LEVELS, DEFAULT_PARAMETERS, calculate_ubi_feasibility, economic_context,
+                       load_parameters, open_population)
+
+PARAMETER_KEYS = list(DEFAULT_PARAMETERS)
+RESULT_KEYS = ["grossUbiCost", "totalTaxRevenue", "netUbiCost", "gdpPercentage", "budgetPercentage",
+               "feasibility"]
+ECONOMIC_KEYS = ["gdp", "totalGovernmentBudget", "averageIncome"]
+WORKER_POLL_SECONDS = 0.5  # How often evaluate checks that the workers are alive while it waits
+
+
+class SharedArray:
+    def __init__(self, shape, dtype=np.float64, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.owner = name is None
+        # Workers are children of the pool and share its resource tracker, so attaching needs no
+        # untracking; only the owner unlinks
+        self.block = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.block.buf)
+
+    @property
+    def spec(self):
+        """What a worker needs to attach: (name, shape, dtype)"""
+        return self.block.name, self.shape, self.dtype.str
+
+    @classmethod
+    def from_spec(cls, spec) -> "SharedArray":
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self) -> None:
+        self.array = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+
+def evaluate_rows(parameters: np.ndarray, years: np.ndarray, cumulative: np.ndarray,
+                  economics: np.ndarray) -> np.ndarray:
+    """Results (rows x RESULT_KEYS) for parameter rows (rows x PARAMETER_KEYS), as one array expression"""
+    p = {key: parameters[:, i] for i, key in enumerate(PARAMETER_KEYS)}
+    row = np.searchsorted(years, p["year"])
+    known = (row < len(years)) & (years[np.minimum(row, len(years) - 1)] == p["year"])
+    row = np.where(known, row, 0)
+
+    table = cumulative[row]
+    last = cumulative.shape[1] - 1
+
+    def below(age):
+        return table[np.arange(len(row)), np.clip(age, 0, last).astype(np.int64)]
+
+    # Same bands as population_breakdown, with a different age table per row
+    children = below(p["childAgeCutoff"])
+    population = {
+        "children": children,
+        "youth": np.maximum(below(p["adultAgeCutoff"]) - children, 0),
+        "adults": np.maximum(below(p["seniorAgeCutoff"]) - below(p["adultAgeCutoff"]), 0),
+        "seniors": table[:, last] - below(p["seniorAgeCutoff"]),
+    }
+    context = {key: economics[row, i] for i, key in enumerate(ECONOMIC_KEYS)}
+    result = calculate_ubi_feasibility(p, population, context)
+
+    out = np.empty((len(row), len(RESULT_KEYS)))
+    out[:, 0] = result["costs"]["grossUbiCost"]
+    out[:, 1] = result["taxation"]["totalTaxRevenue"]
+    out[:, 2] = result["netUbiCost"]
+    out[:, 3] = result["gdpPercentage"]
+    out[:, 4] = result["budgetPercentage"]
+    out[:, 5] = (np.asarray(result["feasibility"])[:, None] == np.array(FEASIBILITY_LEVELS)).argmax(axis=1)
+    out[~known] = np.nan
+    return out
+
+
+def worker_main(dataset_specs, tasks, done) -> None:
+    """Worker loop: attach the datasets once, then evaluate row ranges until told to stop"""
+    years, cumulative, economics = (SharedArray.from_spec(spec) for spec in dataset_specs)
+    buffers = {}
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            job, parameter_spec, result_spec, start, stop = task
+            try:
+                # Buffers of the current job stay attached; older jobs' are released
+                if job not in buffers:
+                    for old in buffers.values():
+                        for buffer in old:
+                            buffer.close()
+                    buffers = {job: (SharedArray.from_spec(parameter_spec), SharedArray.from_spec(result_spec))}
+                parameters, results = buffers[job]
+                results.array[start:stop] = evaluate_rows(parameters.array[start:stop], years.array,
+                                                          cumulative.array, economics.array)
+                done.put((job, start, stop, None))
+            except Exception as e:
+                done.put((job, start, stop, f"{type(e).__name__}: {e}"))
+    finally:
+        for pair in buffers.values():
+            for buffer in pair:
+                buffer.close()
+        for shared in (years, cumulative, economics):
+            shared.close()
+
+
+class ScenarioPool:
+    def __init__(self, cube_path="population-canada.cube", workers=None, tasks_per_worker=4):
+        start = time.perf_counter()
+        cube = open_population(cube_path)
+        years = np.asarray(cube.years, dtype=np.float64)
+        counts = np.zeros((len(years), max(cube.ages) + 1), dtype=np.float64)
+        counts[:, np.asarray(cube.ages)] = cube.data[:, 0, 0, :]
+        counts[:, 0] = 0  # Age 0 holds the total
+
+        # Loaded once; every worker maps these same pages
+        self.years = SharedArray(years.shape)
+        self.years.array[:] = years
+        self.cumulative = SharedArray((len(years), counts.shape[1] + 1))
+        self.cumulative.array[:, 0] = 0
+        self.cumulative.array[:, 1:] = np.cumsum(counts, axis=1)
+        self.economics = SharedArray((len(years), len(ECONOMIC_KEYS)))
+        for i, year in enumerate(cube.years):
+            context = economic_context(year)
+            self.economics.array[i] = [context[key] for key in ECONOMIC_KEYS]
+
+        self.workers = workers or os.cpu_count() or 1
+        self.tasks_per_worker = tasks_per_worker
+        self.job = 0
+        # Fork where available so workers start from the parent's already-imported modules
+        context = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        self.tasks = context.SimpleQueue()
+        self.done = context.Queue()  # Queue rather than SimpleQueue: get() needs a timeout
+        specs = [self.years.spec, self.cumulative.spec, self.economics.spec]
+        self.processes = [context.Process(target=worker_main, args=(specs, self.tasks, self.done), daemon=True)
+                          for _ in range(self.workers)]
+        for process in self.processes:
+            process.start()
+        self.startup_seconds = time.perf_counter() - start
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def check_workers(self) -> None:
+        """Raise, and shut the pool down, if a worker has died; its task would never be answered"""
+        dead = [process for process in self.processes if not process.is_alive()]
+        if dead:
+            codes = ", ".join(str(process.exitcode) for process in dead)
+            self.terminate()
+            raise RuntimeError(f"{len(dead)} scenario worker(s) died (exit code {codes}); the pool is closed")
+
+    def evaluate(self, parameters: np.ndarray) -> np.ndarray:
+        """Results (rows x RESULT_KEYS) for a batch of parameter rows (rows x PARAMETER_KEYS)"""
+        if not self.processes:
+            raise RuntimeError("the scenario pool is closed")
+        rows = len(parameters)
+        if not rows:
+            return np.empty((0, len(RESULT_KEYS)))
+        self.check_workers()
+        self.job += 1
+        shared_parameters = SharedArray(parameters.shape)
+        shared_parameters.array[:] = parameters
+        shared_results = SharedArray((rows, len(RESULT_KEYS)))
+        try:
+            step = -(-rows // (self.workers * self.tasks_per_worker))
+            ranges = [(start, min(start + step, rows)) for start in range(0, rows, step)]
+            for start, stop in ranges:
+                self.tasks.put((self.job, shared_parameters.spec, shared_results.spec, start, stop))
+
+            errors = []
+            pending = set(ranges)
+            while pending:
+                try:
+                    job, start, stop, error = self.done.get(timeout=WORKER_POLL_SECONDS)
+                except queue.Empty:
+                    self.check_workers()
+                    continue
+                if job != self.job:
+                    continue  # Left over from an earlier batch that raised
+                pending.discard((start, stop))
+                if error:
+                    errors.append(f"rows {start}-{stop}: {error}")
+            if errors:
+                raise RuntimeError("; ".join(errors))
+            return shared_results.array.copy()
+        finally:
+            shared_parameters.close()
+            shared_results.close()
+
+    def close(self) -> None:
+        """Stop the workers and release the shared datasets"""
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join()
+        self.release()
+
+    def terminate(self) -> None:
+        """Kill the workers without waiting for their tasks, then release the shared datasets"""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        self.release()
+
+    def release(self) -> None:
+        if self.years is None:
+            return
+        self.processes = []
+        for shared in (self.years, self.cumulative, self.economics):
+            shared.close()
+        self.years = self.cumulative = self.economics = None
+
+
+def parse_grid(grid: Optional[str]) -> Dict[str, List[float]]:
+    """Values per parameter from "key=v1,v2;key2=start:stop:step" (stop inclusive)"""
+    values = {}
+    for part in [p for p in (grid or "").split(";") if p]:
+        key, spec = part.split("=", 1)
+        if ":" in spec:
+            start, stop, step = (float(x) for x in spec.split(":"))
+            values[key.strip()] = np.arange(start, stop + step / 2, step).tolist()
+        else:
+            values[key.strip()] = [float(x) for x in spec.split(",")]
+    return values
+
+
+def grid_rows(base: Dict, grid: Dict[str, List[float]]) -> np.ndarray:
+    """Parameter rows for every combination in the grid, other keys taken from base"""
+    unknown = [key for key in grid if key not in PARAMETER_KEYS]
+    if unknown:
+        raise KeyError(f"not a UBIParameters key: {', '.join(unknown)}")
+    keys = list(grid)
+    combos = np.array(list(itertools.product(*grid.values())), dtype=np.float64).reshape(-1, len(keys))
+    rows = np.tile(np.array([base[key] for key in PARAMETER_KEYS], dtype=np.float64), (len(combos), 1))
+    for i, key in enumerate(keys):
+        rows[:, PARAMETER_KEYS.index(key)] = combos[:, i]
+    return rows
+
+
+def run(args):
+    print("🧭 UBI Compass - Scenario Sweep")
+    print("="*60)
+
+    base = load_parameters(args.scenario, year=args.year)
+    try:
+        rows = grid_rows(base, parse_grid(args.grid))
+    except (KeyError, ValueError) as e:
+        print(f"❌ Invalid grid: {e}")
+        sys.exit(1)
+
+    with ScenarioPool(cube_path=args.cube, workers=args.workers) as pool:
+        print(f"🚀 {pool.workers} workers ready in {pool.startup_seconds * 1000:.0f} ms "
+              f"(datasets in shared memory: {pool.cumulative.array.nbytes + pool.economics.array.nbytes:,} bytes)")
+        start = time.perf_counter()
+        results = pool.evaluate(rows)
+        elapsed = time.perf_counter() - start
+
+    print(f"📊 {len(rows):,} scenarios in {elapsed:.3f}s ({len(rows) / elapsed:,.0f} scenarios/s)")
+    levels = results[:, RESULT_KEYS.index("feasibility")]
+    unknown = int(np.isnan(levels).sum())
+    shares = [f"{level} {np.mean(levels == i):.1%}" for i, level in enumerate(FEASIBILITY_LEVELS)]
+    print(f"🎯 Feasibility: {', '.join(shares)}" + (f" ({unknown:,} rows with a year not in the cube)" if unknown else ""))
+
+    net = results[:, RESULT_KEYS.index("netUbiCost")]
+    if len(net) and not np.isnan(net).all():
+        best = int(np.nanargmin(net))
+        print(f"💰 Lowest net cost ${net[best] / 1e9:,.1f}B at "
+              + ", ".join(f"{key}={rows[best, PARAMETER_KEYS.index(key)]:g}" for key in parse_grid(args.grid)))
+
+    if args.output:
+        header = ",".join(PARAMETER_KEYS + RESULT_KEYS)
+        with atomic_write(args.output, encoding='utf-8') as f:
+            np.savetxt(f, np.hstack([rows, results]), delimiter=",", header=header, comments="", fmt="%.10g")
+        print(f"📁 Results saved: {args.output}")
+    return results
@@ -0,0 +1,71 @@
+// Reader for the binary population cube written by `python -m ubidata interpolate`
+// (year x geography x sex x age, int32). The counts are exposed as an Int32Array
+// view over the file buffer, so nothing is parsed per row. Age 0 holds the total.
+
+const fs = require('fs');
+
+const CUBE_MAGIC = 'UBIPOPC\0';
+const CUBE_VERSION = 1;
+const AXES = ['years', 'geographies', 'sexes', 'ages'];
+
+// Load a cube file and return its labels, shape and an Int32Array of the counts
+function loadPopulationCube(filePath) {
+  const buffer = fs.readFileSync(filePath);
+
+  if (buffer.length < 64 || buffer.toString('latin1', 0, 8) !== CUBE_MAGIC) {
+    throw new Error(`${filePath} is not a population cube`);
+  }
+  const version = buffer.readUInt16LE(8);
+  if (version > CUBE_VERSION) {
+    throw new Error(`${filePath} is cube version ${version}; this reader knows ${CUBE_VERSION}`);
+  }
+
+  const shape = [12, 16, 20, 24].map((offset) => buffer.readUInt32LE(offset));
+  const labelsOffset = buffer.readUInt32LE(28);
+  const labelsLength = buffer.readUInt32LE(32);
+  const dataOffset = buffer.readUInt32LE(36);
+  const labels = JSON.parse(buffer.toString('utf8', labelsOffset, labelsOffset + labelsLength));
+
+  const length = shape.reduce((a, b) => a * b, 1);
+  // The data offset is 64-byte aligned; copy only if the buffer itself is not 4-byte aligned
+  const data = (buffer.byteOffset + dataOffset) % 4 === 0
+    ? new Int32Array(buffer.buffer, buffer.byteOffset + dataOffset, length)
+    : new Int32Array(buffer.buffer.slice(buffer.byteOffset + dataOffset, buffer.byteOffset + dataOffset + length * 4));
+
+  const positions = AXES.map((axis) => new Map(labels[axis].map((value, i) => [value, i])));
+
+  // Flat index of one cell; geography and sex default to the first entry (Canada, both sexes)
+  function index(year, age, geography = labels.geographies[0], sex = labels.sexes[0]) {
+    const keys = [year, geography, sex, age];
+    let flat = 0;
+    for (let axis = 0; axis < AXES.length; axis++) {
+      const position = positions[axis].get(keys[axis]);
+      if (position === undefined) {
+        throw new Error(`${keys[axis]} is not in the cube's ${AXES[axis]}`);
+      }
+      flat = flat * shape[axis] + position;
+    }
+    return flat;
+  }
+
+  return {
+    ...labels,
+    shape,
+    data,
+    get: (year, age, geography, sex) => data[index(year, age, geography, sex)],
+    // Population aged firstAge..lastAge (inclusive); the age 0 total is never added in
+    ageRange(year, firstAge, lastAge, geography, sex) {
+      let total = 0;
+      for (const age of labels.ages) {
+        if (age >= Math.max(firstAge, 1) && age <= lastAge) {
+          total += data[index(year, age, geography, sex)];
+        }
+      }
+      return total;
+    },
+  };
+}
+
+module.exports = {
+  loadPopulationCube,
+};